@@ -1,4 +1,4 @@
-from typing import Any, Sequence
+from typing import Any, Sequence, override
 
 import cohere
 import numpy as np
@@ -7,7 +7,7 @@ from modstack.artifacts import Artifact
 from modstack.cohere.typing import OMIT
 from modstack.config import Secret
 from modstack.core import Modules
-from modstack.utils.func import tzip
+from modstack.utils.func import tzip, unflatten
 
 _EMBED_RESPONSE = cohere.EmbedResponse_EmbeddingsFloats | cohere.EmbedResponse_EmbeddingsByType
 
@@ -53,6 +53,39 @@ class CohereTextEmbedder(Modules.Async[list[Artifact], list[Artifact]]):
         self.embedding_seperator = embedding_seperator
         self.batch_size = batch_size
 
+    @override
+    def batch(
+        self,
+        inputs: Sequence[list[Artifact]],
+        max_concurrency: int | None = None,
+        return_exceptions: bool = False,
+        **kwargs
+    ) -> list[list[Artifact] | Exception]:
+        # embed all inputs in a single pass, so the request count depends on batch_size rather than len(inputs)
+        try:
+            embedded = self.invoke([artifact for artifacts in inputs for artifact in artifacts], **kwargs)
+        except Exception:
+            if not return_exceptions:
+                raise
+            return super().batch(inputs, max_concurrency=max_concurrency, return_exceptions=True, **kwargs)
+        return unflatten(embedded, (len(artifacts) for artifacts in inputs))
+
+    @override
+    async def abatch(
+        self,
+        inputs: Sequence[list[Artifact]],
+        max_concurrency: int | None = None,
+        return_exceptions: bool = False,
+        **kwargs
+    ) -> list[list[Artifact] | Exception]:
+        try:
+            embedded = await self.ainvoke([artifact for artifacts in inputs for artifact in artifacts], **kwargs)
+        except Exception:
+            if not return_exceptions:
+                raise
+            return await super().abatch(inputs, max_concurrency=max_concurrency, return_exceptions=True, **kwargs)
+        return unflatten(embedded, (len(artifacts) for artifacts in inputs))
+
     async def _ainvoke(
         self,
         artifacts: list[Artifact],
@@ -85,20 +118,18 @@ class CohereTextEmbedder(Modules.Async[list[Artifact], list[Artifact]]):
 
         all_embeddings: list[list[float]] = []
 
-        if hasattr(self, 'async_client'):
-            response = await self.async_client.embed(
-                texts=texts_to_embed,
-                model=self.model,
-                input_type=input_type,
-                embedding_types=embedding_types,
-                truncate=truncate,
-                request_options=request_options
-            )
-            for embedding in response.embeddings:
-                all_embeddings.append(embedding)
-        else:
-            for i in range(0, len(texts_to_embed), batch_size):
-                batch = texts_to_embed[i: i + batch_size]
+        for i in range(0, len(texts_to_embed), batch_size):
+            batch = texts_to_embed[i: i + batch_size]
+            if hasattr(self, 'async_client'):
+                response = await self.async_client.embed(
+                    texts=batch,
+                    model=self.model,
+                    input_type=input_type,
+                    embedding_types=embedding_types,
+                    truncate=truncate,
+                    request_options=request_options
+                )
+            else:
                 response = self.client.embed(
                     texts=batch,
                     model=self.model,
@@ -107,8 +138,8 @@ class CohereTextEmbedder(Modules.Async[list[Artifact], list[Artifact]]):
                     truncate=truncate,
                     request_options=request_options
                 )
-                for embedding in response.embeddings:
-                    all_embeddings.append(embedding)
+            for embedding in response.embeddings:
+                all_embeddings.append(embedding)
 
         for artifact, embedding in tzip(artifacts, all_embeddings):
             artifact.embedding = np.asarray(embedding)
@@ -11,6 +11,7 @@ import fsspec
 from modstack.artifacts import Artifact, artifact_registry
 from modstack.stores import VectorStore, VectorStoreQuery, VectorStoreQueryResult
 from modstack.typing import Embedding, FilterCondition, FilterOperator, MetadataFilter, MetadataFilters
+from modstack.utils.deadlines import check_deadline
 from modstack.utils.func import tzip
 from modstack.utils.string import truncate_text
 from modstack.utils.threading import run_async
@@ -78,6 +79,7 @@ class ChromaVectorStore(VectorStore):
             json.dump(data, f)
 
     def retrieve(self, **query: Unpack[VectorStoreQuery]) -> VectorStoreQueryResult:
+        check_deadline()
         query.setdefault('similarity_top_k', 1)
         where = _to_chroma_filters(query['filters']) if query['filters'] else {}
         if not query['query_embedding']:
@@ -162,6 +164,8 @@ class ChromaVectorStore(VectorStore):
         all_ids = []
         chunks_list = _chunks_list(artifacts, MAX_CHUNK_SIZE)
         for chunks in chunks_list:
+            # stop between chunks rather than sending more once the request's deadline has passed
+            check_deadline()
             texts = []
             ids = []
             embeddings = []
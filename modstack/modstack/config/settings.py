@@ -6,6 +6,7 @@ from modstack.stores import ArtifactStore, IndexStore, InjestionCache, KVArtifac
 from modstack.stores import GraphStore, SimpleGraphStore
 from modstack.stores import SimpleKVStore
 from modstack.stores import SimpleVectorStore, VectorStore
+from modstack.utils.threading import ExecutorRegistry, get_executor_registry, set_executor_registry
 
 @dataclass
 class _Settings:
@@ -107,5 +108,13 @@ class _Settings:
     def llm(self, llm: Optional[LLM]) -> None:
         self._llm = llm
 
+    @property
+    def executors(self) -> ExecutorRegistry:
+        return get_executor_registry()
+
+    @executors.setter
+    def executors(self, executors: Optional[ExecutorRegistry]) -> None:
+        set_executor_registry(executors)
+
 _kvstore = SimpleKVStore()
 Settings = _Settings(_kvstore=_kvstore)
\ No newline at end of file
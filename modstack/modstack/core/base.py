@@ -1,13 +1,30 @@
 from abc import ABC, abstractmethod
 from functools import partial
-from typing import Any, AsyncIterator, Callable, Generic, Iterator, Mapping, Sequence, Type, Union, final, get_args, override
+from typing import Any, AsyncIterator, Callable, Generic, Iterator, Literal, Mapping, Sequence, TYPE_CHECKING, Type, Union, final, get_args, override
 
 from pydantic import BaseModel
 
 from modstack.artifacts import Artifact
-from modstack.typing import AfterRetryFailure, Effect, Effects, RetryStrategy, ReturnType, Serializable, StopStrategy, WaitStrategy
+from modstack.typing import Effect, Effects, ReturnType, Serializable
 from modstack.typing.vars import In, Other, Out
-from modstack.utils.serialization import create_schema, from_dict, to_dict
+from modstack.utils.deadlines import check_deadline
+from modstack.utils.serialization import create_schema, from_dict, schema_cache, to_dict
+from modstack.core.traits import StreamTransformer
+from modstack.utils.threading import gather_with_concurrency, get_executor, run_async_transform
+from modstack.utils.tracing import tracing_enabled
+
+if TYPE_CHECKING:
+    from modstack.core.caching import CacheBackend
+    from modstack.typing import AfterRetryFailure, RetryStrategy, StopStrategy, WaitStrategy
+
+@schema_cache
+def _generic_type_args(cls: type, count: int) -> tuple[Any, ...]:
+    """The type arguments of the first generic base of `cls` with `count` of them."""
+    for base in cls.__orig_bases__: # type: ignore[attr-defined]
+        type_args = get_args(base)
+        if type_args and len(type_args) == count:
+            return type_args
+    return ()
 
 class Module(Generic[In, Out], ABC):
     name: str | None = None
@@ -15,10 +32,9 @@ class Module(Generic[In, Out], ABC):
 
     @property
     def InputType(self) -> Type[In]:
-        for cls in self.__class__.__orig_bases__: # type: ignore[attr-defined]
-            type_args = get_args(cls)
-            if type_args and len(type_args) == 1:
-                return type_args[0]
+        type_args = _generic_type_args(self.__class__, 1)
+        if type_args:
+            return type_args[0]
         raise TypeError(
             f"Module {self.get_name()} doesn't have an inferrable InputType."
             'Override the OutputType property to specify the output type.'
@@ -26,10 +42,9 @@ class Module(Generic[In, Out], ABC):
 
     @property
     def OutputType(self) -> Type[Out]:
-        for cls in self.__class__.__orig_bases__: # type: ignore[attr-defined]
-            type_args = get_args(cls)
-            if type_args and len(type_args) == 2:
-                return type_args[1]
+        type_args = _generic_type_args(self.__class__, 2)
+        if type_args:
+            return type_args[1]
         raise TypeError(
             f"Module {self.get_name()} doesn't have an inferrable OutputType."
             'Override the OutputType property to specify the output type.'
@@ -77,10 +92,10 @@ class Module(Generic[In, Out], ABC):
 
     def with_retry(
         self,
-        retry: RetryStrategy | None = None,
-        stop: StopStrategy | None = None,
-        wait: WaitStrategy | None = None,
-        after: AfterRetryFailure | None = None
+        retry: 'RetryStrategy | None' = None,
+        stop: 'StopStrategy | None' = None,
+        wait: 'WaitStrategy | None' = None,
+        after: 'AfterRetryFailure | None' = None
     ) -> 'Module[In, Out]':
         from modstack.core.fault_handling.retry import Retry
         return Retry(
@@ -103,27 +118,216 @@ class Module(Generic[In, Out], ABC):
             exceptions_to_handle=exceptions_to_handle
         )
 
+    def with_hedging(
+        self,
+        hedges: Sequence['Module[In, Out]'] | None = None,
+        delay: float | None = None,
+        percentile: float = 0.95,
+        initial_delay: float = 1.0,
+        exceptions_to_handle: tuple[BaseException, ...] | None = None
+    ) -> 'Module[In, Out]':
+        """
+        Start `hedges` (by default, this module again) one by one while earlier calls are slower than `delay`,
+        or than the `percentile` of recent latencies if no delay is given. The first successful result wins.
+        """
+        from modstack.core.fault_handling.hedging import Hedge
+        return Hedge(
+            bound=self,
+            hedges=hedges,
+            delay=delay,
+            percentile=percentile,
+            initial_delay=initial_delay,
+            exceptions_to_handle=exceptions_to_handle
+        )
+
+    def with_circuit_breaker(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30,
+        half_open_max_calls: int = 1,
+        key: str | None = None,
+        exceptions_to_handle: tuple[BaseException, ...] | None = None
+    ) -> 'Module[In, Out]':
+        """
+        Fail fast with `CircuitOpenError` after `failure_threshold` consecutive failures, for `reset_timeout` seconds,
+        then let `half_open_max_calls` trial calls decide whether to close again. With a `key`, the circuit is shared
+        by every module under that key, and they all have to pass the same settings. Without one, the circuit is
+        this module's own.
+        """
+        from modstack.core.fault_handling.circuit_breaker import CircuitBreaker
+        from modstack.utils.circuit_breaking import Circuit, get_circuit
+        settings = dict(
+            failure_threshold=failure_threshold,
+            reset_timeout=reset_timeout,
+            half_open_max_calls=half_open_max_calls
+        )
+        return CircuitBreaker(
+            bound=self,
+            circuit=get_circuit(key, **settings) if key is not None else Circuit(self.get_name(), **settings),
+            exceptions_to_handle=exceptions_to_handle
+        )
+
+    def with_cache(
+        self,
+        backend: 'CacheBackend | None' = None,
+        max_size: int | None = 1024,
+        ttl: float | None = None,
+        key: Callable[..., Any] | None = None
+    ) -> 'Module[In, Out]':
+        from modstack.core.caching import Cache, InMemoryCacheBackend
+        return Cache(
+            bound=self,
+            backend=backend or InMemoryCacheBackend(max_size=max_size, ttl=ttl),
+            key=key
+        )
+
+    def with_executor(
+        self,
+        kind: Literal['thread', 'process'] = 'thread',
+        max_workers: int | None = None,
+        chunksize: int = 1,
+        warm: bool = False
+    ) -> 'Module[In, Out]':
+        from modstack.core.offload import Offload
+        return Offload(
+            bound=self,
+            kind=kind,
+            max_workers=max_workers,
+            chunksize=chunksize,
+            warm=warm
+        )
+
+    def with_rate_limit(
+        self,
+        requests_per_sec: float | None = None,
+        tokens_per_min: float | None = None,
+        max_concurrency: int | None = None,
+        key: str | None = None,
+        token_counter: Callable[[In], int] | None = None
+    ) -> 'Module[In, Out]':
+        """
+        Limit calls to this module. With a `key`, the limiter is shared by every module rate limited under that key,
+        and they all have to pass the same limits. Without one, the limiter is this module's own.
+        """
+        from modstack.core.rate_limit import RateLimit
+        from modstack.utils.rate_limiting import RateLimiter, get_rate_limiter
+        limits = dict(
+            requests_per_sec=requests_per_sec,
+            tokens_per_min=tokens_per_min,
+            max_concurrency=max_concurrency
+        )
+        return RateLimit(
+            bound=self,
+            limiter=get_rate_limiter(key, **limits) if key is not None else RateLimiter(**limits),
+            token_counter=token_counter
+        )
+
+    def with_microbatch(
+        self,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5
+    ) -> 'Module[In, Out]':
+        """Coalesce concurrent calls into batched calls. Only for modules that map a list of inputs to a list of outputs."""
+        from modstack.core.microbatch import MicroBatch
+        return MicroBatch(
+            bound=self,
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms
+        )
+
+    def with_timeout(self, seconds: float) -> 'Module[In, Out]':
+        """Fail with `DeadlineExceeded` if a call takes longer than `seconds`, including everything it calls."""
+        from modstack.core.timeout import Timeout
+        return Timeout(bound=self, seconds=seconds)
+
     @abstractmethod
     def forward(self, data: In, **kwargs) -> Effect[Out]:
         pass
 
+    @final
+    def effect(self, data: In, **kwargs) -> Effect[Out]:
+        """
+        `forward`, wrapped in a tracing span when any trace handler is registered.
+        Composite modules should call this rather than `forward` on their children.
+        Raises `DeadlineExceeded` if the current request's deadline has passed.
+        """
+        check_deadline()
+        effect = self.forward(data, **kwargs)
+        if tracing_enabled():
+            return Effects.Traced(effect, self.get_name())
+        return effect
+
     @final
     def invoke(self, data: In, **kwargs) -> Out:
-        return self.forward(data, **kwargs).invoke()
+        return self.effect(data, **kwargs).invoke()
 
     @final
     async def ainvoke(self, data: In, **kwargs) -> Out:
-        return await self.forward(data, **kwargs).ainvoke()
+        return await self.effect(data, **kwargs).ainvoke()
 
     @final
     def iter(self, data: In, **kwargs) -> Iterator[Out]:
-        yield from self.forward(data, **kwargs).iter()
+        yield from self.effect(data, **kwargs).iter()
 
     @final
     async def aiter(self, data: In, **kwargs) -> AsyncIterator[Out]:
-        async for item in self.forward(data, **kwargs).aiter(): #type: ignore
+        async for item in self.effect(data, **kwargs).aiter(): #type: ignore
             yield item
 
+    def batch(
+        self,
+        inputs: Sequence[In],
+        max_concurrency: int | None = None,
+        return_exceptions: bool = False,
+        **kwargs
+    ) -> list[Out | Exception]:
+        """
+        Invoke the module on each input concurrently on the shared thread pool, preserving input order.
+        Override this if the module has a native batched path.
+        """
+        if not inputs:
+            return []
+
+        def _invoke(data: In) -> Out | Exception:
+            try:
+                return self.invoke(data, **kwargs)
+            except Exception as e:
+                if return_exceptions:
+                    return e
+                raise
+
+        if len(inputs) == 1:
+            return [_invoke(inputs[0])]
+        with get_executor(max_workers=max_concurrency) as executor:
+            return list(executor.map(_invoke, inputs))
+
+    async def abatch(
+        self,
+        inputs: Sequence[In],
+        max_concurrency: int | None = None,
+        return_exceptions: bool = False,
+        **kwargs
+    ) -> list[Out | Exception]:
+        """
+        Invoke the module on each input concurrently, running at most `max_concurrency` at once and preserving
+        input order. Override this if the module has a native batched path.
+        """
+        if not inputs:
+            return []
+
+        async def _ainvoke(data: In) -> Out | Exception:
+            try:
+                return await self.ainvoke(data, **kwargs)
+            except Exception as e:
+                if return_exceptions:
+                    return e
+                raise
+
+        return await gather_with_concurrency(
+            max_concurrency,
+            *(_ainvoke(data) for data in inputs)
+        )
+
     def get_name(
         self,
         name: str | None = None,
@@ -223,6 +427,38 @@ class Modules:
         async def _astream(self, data: In, **kwargs) -> AsyncIterator[Out]:
             pass
 
+    class Transform(SerializableModule[In, Out], StreamTransformer, ABC):
+        def __init__(
+            self,
+            add_values: bool | None = None,
+            return_last: bool | None = None,
+            **kwargs
+        ):
+            super().__init__(**kwargs)
+            self.add_values = add_values
+            self.return_last = return_last
+
+        @final
+        def forward(self, data: In, **kwargs) -> Effect[Out]:
+            return Effects.Iterator(
+                partial(self._transform, iter([data]), **kwargs),
+                add_values=self.add_values,
+                return_last=self.return_last
+            )
+
+        @final
+        def transform(self, chunks: Iterator[In], **kwargs) -> Iterator[Out]:
+            yield from self._transform(chunks, **kwargs)
+
+        @final
+        async def atransform(self, chunks: AsyncIterator[In], **kwargs) -> AsyncIterator[Out]:
+            async for item in run_async_transform(partial(self._transform, **kwargs), chunks):
+                yield item
+
+        @abstractmethod
+        def _transform(self, chunks: Iterator[In], **kwargs) -> Iterator[Out]:
+            pass
+
 type ModuleFunction[In, Out] = Union[Callable[[In], ReturnType[Out]], Callable[..., ReturnType[Out]]]
 ModuleFunction = ModuleFunction
 type ModuleLike[In, Out] = Union[Module[In, Out], ModuleFunction[In, Out]]
@@ -0,0 +1,2 @@
+from .base import CacheBackend, InMemoryCacheBackend, KVCacheBackend, module_fingerprint
+from .cache import Cache
@@ -0,0 +1,185 @@
+from abc import ABC, abstractmethod
+import base64
+from collections import OrderedDict
+from hashlib import sha256
+import json
+import pickle
+import re
+import threading
+import time
+from typing import Any, Callable, Optional, TYPE_CHECKING
+
+from pydantic import BaseModel
+
+from modstack.core import Module
+
+if TYPE_CHECKING:
+    from modstack.stores import KVStore
+
+MISSING = object()
+
+# kwargs that decorators pass down with each call, which don't change the result
+CALL_STATE_KWARGS = frozenset({'retry_state'})
+
+class CacheBackend(ABC):
+    @abstractmethod
+    def get(self, key: str) -> Any:
+        """Get the cached value for a key, or `MISSING` if there is none."""
+
+    async def aget(self, key: str) -> Any:
+        return self.get(key)
+
+    @abstractmethod
+    def put(self, key: str, value: Any) -> None:
+        pass
+
+    async def aput(self, key: str, value: Any) -> None:
+        self.put(key, value)
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        pass
+
+class InMemoryCacheBackend(CacheBackend):
+    """
+    A thread-safe LRU cache, evicting the least recently used entry past `max_size`
+    and entries older than `ttl` seconds.
+    """
+
+    def __init__(self, max_size: Optional[int] = 1024, ttl: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[Any, Optional[float]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: Any) -> None:
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            if self.max_size is not None:
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+class KVCacheBackend(CacheBackend):
+    """
+    A persistent cache on top of a KVStore. Values are pickled, so they must be picklable
+    and should only be read back by trusted processes.
+    """
+
+    def __init__(
+        self,
+        kvstore: 'KVStore',
+        collection: Optional[str] = None,
+        ttl: Optional[float] = None
+    ):
+        self._kvstore = kvstore
+        self._collection = collection or 'modstack_module_cache'
+        self.ttl = ttl
+
+    def get(self, key: str) -> Any:
+        return self._load(key, self._kvstore.get(key, collection=self._collection))
+
+    async def aget(self, key: str) -> Any:
+        return self._load(key, await self._kvstore.aget(key, collection=self._collection))
+
+    def put(self, key: str, value: Any) -> None:
+        self._kvstore.put(key, self._dump(value), collection=self._collection)
+
+    async def aput(self, key: str, value: Any) -> None:
+        await self._kvstore.aput(key, self._dump(value), collection=self._collection)
+
+    def delete(self, key: str) -> None:
+        self._kvstore.delete(key, collection=self._collection)
+
+    def clear(self) -> None:
+        for key in self._kvstore.get_all(collection=self._collection):
+            self._kvstore.delete(key, collection=self._collection)
+
+    def _load(self, key: str, data: Optional[dict]) -> Any:
+        if data is None:
+            return MISSING
+        expires_at = data.get('expires_at')
+        if expires_at is not None and expires_at <= time.time():
+            self.delete(key)
+            return MISSING
+        return pickle.loads(base64.b64decode(data['value']))
+
+    def _dump(self, value: Any) -> dict:
+        return {
+            'value': base64.b64encode(pickle.dumps(value)).decode('ascii'),
+            'expires_at': time.time() + self.ttl if self.ttl is not None else None
+        }
+
+def module_fingerprint(
+    module: Module,
+    data: Any,
+    kwargs: dict[str, Any],
+    key: Optional[Callable[..., Any]] = None
+) -> str:
+    """
+    A stable hash of a module's serialized config, its input and the kwargs it was called with, leaving out
+    `CALL_STATE_KWARGS`. With `key`, `key(data, **kwargs)` is hashed instead of the input and kwargs.
+    Memory addresses are stripped from the module config, so equal configs match across processes.
+    Raises `TypeError` if the input or kwargs hold values without a stable representation.
+    """
+    if key is not None:
+        call = _stable_dumps(key(data, **kwargs))
+    else:
+        call = '|'.join((
+            _stable_dumps(data),
+            _stable_dumps({k: v for k, v in kwargs.items() if k not in CALL_STATE_KWARGS})
+        ))
+    return sha256('|'.join((
+        _remove_unstable_values(str(module)),
+        call
+    )).encode('utf8')).hexdigest()
+
+def _stable_dumps(value: Any) -> str:
+    try:
+        return json.dumps(value, sort_keys=True, default=_to_jsonable)
+    except ValueError as e:
+        # e.g. circular references
+        raise TypeError(str(e)) from e
+
+def _to_jsonable(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return {'__type__': value.__class__.__qualname__, **value.model_dump()}
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=repr)
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode('ascii')
+    text = repr(value)
+    if _ADDRESS_PATTERN.search(text):
+        # the repr changes with every instance, so equal values would never match
+        raise TypeError(f'Cannot fingerprint values of type {type(value).__qualname__}.')
+    return text
+
+_ADDRESS_PATTERN = re.compile(r' at 0x[0-9a-fA-F]+')
+
+def _remove_unstable_values(s: str) -> str:
+    return re.sub(r'<[\w\s_. ]+ at 0x[a-z0-9]+>', '', s)
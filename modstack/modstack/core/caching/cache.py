@@ -0,0 +1,138 @@
+import asyncio
+from concurrent.futures import Future
+import logging
+import threading
+from typing import Any, Callable, Optional, override
+
+from pydantic import PrivateAttr
+
+from modstack.core import DecoratorBase, Module
+from modstack.core.caching.base import MISSING, CacheBackend, module_fingerprint
+from modstack.typing import Effect, Effects
+from modstack.typing.vars import In, Out
+from modstack.utils.deadlines import DeadlineExceeded
+from modstack.utils.metrics import metrics_enabled, record_store_lookup
+
+logger = logging.getLogger(__name__)
+
+# the result followers get when the leader stopped without one, so they call the module themselves
+_ABANDONED = object()
+
+class Cache(DecoratorBase[In, Out]):
+    """
+    Memoizes `invoke`/`ainvoke` results of the bound module by a fingerprint of its config, the input and the kwargs,
+    or of `key(data, **kwargs)` when `key` is set. Calls whose input can't be fingerprinted aren't cached.
+    Concurrent calls with the same fingerprint share a single in-flight call. Streams are passed through uncached.
+    """
+
+    backend: CacheBackend
+    key: Optional[Callable[..., Any]] = None
+
+    _inflight: dict[str, Future] = PrivateAttr(default_factory=dict)
+    _inflight_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def __init__(
+        self,
+        bound: Module[In, Out],
+        backend: CacheBackend,
+        key: Optional[Callable[..., Any]] = None
+    ):
+        super().__init__(bound=bound, backend=backend, key=key)
+
+    @override
+    def forward(self, data: In, **kwargs) -> Effect[Out]:
+        try:
+            key = module_fingerprint(self.bound, data, kwargs, key=self.key)
+        except TypeError as e:
+            logger.debug(f'Calling {self.bound.get_name()} uncached: {e}')
+            return self.bound.effect(data, **kwargs)
+
+        def _invoke() -> Out:
+            while True:
+                value = self.backend.get(key)
+                if metrics_enabled():
+                    record_store_lookup(type(self.backend).__name__, value is not MISSING)
+                if value is not MISSING:
+                    return value
+                future, is_leader = self._join(key)
+                if not is_leader:
+                    value = future.result()
+                    if value is _ABANDONED:
+                        continue
+                    return value
+                try:
+                    value = self.bound.invoke(data, **kwargs)
+                    self.backend.put(key, value)
+                except Exception as e:
+                    self._settle(key, future, error=e)
+                    raise
+                except BaseException:
+                    self._abandon(key, future)
+                    raise
+                self._settle(key, future, value=value)
+                return value
+
+        async def _ainvoke() -> Out:
+            while True:
+                value = await self.backend.aget(key)
+                if metrics_enabled():
+                    record_store_lookup(type(self.backend).__name__, value is not MISSING)
+                if value is not MISSING:
+                    return value
+                future, is_leader = self._join(key)
+                if not is_leader:
+                    value = await asyncio.shield(asyncio.wrap_future(future))
+                    if value is _ABANDONED:
+                        continue
+                    return value
+                try:
+                    value = await self.bound.ainvoke(data, **kwargs)
+                    await self.backend.aput(key, value)
+                except Exception as e:
+                    self._settle(key, future, error=e)
+                    raise
+                except BaseException:
+                    self._abandon(key, future)
+                    raise
+                self._settle(key, future, value=value)
+                return value
+
+        return Effects.From(
+            invoke=_invoke,
+            ainvoke=_ainvoke,
+            iter_=lambda: self.bound.iter(data, **kwargs),
+            aiter_=lambda: self.bound.aiter(data, **kwargs)
+        )
+
+    def _join(self, key: str) -> tuple[Future, bool]:
+        with self._inflight_lock:
+            if (future := self._inflight.get(key)) is not None:
+                return future, False
+            future = Future()
+            future.set_running_or_notify_cancel()
+            self._inflight[key] = future
+            return future, True
+
+    def _settle(
+        self,
+        key: str,
+        future: Future,
+        value: Any = None,
+        error: Exception | None = None
+    ) -> None:
+        if isinstance(error, DeadlineExceeded):
+            # the leader's deadline isn't the followers', so one of them calls the module again
+            self._abandon(key, future)
+            return
+        with self._inflight_lock:
+            self._inflight.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(value)
+
+    def _abandon(self, key: str, future: Future) -> None:
+        """Release the followers of a leader that stopped without a result, e.g. because it was cancelled."""
+        with self._inflight_lock:
+            self._inflight.pop(key, None)
+        future.set_result(_ABANDONED)
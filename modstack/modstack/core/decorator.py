@@ -1,4 +1,4 @@
-from typing import Any, Type, cast, override
+from typing import Any, Sequence, Type, cast, override
 
 from pydantic import BaseModel
 
@@ -74,6 +74,38 @@ class DecoratorBase(SerializableModule[In, Out]):
         return self.bound.output_schema()
 
 class Decorator(DecoratorBase[In, Out]):
+    @override
+    def batch(
+        self,
+        inputs: Sequence[In],
+        max_concurrency: int | None = None,
+        return_exceptions: bool = False,
+        **kwargs
+    ) -> list[Out | Exception]:
+        return self.bound.batch(
+            inputs,
+            max_concurrency=max_concurrency,
+            return_exceptions=return_exceptions,
+            **self.kwargs,
+            **kwargs
+        )
+
+    @override
+    async def abatch(
+        self,
+        inputs: Sequence[In],
+        max_concurrency: int | None = None,
+        return_exceptions: bool = False,
+        **kwargs
+    ) -> list[Out | Exception]:
+        return await self.bound.abatch(
+            inputs,
+            max_concurrency=max_concurrency,
+            return_exceptions=return_exceptions,
+            **self.kwargs,
+            **kwargs
+        )
+
     @override
     def bind(self, **kwargs) -> 'Module[In, Out]':
         return self.__class__(
@@ -112,4 +144,67 @@ class Decorator(DecoratorBase[In, Out]):
             kwargs=self.kwargs,
             custom_input_type=self.custom_input_type,
             custom_output_type=self.custom_output_type
+        )
+
+    @override
+    def with_hedging(self, **kwargs) -> 'Module[In, Out]':
+        return self.__class__(
+            bound=self.bound.with_hedging(**kwargs),
+            kwargs=self.kwargs,
+            custom_input_type=self.custom_input_type,
+            custom_output_type=self.custom_output_type
+        )
+
+    @override
+    def with_timeout(self, seconds: float) -> 'Module[In, Out]':
+        return self.__class__(
+            bound=self.bound.with_timeout(seconds),
+            kwargs=self.kwargs,
+            custom_input_type=self.custom_input_type,
+            custom_output_type=self.custom_output_type
+        )
+
+    @override
+    def with_circuit_breaker(self, **kwargs) -> 'Module[In, Out]':
+        return self.__class__(
+            bound=self.bound.with_circuit_breaker(**kwargs),
+            kwargs=self.kwargs,
+            custom_input_type=self.custom_input_type,
+            custom_output_type=self.custom_output_type
+        )
+
+    @override
+    def with_cache(self, **kwargs) -> 'Module[In, Out]':
+        return self.__class__(
+            bound=self.bound.with_cache(**kwargs),
+            kwargs=self.kwargs,
+            custom_input_type=self.custom_input_type,
+            custom_output_type=self.custom_output_type
+        )
+
+    @override
+    def with_executor(self, **kwargs) -> 'Module[In, Out]':
+        return self.__class__(
+            bound=self.bound.with_executor(**kwargs),
+            kwargs=self.kwargs,
+            custom_input_type=self.custom_input_type,
+            custom_output_type=self.custom_output_type
+        )
+
+    @override
+    def with_rate_limit(self, **kwargs) -> 'Module[In, Out]':
+        return self.__class__(
+            bound=self.bound.with_rate_limit(**kwargs),
+            kwargs=self.kwargs,
+            custom_input_type=self.custom_input_type,
+            custom_output_type=self.custom_output_type
+        )
+
+    @override
+    def with_microbatch(self, **kwargs) -> 'Module[In, Out]':
+        return self.__class__(
+            bound=self.bound.with_microbatch(**kwargs),
+            kwargs=self.kwargs,
+            custom_input_type=self.custom_input_type,
+            custom_output_type=self.custom_output_type
         )
\ No newline at end of file
@@ -1,2 +1,4 @@
+from .circuit_breaker import CircuitBreaker
 from .fallbacks import Fallbacks
+from .hedging import Hedge
 from .retry import Retry
\ No newline at end of file
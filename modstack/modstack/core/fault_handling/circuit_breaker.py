@@ -0,0 +1,53 @@
+from typing import AsyncIterator, Iterator, Type, override
+
+from modstack.core import DecoratorBase, Module
+from modstack.typing import Effect, Effects
+from modstack.typing.vars import In, Out
+from modstack.utils.circuit_breaking import Circuit
+
+class CircuitBreaker(DecoratorBase[In, Out]):
+    """
+    Calls the bound module through a circuit, failing fast with `CircuitOpenError` while the circuit is open.
+    Pair it with `with_fallbacks` to route around a failing backend without waiting for it to time out.
+    """
+
+    circuit: Circuit
+    exceptions_to_handle: tuple[Type[BaseException], ...]
+
+    def __init__(
+        self,
+        bound: Module[In, Out],
+        circuit: Circuit,
+        exceptions_to_handle: tuple[Type[BaseException], ...] | None = None
+    ):
+        super().__init__(
+            bound=bound,
+            circuit=circuit,
+            exceptions_to_handle=exceptions_to_handle or (Exception,)
+        )
+
+    @override
+    def forward(self, data: In, **kwargs) -> Effect[Out]:
+        def _invoke() -> Out:
+            with self.circuit.guard(self.exceptions_to_handle):
+                return self.bound.invoke(data, **kwargs)
+
+        async def _ainvoke() -> Out:
+            with self.circuit.guard(self.exceptions_to_handle):
+                return await self.bound.ainvoke(data, **kwargs)
+
+        def _iter() -> Iterator[Out]:
+            with self.circuit.guard(self.exceptions_to_handle):
+                yield from self.bound.iter(data, **kwargs)
+
+        async def _aiter() -> AsyncIterator[Out]:
+            with self.circuit.guard(self.exceptions_to_handle):
+                async for item in self.bound.aiter(data, **kwargs):
+                    yield item
+
+        return Effects.From(
+            invoke=_invoke,
+            ainvoke=_ainvoke,
+            iter_=_iter,
+            aiter_=_aiter
+        )
@@ -0,0 +1,176 @@
+import asyncio
+from collections import deque
+from concurrent import futures
+from functools import partial
+import math
+import threading
+import time
+from typing import Iterator, Optional, Sequence, Type, override
+
+from pydantic import PrivateAttr
+
+from modstack.core import DecoratorBase, Module
+from modstack.typing import Effect, Effects
+from modstack.typing.vars import In, Out
+from modstack.utils.metrics import metrics_enabled, record_hedge
+from modstack.utils.threading import get_executor
+
+_LATENCY_WINDOW = 256
+_MIN_SAMPLES = 20
+
+class Hedge(DecoratorBase[In, Out]):
+    """
+    Sends the request to the next module if the previous one hasn't answered within a delay, and returns
+    the first successful result. Requests that lose are cancelled. A module that fails with a handled
+    exception starts the next one right away, like `Fallbacks`.
+
+    The delay is `delay` seconds if given, and otherwise the `percentile` of recently observed latencies of the
+    bound module, starting at `initial_delay` until enough calls have been seen.
+    """
+
+    hedges: Sequence[Module[In, Out]]
+    delay: Optional[float]
+    percentile: float
+    initial_delay: float
+    exceptions_to_handle: tuple[Type[BaseException], ...]
+
+    _latencies: deque[float] = PrivateAttr(default_factory=lambda: deque(maxlen=_LATENCY_WINDOW))
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def _modules(self) -> Iterator[Module[In, Out]]:
+        yield self.bound
+        yield from self.hedges
+
+    def __init__(
+        self,
+        bound: Module[In, Out],
+        hedges: Sequence[Module[In, Out]] | None = None,
+        delay: Optional[float] = None,
+        percentile: float = 0.95,
+        initial_delay: float = 1.0,
+        exceptions_to_handle: tuple[Type[BaseException], ...] | None = None
+    ):
+        if not 0 < percentile <= 1:
+            raise ValueError('percentile must be in (0, 1].')
+        super().__init__(
+            bound=bound,
+            hedges=hedges if hedges is not None else [bound],
+            delay=delay,
+            percentile=percentile,
+            initial_delay=initial_delay,
+            exceptions_to_handle=exceptions_to_handle or (Exception,)
+        )
+
+    @override
+    def forward(self, data: In, **kwargs) -> Effect[Out]:
+        return Effects.From(
+            invoke=lambda: self._invoke(data, **kwargs),
+            ainvoke=lambda: self._ainvoke(data, **kwargs)
+        )
+
+    def _invoke(self, data: In, **kwargs) -> Out:
+        modules = list(self._modules)
+        started = time.monotonic()
+        pending: dict[futures.Future, int] = {}
+        errors: list[BaseException] = []
+        with get_executor() as executor:
+            def _start() -> None:
+                index = len(pending) + len(errors)
+                future = executor.submit(modules[index].invoke, data, **kwargs)
+                if index == 0:
+                    future.add_done_callback(partial(self._record_latency, started))
+                pending[future] = index
+
+            _start()
+            try:
+                while pending:
+                    can_hedge = len(pending) + len(errors) < len(modules)
+                    done, _ = futures.wait(
+                        pending,
+                        timeout=self._get_delay() if can_hedge else None,
+                        return_when=futures.FIRST_COMPLETED
+                    )
+                    if not done:
+                        _start()
+                        continue
+                    for future in done:
+                        index = pending.pop(future)
+                        error = future.exception()
+                        if error is None:
+                            self._record_outcome(index, len(pending) + len(errors) + 1)
+                            return future.result()
+                        if not isinstance(error, self.exceptions_to_handle):
+                            raise error
+                        errors.append(error)
+                        if len(pending) + len(errors) < len(modules):
+                            _start()
+            finally:
+                # threads can't be interrupted, so tasks that already started run to completion and are ignored
+                for future in pending:
+                    future.cancel()
+        raise errors[0]
+
+    async def _ainvoke(self, data: In, **kwargs) -> Out:
+        modules = list(self._modules)
+        started = time.monotonic()
+        pending: dict[asyncio.Task, int] = {}
+        errors: list[BaseException] = []
+
+        def _start() -> None:
+            index = len(pending) + len(errors)
+            task = asyncio.ensure_future(modules[index].ainvoke(data, **kwargs))
+            if index == 0:
+                task.add_done_callback(partial(self._record_latency, started))
+            pending[task] = index
+
+        _start()
+        try:
+            while pending:
+                can_hedge = len(pending) + len(errors) < len(modules)
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=self._get_delay() if can_hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    _start()
+                    continue
+                for task in done:
+                    index = pending.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        self._record_outcome(index, len(pending) + len(errors) + 1)
+                        return task.result()
+                    if not isinstance(error, self.exceptions_to_handle):
+                        raise error
+                    errors.append(error)
+                    if len(pending) + len(errors) < len(modules):
+                        _start()
+        finally:
+            for task in pending:
+                task.cancel()
+        raise errors[0]
+
+    def _get_delay(self) -> float:
+        if self.delay is not None:
+            return self.delay
+        with self._lock:
+            if len(self._latencies) < _MIN_SAMPLES:
+                return self.initial_delay
+            latencies = sorted(self._latencies)
+        return latencies[min(len(latencies) - 1, math.ceil(self.percentile * len(latencies)) - 1)]
+
+    def _record_latency(self, started: float, attempt: futures.Future | asyncio.Future) -> None:
+        """
+        Record the latency of the bound module's call, once it is done. Only its own latency counts, since hedges win
+        exactly when it is slow. A call cancelled after losing took at least as long as it ran, so that is recorded.
+        """
+        if not attempt.cancelled() and attempt.exception() is not None:
+            return
+        with self._lock:
+            self._latencies.append(time.monotonic() - started)
+
+    def _record_outcome(self, winner: int, attempts: int) -> None:
+        if metrics_enabled():
+            record_hedge(self.bound.get_name(), hedged=attempts > 1, hedge_won=winner > 0)
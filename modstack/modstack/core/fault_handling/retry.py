@@ -1,12 +1,20 @@
-from typing import Any, override
+from functools import partial
+from typing import Any, AsyncIterator, Iterator, override
 
-from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_none
+from tenacity import AsyncRetrying, RetryCallState, Retrying, retry_if_exception_type, stop_after_attempt, wait_none
 
 from modstack.core import DecoratorBase, Module
 from modstack.typing import AfterRetryFailure, Effect, Effects, RetryStrategy, StopStrategy, WaitStrategy
 from modstack.typing.vars import In, Out
+from modstack.utils.deadlines import DeadlineExceeded, min_timeout
 
 class Retry(DecoratorBase[In, Out]):
+    """
+    Retries the bound module on failure. Streams are only retried until their first chunk is yielded,
+    after which errors are raised to the caller. Waits are cut short at the request's deadline, and
+    `DeadlineExceeded` is never retried.
+    """
+
     retry: RetryStrategy
     stop: StopStrategy
     wait: WaitStrategy
@@ -16,9 +24,9 @@ class Retry(DecoratorBase[In, Out]):
     def _retry_kwargs(self) -> dict[str, Any]:
         return {
             'reraise': True,
-            'retry': self.retry,
+            'retry': partial(_retry_unless_deadline_exceeded, self.retry),
             'stop': self.stop,
-            'wait': self.wait,
+            'wait': partial(_wait_within_deadline, self.wait),
             'after': self.after
         }
 
@@ -40,12 +48,64 @@ class Retry(DecoratorBase[In, Out]):
 
     @override
     def forward(self, data: In, **kwargs) -> Effect[Out]:
-        async def _ainvoke() -> Out:
-            async for attempt in AsyncRetrying(**self._retry_kwargs):
-                with attempt:
-                    result = await super().ainvoke(data, retry_state=attempt.retry_state, **kwargs)
-                if attempt.retry_state.outcome and not attempt.retry_state.outcome.failed:
-                    attempt.retry_state.set_result(result)
-            return result
-
-        return Effects.Async(_ainvoke)
\ No newline at end of file
+        return Effects.From(
+            invoke=partial(self._invoke, data, **kwargs),
+            ainvoke=partial(self._ainvoke, data, **kwargs),
+            iter_=partial(self._iter, data, **kwargs),
+            aiter_=partial(self._aiter, data, **kwargs)
+        )
+
+    def _invoke(self, data: In, **kwargs) -> Out:
+        for attempt in Retrying(**self._retry_kwargs):
+            with attempt:
+                result = self.bound.invoke(data, retry_state=attempt.retry_state, **kwargs)
+            if attempt.retry_state.outcome and not attempt.retry_state.outcome.failed:
+                attempt.retry_state.set_result(result)
+        return result
+
+    async def _ainvoke(self, data: In, **kwargs) -> Out:
+        async for attempt in AsyncRetrying(**self._retry_kwargs):
+            with attempt:
+                result = await self.bound.ainvoke(data, retry_state=attempt.retry_state, **kwargs)
+            if attempt.retry_state.outcome and not attempt.retry_state.outcome.failed:
+                attempt.retry_state.set_result(result)
+        return result
+
+    def _iter(self, data: In, **kwargs) -> Iterator[Out]:
+        # only waiting for the first chunk is retried, since chunks already yielded can't be taken back
+        for attempt in Retrying(**self._retry_kwargs):
+            with attempt:
+                iterator = iter(self.bound.iter(data, retry_state=attempt.retry_state, **kwargs))
+                first = next(iterator, _EMPTY)
+        try:
+            if first is not _EMPTY:
+                yield first
+                yield from iterator
+        finally:
+            if hasattr(iterator, 'close'):
+                iterator.close()
+
+    async def _aiter(self, data: In, **kwargs) -> AsyncIterator[Out]:
+        async for attempt in AsyncRetrying(**self._retry_kwargs):
+            with attempt:
+                iterator = aiter(self.bound.aiter(data, retry_state=attempt.retry_state, **kwargs))
+                first = await anext(iterator, _EMPTY)
+        try:
+            if first is not _EMPTY:
+                yield first
+                async for item in iterator:
+                    yield item
+        finally:
+            if hasattr(iterator, 'aclose'):
+                await iterator.aclose()
+
+_EMPTY = object()
+
+def _retry_unless_deadline_exceeded(retry: RetryStrategy, retry_state: RetryCallState) -> bool:
+    outcome = retry_state.outcome
+    if outcome is not None and outcome.failed and isinstance(outcome.exception(), DeadlineExceeded):
+        return False
+    return retry(retry_state)
+
+def _wait_within_deadline(wait: WaitStrategy, retry_state: RetryCallState) -> float:
+    return min_timeout(wait(retry_state))
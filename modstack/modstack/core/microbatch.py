@@ -0,0 +1,239 @@
+import asyncio
+from concurrent.futures import Future
+import logging
+import threading
+from typing import Any, Callable, Hashable, NamedTuple, Optional, cast, override
+
+from pydantic import PrivateAttr
+
+from modstack.core import DecoratorBase, Module
+from modstack.core.caching.base import CALL_STATE_KWARGS
+from modstack.typing import Effect, Effects
+from modstack.typing.vars import In, Out
+from modstack.utils.func import unflatten
+
+logger = logging.getLogger(__name__)
+
+class _Batch:
+    def __init__(self):
+        self.entries: list[tuple[list[Any], Future]] = []
+        self.size = 0
+        self.closed = False
+        self._full = threading.Event()
+        self._wakers: list[Callable[[], None]] = []
+
+    def add(self, items: list[Any]) -> Future:
+        future: Future = Future()
+        self.entries.append((items, future))
+        self.size += len(items)
+        return future
+
+    def remove(self, future: Future) -> None:
+        for i, (items, entry_future) in enumerate(self.entries):
+            if entry_future is future:
+                del self.entries[i]
+                self.size -= len(items)
+                return
+
+    def close(self) -> None:
+        self.closed = True
+        self._full.set()
+        for wake in self._wakers:
+            wake()
+
+    def wait(self, timeout: float) -> None:
+        self._full.wait(timeout)
+
+    async def await_(self, timeout: float) -> None:
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+        self._wakers.append(lambda: loop.call_soon_threadsafe(event.set))
+        if self._full.is_set():
+            return
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except TimeoutError:
+            pass
+
+class _Promotion(NamedTuple):
+    """Handed to a waiting caller when the leader of its batch stopped before settling it."""
+    future: Future
+
+class MicroBatch(DecoratorBase[In, Out]):
+    """
+    Coalesces concurrent calls to a list-in, list-out module into a single call, and splits the output back
+    between the callers. The first caller of a batch waits up to `max_wait_ms` for others to join, or until
+    `max_batch_size` items are queued, then makes the call. Calls with different kwargs are never batched together,
+    apart from per-call state such as `retry_state`, and calls with kwargs that can't be hashed aren't batched.
+    If that caller is cancelled before the batch is settled, one of the others makes the call instead.
+    """
+
+    max_batch_size: int
+    max_wait_ms: float
+
+    _batches: dict[Hashable, _Batch] = PrivateAttr(default_factory=dict)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def __init__(
+        self,
+        bound: Module[In, Out],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5
+    ):
+        if max_batch_size < 1:
+            raise ValueError('max_batch_size must be at least 1.')
+        super().__init__(bound=bound, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+
+    @override
+    def forward(self, data: In, **kwargs) -> Effect[Out]:
+        items = cast(list[Any], data)
+        return Effects.From(
+            invoke=lambda: cast(Out, self._invoke(items, **kwargs)),
+            ainvoke=lambda: self._ainvoke(items, **kwargs)
+        )
+
+    def _invoke(self, data: list[Any], **kwargs) -> list[Any]:
+        key = self._batch_key(kwargs)
+        if key is None or not data:
+            return cast(list[Any], self.bound.invoke(cast(In, data), **kwargs))
+        batch, future, is_leader = self._join(key, data)
+        while True:
+            if is_leader:
+                self._lead(key, batch, future, kwargs)
+            result = future.result()
+            if not isinstance(result, _Promotion):
+                return result
+            future, is_leader = result.future, True
+
+    async def _ainvoke(self, data: list[Any], **kwargs) -> list[Any]:
+        key = self._batch_key(kwargs)
+        if key is None or not data:
+            return cast(list[Any], await self.bound.ainvoke(cast(In, data), **kwargs))
+        batch, future, is_leader = self._join(key, data)
+        while True:
+            if is_leader:
+                await self._alead(key, batch, future, kwargs)
+            try:
+                result = await asyncio.shield(asyncio.wrap_future(future))
+            except asyncio.CancelledError:
+                self._leave(batch, future)
+                raise
+            if not isinstance(result, _Promotion):
+                return result
+            future, is_leader = result.future, True
+
+    def _lead(self, key: Hashable, batch: _Batch, future: Future, kwargs: dict[str, Any]) -> None:
+        try:
+            batch.wait(self.max_wait_ms / 1000)
+            self._close(key, batch)
+            self._run(batch, kwargs)
+        except BaseException:
+            self._close(key, batch)
+            self._hand_over(batch, future)
+            raise
+
+    async def _alead(self, key: Hashable, batch: _Batch, future: Future, kwargs: dict[str, Any]) -> None:
+        try:
+            await batch.await_(self.max_wait_ms / 1000)
+            self._close(key, batch)
+            await self._arun(batch, kwargs)
+        except BaseException:
+            self._close(key, batch)
+            self._hand_over(batch, future)
+            raise
+
+    def _batch_key(self, kwargs: dict[str, Any]) -> Optional[Hashable]:
+        key = tuple(sorted((k, v) for k, v in kwargs.items() if k not in CALL_STATE_KWARGS))
+        try:
+            hash(key)
+        except TypeError as e:
+            logger.debug(f'Calling {self.bound.get_name()} unbatched: {e}')
+            return None
+        return key
+
+    def _join(self, key: Hashable, data: list[Any]) -> tuple[_Batch, Future, bool]:
+        with self._lock:
+            batch = self._batches.get(key)
+            if batch is not None and batch.size + len(data) > self.max_batch_size:
+                del self._batches[key]
+                batch.close()
+                batch = None
+            is_leader = batch is None
+            if batch is None:
+                batch = self._batches[key] = _Batch()
+            future = batch.add(data)
+            if batch.size >= self.max_batch_size:
+                del self._batches[key]
+                batch.close()
+            return batch, future, is_leader
+
+    def _close(self, key: Hashable, batch: _Batch) -> None:
+        with self._lock:
+            if self._batches.get(key) is batch:
+                del self._batches[key]
+            if not batch.closed:
+                batch.close()
+
+    def _hand_over(self, batch: _Batch, future: Future) -> None:
+        """Drop the leader's own entry, and make the next caller in the batch its leader."""
+        with self._lock:
+            batch.remove(future)
+            for i, (items, follower) in enumerate(batch.entries):
+                if not follower.done():
+                    promoted: Future = Future()
+                    batch.entries[i] = (items, promoted)
+                    follower.set_result(_Promotion(promoted))
+                    return
+
+    def _leave(self, batch: _Batch, future: Future) -> None:
+        """Drop the entry of a caller that stopped waiting, passing the batch on if it was just handed to it."""
+        with self._lock:
+            if not future.done():
+                batch.remove(future)
+                return
+        result = future.result()
+        if isinstance(result, _Promotion):
+            self._hand_over(batch, result.future)
+
+    def _run(self, batch: _Batch, kwargs: dict[str, Any]) -> None:
+        entries = self._entries(batch)
+        items = [item for entry, _ in entries for item in entry]
+        try:
+            outputs = self.bound.invoke(cast(In, items), **kwargs)
+        except Exception as e:
+            self._settle(entries, error=e)
+            return
+        self._settle(entries, items=items, outputs=cast(list[Any], outputs))
+
+    async def _arun(self, batch: _Batch, kwargs: dict[str, Any]) -> None:
+        entries = self._entries(batch)
+        items = [item for entry, _ in entries for item in entry]
+        try:
+            outputs = await self.bound.ainvoke(cast(In, items), **kwargs)
+        except Exception as e:
+            self._settle(entries, error=e)
+            return
+        self._settle(entries, items=items, outputs=cast(list[Any], outputs))
+
+    def _entries(self, batch: _Batch) -> list[tuple[list[Any], Future]]:
+        with self._lock:
+            return list(batch.entries)
+
+    def _settle(
+        self,
+        entries: list[tuple[list[Any], Future]],
+        items: Optional[list[Any]] = None,
+        outputs: Optional[list[Any]] = None,
+        error: Optional[Exception] = None
+    ) -> None:
+        if error is None and len(outputs) != len(items):
+            error = ValueError(
+                f'{self.bound.get_name()} returned {len(outputs)} outputs for a batch of {len(items)} inputs.'
+            )
+        if error is not None:
+            for _, future in entries:
+                future.set_exception(error)
+            return
+        groups = unflatten(outputs, (len(entry) for entry, _ in entries))
+        for (_, future), group in zip(entries, groups):
+            future.set_result(group)
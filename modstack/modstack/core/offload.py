@@ -0,0 +1,165 @@
+import asyncio
+from functools import partial
+import logging
+import pickle
+from typing import Any, Literal, Optional, Sequence, override
+from uuid import uuid4
+
+from pydantic import PrivateAttr
+
+from modstack.core import DecoratorBase, Module
+from modstack.typing import Effect, Effects
+from modstack.typing.vars import In, Out
+from modstack.utils.threading import SharedThreadPoolExecutor, get_executor_registry
+
+logger = logging.getLogger(__name__)
+
+ExecutorKind = Literal['thread', 'process']
+
+class Offload(DecoratorBase[In, Out]):
+    """
+    Runs the bound module's `invoke` on a dedicated executor. With the 'thread' kind and `max_workers`, that's a
+    thread pool of its own, so at most `max_workers` calls run at once across all callers. Without `max_workers`,
+    calls run on the shared default pool.
+
+    With the 'process' kind, the module is pickled once into each worker of a managed process pool when the
+    worker starts, so each call only sends the input and the kwargs that can be pickled. Other kwargs, such as
+    callbacks, are dropped. The module's class must be importable by the spawned workers.
+    """
+
+    kind: ExecutorKind
+    max_workers: Optional[int]
+    chunksize: int
+    warm: bool
+
+    _pool_name: str = PrivateAttr()
+    _payload: bytes | None = PrivateAttr(default=None)
+
+    def __init__(
+        self,
+        bound: Module[In, Out],
+        kind: ExecutorKind = 'thread',
+        max_workers: Optional[int] = None,
+        chunksize: int = 1,
+        warm: bool = False
+    ):
+        if kind not in ('thread', 'process'):
+            raise ValueError(f"Unknown executor kind '{kind}'. Expected 'thread' or 'process'.")
+        if chunksize < 1:
+            raise ValueError('chunksize must be at least 1.')
+        super().__init__(
+            bound=bound,
+            kind=kind,
+            max_workers=max_workers,
+            chunksize=chunksize,
+            warm=warm
+        )
+        self._pool_name = f'{bound.get_name()}-{uuid4().hex[:8]}'
+        if kind == 'process':
+            try:
+                self._payload = pickle.dumps(bound)
+            except Exception as e:
+                raise TypeError(
+                    f'Module {bound.get_name()} must be picklable to run in a process pool.'
+                ) from e
+
+    @override
+    def forward(self, data: In, **kwargs) -> Effect[Out]:
+        return Effects.From(
+            invoke=partial(self._invoke, data, **kwargs),
+            ainvoke=partial(self._ainvoke, data, **kwargs)
+        )
+
+    def _invoke(self, data: In, **kwargs) -> Out:
+        if self.kind == 'thread':
+            return self._thread_pool().submit(self.bound.invoke, data, **kwargs).result()
+        return self._process_pool().submit(_invoke_in_worker, data, _sendable(kwargs)).result()
+
+    async def _ainvoke(self, data: In, **kwargs) -> Out:
+        if self.kind == 'thread':
+            return await asyncio.wrap_future(self._thread_pool().submit(self.bound.invoke, data, **kwargs))
+        return await asyncio.wrap_future(
+            self._process_pool().submit(_invoke_in_worker, data, _sendable(kwargs))
+        )
+
+    @override
+    def batch(
+        self,
+        inputs: Sequence[In],
+        max_concurrency: int | None = None,
+        return_exceptions: bool = False,
+        **kwargs
+    ) -> list[Out | Exception]:
+        if self.kind == 'thread':
+            return super().batch(inputs, max_concurrency=max_concurrency, return_exceptions=return_exceptions, **kwargs)
+        futures = [
+            self._process_pool().submit(_invoke_chunk_in_worker, chunk, _sendable(kwargs), return_exceptions)
+            for chunk in self._chunks(inputs)
+        ]
+        return [output for future in futures for output in future.result()]
+
+    @override
+    async def abatch(
+        self,
+        inputs: Sequence[In],
+        max_concurrency: int | None = None,
+        return_exceptions: bool = False,
+        **kwargs
+    ) -> list[Out | Exception]:
+        if self.kind == 'thread':
+            return await super().abatch(inputs, max_concurrency=max_concurrency, return_exceptions=return_exceptions, **kwargs)
+        outputs = await asyncio.gather(*(
+            asyncio.wrap_future(
+                self._process_pool().submit(_invoke_chunk_in_worker, chunk, _sendable(kwargs), return_exceptions)
+            )
+            for chunk in self._chunks(inputs)
+        ))
+        return [output for chunk in outputs for output in chunk]
+
+    def _chunks(self, inputs: Sequence[In]) -> list[list[In]]:
+        return [list(inputs[i:i + self.chunksize]) for i in range(0, len(inputs), self.chunksize)]
+
+    def _thread_pool(self) -> SharedThreadPoolExecutor:
+        if self.max_workers is None:
+            return get_executor_registry().get()
+        return get_executor_registry().get(self._pool_name, max_workers=self.max_workers)
+
+    def _process_pool(self):
+        return get_executor_registry().get_process_pool(
+            self._pool_name,
+            max_workers=self.max_workers,
+            initializer=_init_worker,
+            initargs=(self._payload,),
+            warm=self.warm
+        )
+
+_worker_module: Optional[Module] = None
+
+def _init_worker(payload: bytes) -> None:
+    global _worker_module
+    _worker_module = pickle.loads(payload)
+
+def _invoke_in_worker(data: Any, kwargs: dict[str, Any]) -> Any:
+    return _worker_module.invoke(data, **kwargs)
+
+def _invoke_chunk_in_worker(chunk: list[Any], kwargs: dict[str, Any], return_exceptions: bool) -> list[Any]:
+    outputs = []
+    for data in chunk:
+        try:
+            outputs.append(_worker_module.invoke(data, **kwargs))
+        except Exception as e:
+            if not return_exceptions:
+                raise
+            outputs.append(e)
+    return outputs
+
+def _sendable(kwargs: dict[str, Any]) -> dict[str, Any]:
+    sendable = {}
+    for key, value in kwargs.items():
+        try:
+            pickle.dumps(value)
+        except Exception:
+            logger.debug(f'Not sending kwarg {key} to the process pool, it cannot be pickled.')
+        else:
+            sendable[key] = value
+    return sendable
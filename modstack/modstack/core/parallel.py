@@ -5,7 +5,7 @@ from pydantic import BaseModel
 from modstack.core import Module, ModuleLike, SerializableModule, coerce_to_module
 from modstack.typing import Effect, Effects
 from modstack.typing.vars import In
-from modstack.utils.serialization import create_model
+from modstack.utils.serialization import create_model, json_schema_type
 
 class Parallel(SerializableModule[In, dict[str, Any]]):
     modules: dict[str, Module[In, Any]]
@@ -41,7 +41,7 @@ class Parallel(SerializableModule[In, dict[str, Any]]):
     def forward(self, data: In, **kwargs) -> Effect[dict[str, Any]]:
         return Effects.Parallel(
             {
-                name: module.forward(data, **kwargs)
+                name: module.effect(data, **kwargs)
                 for name, module in self.modules.items()
             },
             max_workers=self.max_workers
@@ -58,16 +58,14 @@ class Parallel(SerializableModule[In, dict[str, Any]]):
     
     @override
     def input_schema(self) -> Type[BaseModel]:
-        if all(
-            module.input_schema().model_json_schema().get('type', 'object') == 'object'
-            for module in self.modules.values()
-        ):
+        schemas = [module.input_schema() for module in self.modules.values()]
+        if all(json_schema_type(schema) == 'object' for schema in schemas):
             return create_model(
-                self.get_name('Input'),
+                self.get_name(suffix='Input'),
                 **{
                     k: (v.annotation, v.default)
-                    for module in self.modules.values()
-                    for k, v in module.input_schema().model_fields.items()
+                    for schema in schemas
+                    for k, v in schema.model_fields.items()
                     if k != '__root__'
                 }
             )
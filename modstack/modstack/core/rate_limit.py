@@ -0,0 +1,59 @@
+from typing import AsyncIterator, Callable, Iterator, Optional, override
+
+from modstack.core import DecoratorBase, Module
+from modstack.typing import Effect, Effects
+from modstack.typing.vars import In, Out
+from modstack.utils.rate_limiting import RateLimiter
+
+class RateLimit(DecoratorBase[In, Out]):
+    """
+    Admits calls to the bound module through a rate limiter, waiting in line rather than failing.
+    Streams hold their concurrency slot until they are exhausted or closed.
+    """
+
+    limiter: RateLimiter
+    token_counter: Optional[Callable[[In], int]]
+
+    def __init__(
+        self,
+        bound: Module[In, Out],
+        limiter: RateLimiter,
+        token_counter: Optional[Callable[[In], int]] = None
+    ):
+        super().__init__(bound=bound, limiter=limiter, token_counter=token_counter)
+
+    @override
+    def forward(self, data: In, **kwargs) -> Effect[Out]:
+        tokens = self._count_tokens(data)
+
+        def _invoke() -> Out:
+            with self.limiter.limit(tokens):
+                return self.bound.invoke(data, **kwargs)
+
+        async def _ainvoke() -> Out:
+            async with self.limiter.alimit(tokens):
+                return await self.bound.ainvoke(data, **kwargs)
+
+        def _iter() -> Iterator[Out]:
+            with self.limiter.limit(tokens):
+                yield from self.bound.iter(data, **kwargs)
+
+        async def _aiter() -> AsyncIterator[Out]:
+            async with self.limiter.alimit(tokens):
+                async for item in self.bound.aiter(data, **kwargs):
+                    yield item
+
+        return Effects.From(
+            invoke=_invoke,
+            ainvoke=_ainvoke,
+            iter_=_iter,
+            aiter_=_aiter
+        )
+
+    def _count_tokens(self, data: In) -> int:
+        if self.limiter.tokens_per_min is None:
+            return 0
+        if self.token_counter is not None:
+            return self.token_counter(data)
+        # rough estimate of ~4 characters per token
+        return len(str(data)) // 4 + 1
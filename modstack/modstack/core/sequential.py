@@ -1,11 +1,12 @@
-from typing import Any, Type, cast, override
+from functools import partial
+from typing import Any, AsyncIterator, Iterator, Type, override
 
 from pydantic import BaseModel, Field
 
 from modstack.core import Module, ModuleLike, SerializableModule, coerce_to_module
 from modstack.core.base import ModuleMapping
-from modstack.core.traits import HasSequentialSchema
-from modstack.typing import Effect
+from modstack.core.traits import HasSequentialSchema, StreamTransformer
+from modstack.typing import Effect, Effects
 from modstack.typing.vars import In, Other, Out
 
 def _seq_input_schema(steps: list[Module]) -> Type[BaseModel]:
@@ -24,6 +25,13 @@ def _seq_output_schema(steps: list[Module]) -> Type[BaseModel]:
         return last.seq_output_schema(_seq_output_schema(steps[:-1]))
     return last.output_schema()
 
+def _stream_source(steps: list[Module]) -> int:
+    """The index of the step that produces the stream, i.e. the last step that can't transform a stream."""
+    for i in range(len(steps) - 1, -1, -1):
+        if not isinstance(steps[i], StreamTransformer):
+            return i
+    return 0
+
 class Sequential(SerializableModule[In, Out]):
     first: Module[In, Any]
     middle: list[Module] = Field(default_factory=list)
@@ -112,14 +120,41 @@ class Sequential(SerializableModule[In, Out]):
         )
 
     def forward(self, data: In, **kwargs) -> Effect[Out]:
-        try:
-            effect = self.steps[0].forward(data, **kwargs)
-            for step in self.steps[1:]:
-                effect = effect.flat_map(lambda out: step.forward(out, **kwargs))
-        except:
-            raise
-        else:
-            return cast(Effect[Out], effect)
+        chain = self._chain(self.steps, data, **kwargs)
+        return Effects.From(
+            invoke=chain.invoke,
+            ainvoke=chain.ainvoke,
+            iter_=partial(self._stream, data, **kwargs),
+            aiter_=partial(self._astream, data, **kwargs)
+        )
+
+    def _stream(self, data: In, **kwargs) -> Iterator[Out]:
+        steps = self.steps
+        source = _stream_source(steps)
+        if source > 0:
+            data = self._chain(steps[:source], data, **kwargs).invoke()
+        chunks = steps[source].iter(data, **kwargs)
+        for step in steps[source + 1:]:
+            chunks = step.transform(chunks, **kwargs)
+        yield from chunks
+
+    async def _astream(self, data: In, **kwargs) -> AsyncIterator[Out]:
+        steps = self.steps
+        source = _stream_source(steps)
+        if source > 0:
+            data = await self._chain(steps[:source], data, **kwargs).ainvoke()
+        chunks = steps[source].aiter(data, **kwargs)
+        for step in steps[source + 1:]:
+            chunks = step.atransform(chunks, **kwargs)
+        async for chunk in chunks:
+            yield chunk
+
+    @staticmethod
+    def _chain(steps: list[Module], data: Any, **kwargs) -> Effect[Any]:
+        return Effects.Chain(
+            steps[0].effect(data, **kwargs),
+            [partial(step.effect, **kwargs) for step in steps[1:]]
+        )
 
     def input_schema(self) -> Type[BaseModel]:
         return _seq_input_schema(self.steps)
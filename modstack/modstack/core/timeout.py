@@ -0,0 +1,108 @@
+import asyncio
+from concurrent import futures
+import time
+from typing import Any, AsyncIterator, Iterator, Optional, override
+
+from modstack.core import DecoratorBase, Module
+from modstack.typing import Effect, Effects
+from modstack.typing.vars import In, Out
+from modstack.utils.deadlines import DeadlineExceeded, check_deadline, deadline, remaining_time
+from modstack.utils.threading import get_executor
+
+_STREAM_DONE = object()
+
+class Timeout(DecoratorBase[In, Out]):
+    """
+    Runs the bound module under a deadline `seconds` from the start of the call, raising `DeadlineExceeded` once
+    it passes. Nested modules see the deadline and stop at their next boundary. Async calls and streams are
+    cancelled. Sync calls, and each chunk of sync streams, run on the shared pool so the caller is released on time,
+    but a thread that is blocked keeps running until it next checks the deadline.
+    """
+
+    seconds: float
+
+    def __init__(self, bound: Module[In, Out], seconds: float):
+        super().__init__(bound=bound, seconds=seconds)
+
+    @override
+    def forward(self, data: In, **kwargs) -> Effect[Out]:
+        return Effects.From(
+            invoke=lambda: self._invoke(data, **kwargs),
+            ainvoke=lambda: self._ainvoke(data, **kwargs),
+            iter_=lambda: self._iter(data, **kwargs),
+            aiter_=lambda: self._aiter(data, **kwargs)
+        )
+
+    def _invoke(self, data: In, **kwargs) -> Out:
+        with deadline(self.seconds), get_executor() as executor:
+            future = executor.submit(self.bound.invoke, data, **kwargs)
+            done, _ = futures.wait([future], timeout=remaining_time())
+            if not done:
+                future.cancel()
+                raise DeadlineExceeded(f'{self.bound.get_name()} timed out after {self.seconds}s.')
+            return future.result()
+
+    async def _ainvoke(self, data: In, **kwargs) -> Out:
+        with deadline(self.seconds):
+            timeout = asyncio.timeout(remaining_time())
+            try:
+                async with timeout:
+                    return await self.bound.ainvoke(data, **kwargs)
+            except TimeoutError:
+                if timeout.expired():
+                    raise DeadlineExceeded(f'{self.bound.get_name()} timed out after {self.seconds}s.') from None
+                raise
+
+    def _iter(self, data: In, **kwargs) -> Iterator[Out]:
+        # the deadline is only set while the stream is running, not while the consumer holds a chunk
+        expires = time.monotonic() + self.seconds
+        iterator = iter(self.bound.iter(data, **kwargs))
+        pending: Optional[futures.Future] = None
+        try:
+            with get_executor() as executor:
+                while True:
+                    with deadline(expires - time.monotonic()):
+                        check_deadline()
+                        # pull the chunk on the pool, so a `next` that blocks can't hold the caller past the deadline
+                        pending = executor.submit(next, iterator, _STREAM_DONE)
+                        done, _ = futures.wait([pending], timeout=remaining_time())
+                        if not done:
+                            raise DeadlineExceeded(f'{self.bound.get_name()} timed out after {self.seconds}s.')
+                        item = pending.result()
+                    if item is _STREAM_DONE:
+                        return
+                    yield item
+        finally:
+            if pending is None:
+                _close(iterator)
+            else:
+                # a generator can't be closed while another thread is running it, so wait for the chunk to arrive
+                pending.cancel()
+                pending.add_done_callback(lambda _: _close(iterator))
+
+    async def _aiter(self, data: In, **kwargs) -> AsyncIterator[Out]:
+        expires = time.monotonic() + self.seconds
+        iterator = aiter(self.bound.aiter(data, **kwargs))
+        try:
+            while True:
+                with deadline(expires - time.monotonic()):
+                    timeout = asyncio.timeout(remaining_time())
+                    try:
+                        async with timeout:
+                            item = await anext(iterator)
+                    except StopAsyncIteration:
+                        return
+                    except TimeoutError:
+                        if timeout.expired():
+                            raise DeadlineExceeded(
+                                f'{self.bound.get_name()} timed out after {self.seconds}s.'
+                            ) from None
+                        raise
+                yield item
+        finally:
+            if hasattr(iterator, 'aclose'):
+                await iterator.aclose()
+
+def _close(iterator: Iterator[Any]) -> None:
+    if hasattr(iterator, 'close'):
+        iterator.close()
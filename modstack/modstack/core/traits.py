@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Type
+from typing import Any, AsyncIterator, Iterator, Type
 
 from pydantic import BaseModel
 
@@ -10,4 +10,18 @@ class HasSequentialSchema(ABC):
 
     @abstractmethod
     def seq_output_schema(self, prev_schema: Type[BaseModel]) -> Type[BaseModel]:
-        pass
\ No newline at end of file
+        pass
+
+class StreamTransformer(ABC):
+    """
+    A module that can consume its input as a stream of chunks, emitting output chunks as soon as it can.
+    Sequential pipes chunks through trailing stream transformers lazily instead of waiting for the full input.
+    """
+
+    @abstractmethod
+    def transform(self, chunks: Iterator[Any], **kwargs) -> Iterator[Any]:
+        pass
+
+    @abstractmethod
+    def atransform(self, chunks: AsyncIterator[Any], **kwargs) -> AsyncIterator[Any]:
+        pass
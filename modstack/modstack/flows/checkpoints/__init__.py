@@ -7,4 +7,5 @@ from .base import (
     Checkpointer
 )
 from .memory import MemoryCheckpointer
-from .sqlite import SqliteCheckpointer
\ No newline at end of file
+from .sqlite import SqliteCheckpointer
+from .writer import AsyncCheckpointWriter, CheckpointWrite, CheckpointWriter
\ No newline at end of file
@@ -5,7 +5,7 @@ Credit to LangGraph - https://github.com/langchain-ai/langgraph/tree/main/langgr
 from abc import ABC, abstractmethod
 from collections import defaultdict
 from enum import StrEnum
-from typing import Any, AsyncIterator, Iterator, Literal, NamedTuple, NotRequired, Optional, Protocol, TypedDict
+from typing import Any, AsyncIterator, Iterator, Literal, NamedTuple, NotRequired, Optional, Protocol, Sequence, TypedDict
 
 from modstack.flows import Send
 from modstack.flows.channels import Channel
@@ -84,8 +84,15 @@ class Checkpoint(TypedDict):
     pending_sends: list[Send]
 
 class CheckpointAt(StrEnum):
+    """
+    When a flow saves checkpoints.
+    - "end_of_step": After every `every_n_steps` steps, and when the run stops.
+    - "end_of_run": Only when the run stops, because it finished or reached an interrupt.
+    - "interrupt": Only when the run stops at an interrupt, so it can be resumed.
+    """
     END_OF_STEP = 'end_of_step'
     END_OF_RUN = 'end_of_run'
+    INTERRUPT = 'interrupt'
 
 class CheckpointSerializer(Protocol):
     def loads(self, bytes_: bytes) -> Any:
@@ -101,6 +108,12 @@ class SavedCheckpoint(NamedTuple):
 
 class Checkpointer(ABC):
     at: CheckpointAt = CheckpointAt.END_OF_STEP
+    every_n_steps: int = 1
+    """With `at` set to the end of each step, save a checkpoint only every `every_n_steps` steps."""
+    max_pending_writes: int = 16
+    """How many checkpoints a run can queue for saving in the background before it waits for them."""
+    coalesce_writes: bool = False
+    """Whether a checkpoint queued for saving is dropped when a newer one of the same thread is queued."""
     serde: CheckpointSerializer
 
     @property
@@ -110,10 +123,28 @@ class Checkpointer(ABC):
     def __init__(
         self,
         at: CheckpointAt | None = None,
-        serde: CheckpointSerializer | None = None
+        serde: CheckpointSerializer | None = None,
+        every_n_steps: int | None = None,
+        max_pending_writes: int | None = None,
+        coalesce_writes: bool | None = None
     ):
+        if every_n_steps is not None and every_n_steps < 1:
+            raise ValueError('every_n_steps must be at least 1.')
+        if max_pending_writes is not None and max_pending_writes < 1:
+            raise ValueError('max_pending_writes must be at least 1.')
         self.at = at or self.at
         self.serde = serde or self.serde
+        self.every_n_steps = every_n_steps or self.every_n_steps
+        self.max_pending_writes = max_pending_writes or self.max_pending_writes
+        self.coalesce_writes = coalesce_writes if coalesce_writes is not None else self.coalesce_writes
+
+    def should_put(self, unsaved_steps: int) -> bool:
+        """Whether to save a checkpoint at the end of a step, given the number of steps since the last saved one, including this one."""
+        return self.at == CheckpointAt.END_OF_STEP and unsaved_steps >= self.every_n_steps
+
+    def should_put_on_exit(self, interrupted: bool) -> bool:
+        """Whether to save the latest unsaved checkpoint when a run stops, either because it finished or at an interrupt."""
+        return self.at != CheckpointAt.INTERRUPT or interrupted
 
     @abstractmethod
     def get_many(
@@ -161,6 +192,14 @@ class Checkpointer(ABC):
     ) -> dict[str, Any]:
         pass
 
+    def put_many(self, writes: Sequence[tuple[Checkpoint, CheckpointMetadata, dict[str, Any]]]) -> list[dict[str, Any]]:
+        """Save checkpoints in order. Override to save them in a single transaction."""
+        return [self.put(checkpoint, metadata, **config) for checkpoint, metadata, config in writes]
+
+    async def aput_many(self, writes: Sequence[tuple[Checkpoint, CheckpointMetadata, dict[str, Any]]]) -> list[dict[str, Any]]:
+        """Save checkpoints in order. Override to save them in a single transaction."""
+        return [await self.aput(checkpoint, metadata, **config) for checkpoint, metadata, config in writes]
+
     def get_next_version[V: (int, float, str)](
         self,
         current: Optional[V],
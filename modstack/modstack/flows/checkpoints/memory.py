@@ -5,7 +5,7 @@ Credit to LangGraph - https://github.com/langchain-ai/langgraph/tree/main/langgr
 from collections import defaultdict
 from typing import Any, AsyncIterator, Iterator, Optional
 
-from modstack.flows.checkpoints import Checkpoint, CheckpointMetadata, SavedCheckpoint, Checkpointer
+from modstack.flows.checkpoints import Checkpoint, CheckpointAt, CheckpointMetadata, SavedCheckpoint, Checkpointer
 from modstack.flows.serde import SerializerProtocol
 
 class MemoryCheckpointer(Checkpointer):
@@ -20,6 +20,8 @@ class MemoryCheckpointer(Checkpointer):
 
     Args:
         serde (Optional[SerializerProtocol]): The serializer to use for serializing and deserializing checkpoints. Defaults to None.
+        at (Optional[CheckpointAt]): When to save checkpoints. Defaults to the end of every step.
+        every_n_steps (Optional[int]): With `CheckpointAt.END_OF_STEP`, how many steps to run between checkpoints. Defaults to 1.
     """
 
     storage: dict[str, dict[str, tuple[bytes, bytes]]]
@@ -27,9 +29,11 @@ class MemoryCheckpointer(Checkpointer):
     def __init__(
         self,
         *,
-        serde: SerializerProtocol | None = None
+        serde: SerializerProtocol | None = None,
+        at: CheckpointAt | None = None,
+        every_n_steps: int | None = None
     ):
-        super().__init__(serde=serde)
+        super().__init__(at=at, serde=serde, every_n_steps=every_n_steps)
         self.storage = defaultdict(dict)
 
     def get_many(
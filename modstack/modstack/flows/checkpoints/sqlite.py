@@ -6,18 +6,19 @@ https://github.com/langchain-ai/langgraph/tree/main/langgraph/checkpoints/aiosql
 
 import asyncio
 from contextlib import AbstractAsyncContextManager, AbstractContextManager, contextmanager
-from hashlib import md5
 import json
+import random
 import sqlite3
 import threading
 from types import TracebackType
-from typing import Any, AsyncIterator, Iterator, Optional, Self, Sequence, Type
+from typing import Any, AsyncIterator, Iterator, NamedTuple, Optional, Self, Sequence, Type
 
 import aiosqlite
 
-from modstack.flows.channels import Channel, EmptyChannelError
-from modstack.flows.checkpoints import Checkpoint, CheckpointMetadata, SavedCheckpoint, Checkpointer
+from modstack.flows.channels import Channel
+from modstack.flows.checkpoints import Checkpoint, CheckpointAt, CheckpointMetadata, SavedCheckpoint, Checkpointer
 from modstack.flows.serde import SerializerProtocol
+from modstack.flows.utils.checkpoints import apply_checkpoint_delta, create_checkpoint_delta
 
 SETUP_SCRIPT = """
     PRAGMA journal_mode=WAL;
@@ -25,38 +26,74 @@ SETUP_SCRIPT = """
         thread_id TEXT NOT NULL,
         thread_ts TEXT NOT NULL,
         parent_ts TEXT,
+        base_ts TEXT,
         checkpoint BLOB,
         metadata BLOB,
         PRIMARY KEY (thread_id, thread_ts)
     );
 """
 
+# databases created before delta checkpoints lack base_ts. Their rows are all full snapshots, which a NULL base_ts means
+MIGRATE_BASE_TS_SCRIPT = "ALTER TABLE checkpoints ADD COLUMN base_ts TEXT"
+
+INSERT_SCRIPT = """
+    INSERT OR REPLACE INTO checkpoints
+    (thread_id, thread_ts, parent_ts, base_ts, checkpoint, metadata) VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+class _ThreadHead(NamedTuple):
+    """The last checkpoint written for a thread, which the next one can be stored as a delta against."""
+    thread_ts: str
+    base_ts: str
+    channel_versions: dict[str, Any]
+    depth: int
+
 class SqliteCheckpointer(Checkpointer, AbstractContextManager, AbstractAsyncContextManager):
+    """
+    A checkpointer backed by SQLite.
+
+    With a `snapshot_interval` above 1, only every `snapshot_interval`-th checkpoint of a thread is stored in full.
+    The ones in between only store the values of channels whose version changed since their parent, and are
+    restored by replaying them on top of the last full snapshot when read.
+    """
+
     conn: sqlite3.Connection
     async_conn: aiosqlite.Connection
     lock: threading.Lock
     async_lock: asyncio.Lock
     is_setup: bool
+    snapshot_interval: int
+    random_versions: bool
 
     def __init__(
         self,
         conn: sqlite3.Connection,
         async_conn: aiosqlite.Connection,
         *,
-        serde: Optional[SerializerProtocol] = None
+        serde: Optional[SerializerProtocol] = None,
+        at: Optional[CheckpointAt] = None,
+        every_n_steps: Optional[int] = None,
+        snapshot_interval: int = 1,
+        random_versions: bool = True
     ):
-        super().__init__(serde=serde)
+        if snapshot_interval < 1:
+            raise ValueError('snapshot_interval must be at least 1.')
+        super().__init__(at=at, serde=serde, every_n_steps=every_n_steps)
         self.conn = conn
         self.async_conn = async_conn
         self.lock = threading.Lock()
         self.async_lock = asyncio.Lock()
         self.is_setup = False
+        self.snapshot_interval = snapshot_interval
+        self.random_versions = random_versions
+        self._heads: dict[str, _ThreadHead] = {}
 
     @classmethod
-    def from_conn_string(cls, conn_string: str) -> Self:
+    def from_conn_string(cls, conn_string: str, *, snapshot_interval: int = 1) -> Self:
         return cls(
             sqlite3.Connection(conn_string, check_same_thread=False),
-            aiosqlite.connect(conn_string)
+            aiosqlite.connect(conn_string),
+            snapshot_interval=snapshot_interval
         )
 
     def __enter__(self) -> Self:
@@ -116,6 +153,10 @@ class SqliteCheckpointer(Checkpointer, AbstractContextManager, AbstractAsyncCont
         if self.is_setup:
             return
         self.conn.executescript(SETUP_SCRIPT)
+        columns = self.conn.execute('PRAGMA table_info(checkpoints)').fetchall()
+        if not _has_column(columns, 'base_ts'):
+            with self.conn:
+                self.conn.execute(MIGRATE_BASE_TS_SCRIPT)
         self.is_setup = True
 
     async def asetup(self) -> None:
@@ -126,6 +167,11 @@ class SqliteCheckpointer(Checkpointer, AbstractContextManager, AbstractAsyncCont
                 await self.async_conn
             async with self.async_conn.executescript(SETUP_SCRIPT):
                 await self.async_conn.commit()
+            async with self.async_conn.execute('PRAGMA table_info(checkpoints)') as cursor:
+                columns = await cursor.fetchall()
+            if not _has_column(columns, 'base_ts'):
+                await self.async_conn.execute(MIGRATE_BASE_TS_SCRIPT)
+                await self.async_conn.commit()
             self.is_setup = True
 
     def get_many(
@@ -137,7 +183,7 @@ class SqliteCheckpointer(Checkpointer, AbstractContextManager, AbstractAsyncCont
     ) -> Iterator[SavedCheckpoint]:
         where, param_values = _search_where(filters, **kwargs)
         query = f"""
-            SELECT thread_id, thread_ts, checkpoint, metadata
+            SELECT thread_id, thread_ts, parent_ts, base_ts, checkpoint, metadata
             FROM checkpoints
             {where}
             ORDER BY thread_ts DESC
@@ -146,9 +192,10 @@ class SqliteCheckpointer(Checkpointer, AbstractContextManager, AbstractAsyncCont
             query += f' LIMIT {limit}'
         with self.cursor(transaction=False) as cursor:
             cursor.execute(query, param_values)
-            for thread_id, thread_ts, checkpoint, metadata in cursor:
+            rows = cursor.fetchall()
+            for thread_id, thread_ts, parent_ts, base_ts, checkpoint, metadata in rows:
                 yield SavedCheckpoint(
-                    self.serde.loads(checkpoint),
+                    self._restore(cursor, thread_id, thread_ts, parent_ts, base_ts, checkpoint),
                     self.serde.loads(metadata) if metadata is not None else {},
                     {
                         'thread_id': thread_id,
@@ -166,7 +213,7 @@ class SqliteCheckpointer(Checkpointer, AbstractContextManager, AbstractAsyncCont
         await self.asetup()
         where, param_values = _search_where(filters, **kwargs)
         query = f"""
-            SELECT thread_id, thread_ts, checkpoint, metadata
+            SELECT thread_id, thread_ts, parent_ts, base_ts, checkpoint, metadata
             FROM checkpoints
             {where}
             ORDER BY thread_ts DESC
@@ -174,22 +221,23 @@ class SqliteCheckpointer(Checkpointer, AbstractContextManager, AbstractAsyncCont
         if limit:
             query += f' LIMIT {limit}'
         async with self.async_conn.execute(query, param_values) as cursor:
-            async for thread_id, thread_ts, checkpoint, metadata in cursor:
-                yield SavedCheckpoint(
-                    self.serde.loads(checkpoint),
-                    self.serde.loads(metadata) if metadata is not None else {},
-                    {
-                        'thread_id': thread_id,
-                        'thread_ts': thread_ts
-                    }
-                )
+            rows = await cursor.fetchall()
+        for thread_id, thread_ts, parent_ts, base_ts, checkpoint, metadata in rows:
+            yield SavedCheckpoint(
+                await self._arestore(thread_id, thread_ts, parent_ts, base_ts, checkpoint),
+                self.serde.loads(metadata) if metadata is not None else {},
+                {
+                    'thread_id': thread_id,
+                    'thread_ts': thread_ts
+                }
+            )
 
     def get(self, **kwargs) -> Optional[SavedCheckpoint]:
         with self.cursor(transaction=False) as cursor:
             if kwargs.get('thread_ts'):
                 cursor.execute(
                     f"""
-                        SELECT parent_ts, checkpoint, metadata 
+                        SELECT thread_id, thread_ts, parent_ts, base_ts, checkpoint, metadata
                         FROM checkpoints
                         WHERE thread_id = ? and thread_ts = ?
                     """,
@@ -197,27 +245,27 @@ class SqliteCheckpointer(Checkpointer, AbstractContextManager, AbstractAsyncCont
                 )
                 if value := cursor.fetchone():
                     return SavedCheckpoint(
-                        self.serde.loads(value[1]),
-                        self.serde.loads(value[2]) if value[2] is not None else {},
+                        self._restore(cursor, *value[:5]),
+                        self.serde.loads(value[5]) if value[5] is not None else {},
                         {
                             'thread_id': kwargs['thread_id'],
-                            'thread_ts': value[0]
-                        } if value[0] else None
+                            'thread_ts': value[2]
+                        } if value[2] else None
                     )
             else:
                 cursor.execute(
                     f"""
-                        SELECT thread_id, thread_ts, parent_ts, checkpoint, metadata
+                        SELECT thread_id, thread_ts, parent_ts, base_ts, checkpoint, metadata
                         FROM checkpoints
                         WHERE thread_id = ?
-                        ORDER BY DESC
+                        ORDER BY thread_ts DESC
                         LIMIT 1
                     """,
                     (str(kwargs['thread_id']),)
                 )
                 if value := cursor.fetchone():
                     return SavedCheckpoint(
-                        self.serde.loads(value[4]),
+                        self._restore(cursor, *value[:5]),
                         self.serde.loads(value[5]) if value[5] is not None else {},
                         {
                             'thread_id': value[0],
@@ -231,42 +279,44 @@ class SqliteCheckpointer(Checkpointer, AbstractContextManager, AbstractAsyncCont
         if kwargs.get('thread_ts', None):
             async with self.async_conn.execute(
                 f"""
-                    SELECT parent_ts, checkpoint, metadata 
+                    SELECT thread_id, thread_ts, parent_ts, base_ts, checkpoint, metadata
                     FROM checkpoints
                     WHERE thread_id = ? and thread_ts = ?
                 """,
                 (str(kwargs['thread_id']), kwargs['thread_ts'])
             ) as cursor:
-                if value := await cursor.fetchone():
-                    return SavedCheckpoint(
-                        self.serde.loads(value[1]),
-                        self.serde.loads(value[2]) if value[2] is not None else {},
-                        {
-                            'thread_id': kwargs['thread_id'],
-                            'thread_ts': value[0]
-                        } if value[0] else None
-                    )
+                value = await cursor.fetchone()
+            if value:
+                return SavedCheckpoint(
+                    await self._arestore(*value[:5]),
+                    self.serde.loads(value[5]) if value[5] is not None else {},
+                    {
+                        'thread_id': kwargs['thread_id'],
+                        'thread_ts': value[2]
+                    } if value[2] else None
+                )
         else:
             async with self.async_conn.execute(
                 f"""
-                    SELECT thread_id, thread_ts, parent_ts, checkpoint, metadata
+                    SELECT thread_id, thread_ts, parent_ts, base_ts, checkpoint, metadata
                     FROM checkpoints
                     WHERE thread_id = ?
-                    ORDER BY DESC
+                    ORDER BY thread_ts DESC
                     LIMIT 1
                 """,
                 (str(kwargs['thread_id']),)
             ) as cursor:
-                if value := await cursor.fetchone():
-                    return SavedCheckpoint(
-                        self.serde.loads(value[3]),
-                        self.serde.loads(value[4]) if value[4] is not None else {},
-                        {
-                            'thread_id': value[0],
-                            'thread_ts': value[1],
-                            'parent_ts': value[2]
-                        } if value[2] else None
-                    )
+                value = await cursor.fetchone()
+            if value:
+                return SavedCheckpoint(
+                    await self._arestore(*value[:5]),
+                    self.serde.loads(value[5]) if value[5] is not None else {},
+                    {
+                        'thread_id': value[0],
+                        'thread_ts': value[1],
+                        'parent_ts': value[2]
+                    } if value[2] else None
+                )
 
     def put(
         self,
@@ -274,24 +324,7 @@ class SqliteCheckpointer(Checkpointer, AbstractContextManager, AbstractAsyncCont
         metadata: CheckpointMetadata,
         **kwargs
     ) -> dict[str, Any]:
-        with self.lock, self.cursor() as cursor:
-            cursor.execute(
-                f"""
-                    INSERT OR REPLACE INTO checkpoints 
-                    (thread_id, thread_ts, parent_ts, checkpoint, metadata) (?, ?, ?, ?, ?)
-                """,
-                (
-                    str(kwargs['thread_id']),
-                    checkpoint['id'],
-                    kwargs.get('thread_ts', None),
-                    self.serde.dumps(kwargs['checkpoint']),
-                    self.serde.dumps(kwargs.get('metadata', {}))
-                )
-            )
-        return {
-            'thread_id': kwargs['thread_id'],
-            'thread_ts': checkpoint['id']
-        }
+        return self.put_many([(checkpoint, metadata, kwargs)])[0]
 
     async def aput(
         self,
@@ -299,41 +332,187 @@ class SqliteCheckpointer(Checkpointer, AbstractContextManager, AbstractAsyncCont
         metadata: CheckpointMetadata,
         **kwargs
     ) -> dict[str, Any]:
+        return (await self.aput_many([(checkpoint, metadata, kwargs)]))[0]
+
+    def put_many(self, writes: Sequence[tuple[Checkpoint, CheckpointMetadata, dict[str, Any]]]) -> list[dict[str, Any]]:
+        """Save checkpoints in order, in a single transaction."""
+        self.setup()
+        with self.lock:
+            rows, heads = self._prepare_rows(writes)
+            with self.conn:
+                self.conn.executemany(INSERT_SCRIPT, rows)
+            self._heads.update(heads)
+        return [
+            {
+                'thread_id': config['thread_id'],
+                'thread_ts': checkpoint['id']
+            }
+            for checkpoint, _, config in writes
+        ]
+
+    async def aput_many(self, writes: Sequence[tuple[Checkpoint, CheckpointMetadata, dict[str, Any]]]) -> list[dict[str, Any]]:
+        """Save checkpoints in order, in a single transaction."""
         await self.asetup()
-        async with self.async_conn.execute(
-            f"""
-                INSERT OR REPLACE INTO checkpoints 
-                (thread_id, thread_ts, parent_ts, checkpoint, metadata) (?, ?, ?, ?, ?)
-            """,
-            (
-                str(kwargs['thread_id']),
-                checkpoint['id'],
-                kwargs.get('thread_ts', None),
-                self.serde.dumps(kwargs['checkpoint']),
-                self.serde.dumps(kwargs.get('metadata', {}))
+        # tasks share the connection, so a transaction must not interleave with another's
+        async with self.async_lock:
+            with self.lock:
+                rows, heads = self._prepare_rows(writes)
+            try:
+                await self.async_conn.executemany(INSERT_SCRIPT, rows)
+                await self.async_conn.commit()
+            except BaseException:
+                await self.async_conn.rollback()
+                raise
+            with self.lock:
+                self._heads.update(heads)
+        return [
+            {
+                'thread_id': config['thread_id'],
+                'thread_ts': checkpoint['id']
+            }
+            for checkpoint, _, config in writes
+        ]
+
+    def _prepare_rows(
+        self,
+        writes: Sequence[tuple[Checkpoint, CheckpointMetadata, dict[str, Any]]]
+    ) -> tuple[list[tuple[Any, ...]], dict[str, _ThreadHead]]:
+        """
+        Serialize checkpoints for insertion, and the heads of their threads to record once they're written.
+        Must be called with the lock held.
+        """
+        rows: list[tuple[Any, ...]] = []
+        heads: dict[str, _ThreadHead] = {}
+        for checkpoint, metadata, config in writes:
+            thread_id = str(config['thread_id'])
+            parent_ts = config.get('thread_ts', None)
+            stored, head = self._prepare_put(
+                heads.get(thread_id, self._heads.get(thread_id)),
+                parent_ts,
+                checkpoint
             )
+            heads[thread_id] = head
+            rows.append((
+                thread_id,
+                checkpoint['id'],
+                parent_ts,
+                head.base_ts if head.depth > 0 else None,
+                self.serde.dumps(stored),
+                self.serde.dumps(metadata)
+            ))
+        return rows, heads
+
+    def _prepare_put(
+        self,
+        head: Optional[_ThreadHead],
+        parent_ts: Optional[str],
+        checkpoint: Checkpoint
+    ) -> tuple[Checkpoint, _ThreadHead]:
+        """
+        Decide how to store a checkpoint: as a delta against its parent, if the parent is the last checkpoint
+        written for the thread and the snapshot interval isn't reached, and as a full snapshot otherwise.
+        Returns what to store, and the head of the thread once it's written.
+        """
+        versions = dict(checkpoint['channel_versions'])
+        if (
+            head is not None
+            and parent_ts is not None
+            and head.thread_ts == parent_ts
+            and head.depth + 1 < self.snapshot_interval
         ):
-            await self.async_conn.commit()
-        return {
-            'thread_id': kwargs['thread_id'],
-            'thread_ts': checkpoint['id']
-        }
+            return (
+                create_checkpoint_delta(checkpoint, head.channel_versions),
+                _ThreadHead(checkpoint['id'], head.base_ts, versions, head.depth + 1)
+            )
+        return checkpoint, _ThreadHead(checkpoint['id'], checkpoint['id'], versions, 0)
+
+    def _restore(
+        self,
+        cursor: sqlite3.Cursor,
+        thread_id: str,
+        thread_ts: str,
+        parent_ts: Optional[str],
+        base_ts: Optional[str],
+        checkpoint: bytes
+    ) -> Checkpoint:
+        if base_ts is None:
+            return self.serde.loads(checkpoint)
+        cursor.execute(
+            """
+                SELECT thread_ts, parent_ts, checkpoint
+                FROM checkpoints
+                WHERE thread_id = ? AND thread_ts >= ? AND thread_ts < ?
+            """,
+            (thread_id, base_ts, thread_ts)
+        )
+        return _restore_delta(self.serde, checkpoint, parent_ts, base_ts, cursor.fetchall())
+
+    async def _arestore(
+        self,
+        thread_id: str,
+        thread_ts: str,
+        parent_ts: Optional[str],
+        base_ts: Optional[str],
+        checkpoint: bytes
+    ) -> Checkpoint:
+        if base_ts is None:
+            return self.serde.loads(checkpoint)
+        async with self.async_conn.execute(
+            """
+                SELECT thread_ts, parent_ts, checkpoint
+                FROM checkpoints
+                WHERE thread_id = ? AND thread_ts >= ? AND thread_ts < ?
+            """,
+            (thread_id, base_ts, thread_ts)
+        ) as cursor:
+            rows = await cursor.fetchall()
+        return _restore_delta(self.serde, checkpoint, parent_ts, base_ts, rows)
 
     def get_next_version(
         self,
         current: Optional[str],
         channel: Channel
     ) -> str:
-        if current is None:
-            current_version = 0
-        else:
-            current_version = current.split('.')[0]
+        """
+        A zero-padded counter, so versions sort as strings, followed by a random suffix unless `random_versions`
+        is off. The suffix keeps versions from different branches of a thread apart without having to serialize
+        and hash the channel's value on every update.
+        """
+        current_version = int(current.split('.')[0]) if current else 0
         next_version = current_version + 1
-        try:
-            next_hash = md5(self.serde.dumps(channel.checkpoint())).hexdigest()
-        except EmptyChannelError:
-            next_hash = ''
-        return f'{next_version:032}.{next_hash}'
+        if not self.random_versions:
+            return f'{next_version:032}'
+        return f'{next_version:032}.{random.random():016}'
+
+def _has_column(table_info: Sequence[Sequence[Any]], name: str) -> bool:
+    # rows of `PRAGMA table_info` are (cid, name, type, notnull, dflt_value, pk)
+    return any(row[1] == name for row in table_info)
+
+def _restore_delta(
+    serde: SerializerProtocol,
+    checkpoint: bytes,
+    parent_ts: str,
+    base_ts: str,
+    rows: Sequence[tuple[str, Optional[str], bytes]]
+) -> Checkpoint:
+    """
+    Restore a delta checkpoint from the rows stored between its base snapshot and itself. Rows from other
+    branches of the thread may be among them, so only the chain of parents leading to the checkpoint is replayed.
+    """
+    by_ts = {ts: (parent, blob) for ts, parent, blob in rows}
+    chain: list[bytes] = []
+    ts = parent_ts
+    while ts != base_ts:
+        if ts not in by_ts:
+            raise ValueError(f'Checkpoint {ts} is missing, so a checkpoint based on {base_ts} cannot be restored.')
+        ts, blob = by_ts[ts]
+        chain.append(blob)
+    if base_ts not in by_ts:
+        raise ValueError(f'Snapshot {base_ts} is missing, so a checkpoint based on it cannot be restored.')
+    restored: Checkpoint = serde.loads(by_ts[base_ts][1])
+    for blob in reversed(chain):
+        restored = apply_checkpoint_delta(restored, serde.loads(blob))
+    return apply_checkpoint_delta(restored, serde.loads(checkpoint))
 
 def _metadata_predicate(filters: dict[str, Any]) -> tuple[Sequence[str], Sequence[Any]]:
     """
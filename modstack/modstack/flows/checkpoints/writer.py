@@ -0,0 +1,187 @@
+import asyncio
+from collections import deque
+from concurrent.futures import Executor
+import threading
+from typing import Any, NamedTuple, Optional
+
+from modstack.flows.checkpoints import Checkpoint, CheckpointMetadata, Checkpointer
+from modstack.utils.threading import get_executor_registry
+
+CHECKPOINT_EXECUTOR = 'checkpoints'
+
+class CheckpointWrite(NamedTuple):
+    checkpoint: Checkpoint
+    metadata: CheckpointMetadata
+    config: dict[str, Any]
+
+class _WriteQueues:
+    """The checkpoints waiting to be written, by thread."""
+
+    def __init__(self, max_pending: int, coalesce: bool):
+        if max_pending < 1:
+            raise ValueError('max_pending must be at least 1.')
+        self.max_pending = max_pending
+        self.coalesce = coalesce
+        self.pending = 0
+        self.error: Optional[BaseException] = None
+        self._queues: dict[str, deque[CheckpointWrite]] = {}
+        self._writing: set[str] = set()
+
+    @property
+    def idle(self) -> bool:
+        return self.pending == 0 and not self._writing
+
+    def can_coalesce(self, key: str) -> bool:
+        return self.coalesce and bool(self._queues.get(key))
+
+    def add(self, key: str, write: CheckpointWrite) -> bool:
+        """Queue a write, and return whether a writer has to be started for the thread."""
+        queue = self._queues.setdefault(key, deque())
+        if self.coalesce and queue:
+            # the queued checkpoint is superseded, so save this one in its place, as a child of its parent
+            dropped = queue.pop()
+            config = {k: v for k, v in write.config.items() if k != 'thread_ts'}
+            if 'thread_ts' in dropped.config:
+                config['thread_ts'] = dropped.config['thread_ts']
+            write = CheckpointWrite(write.checkpoint, write.metadata, config)
+        else:
+            self.pending += 1
+        queue.append(write)
+        if key in self._writing:
+            return False
+        self._writing.add(key)
+        return True
+
+    def take(self, key: str) -> list[CheckpointWrite]:
+        """Everything queued for the thread, or nothing once its writer can stop."""
+        queue = self._queues.get(key)
+        if not queue:
+            self._queues.pop(key, None)
+            self._writing.discard(key)
+            return []
+        batch = list(queue)
+        queue.clear()
+        return batch
+
+    def done(self, batch: list[CheckpointWrite], error: Optional[BaseException]) -> None:
+        self.pending -= len(batch)
+        if error is not None and self.error is None:
+            self.error = error
+
+    def abandon(self, key: str, error: BaseException) -> None:
+        """Give up on the thread's queued checkpoints, e.g. when its writer is cancelled."""
+        self.done(list(self._queues.pop(key, ())), error)
+        self._writing.discard(key)
+
+    def pop_error(self) -> Optional[BaseException]:
+        error, self.error = self.error, None
+        return error
+
+class CheckpointWriter:
+    """
+    Saves checkpoints in the background, with a single writer per thread so a thread's checkpoints are saved in
+    order. Checkpoints queued while a write is in flight are saved together, with `Checkpointer.put_many`.
+    With `coalesce`, a queued checkpoint is dropped when a newer one of the same thread is submitted.
+    `submit` blocks while `max_pending` checkpoints are waiting, and `flush` waits for all of them to be saved.
+    """
+
+    def __init__(
+        self,
+        checkpointer: Checkpointer,
+        max_pending: int = 16,
+        coalesce: bool = False,
+        executor: Optional[Executor] = None
+    ):
+        self.checkpointer = checkpointer
+        # writes get their own pool, so they can't be starved by the tasks that wait for queue space
+        self._executor = executor or get_executor_registry().get(CHECKPOINT_EXECUTOR)
+        self._queues = _WriteQueues(max_pending, coalesce)
+        self._condition = threading.Condition()
+
+    def submit(self, checkpoint: Checkpoint, metadata: CheckpointMetadata, **kwargs) -> None:
+        key = str(kwargs.get('thread_id'))
+        with self._condition:
+            if not self._queues.can_coalesce(key):
+                self._condition.wait_for(lambda: self._queues.pending < self._queues.max_pending)
+            start = self._queues.add(key, CheckpointWrite(checkpoint, metadata, kwargs))
+        if start:
+            self._executor.submit(self._write, key)
+
+    def flush(self) -> None:
+        """Wait for every submitted checkpoint to be saved, and raise the first error any write failed with."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._queues.idle)
+            error = self._queues.pop_error()
+        if error is not None:
+            raise error
+
+    def _write(self, key: str) -> None:
+        while True:
+            with self._condition:
+                batch = self._queues.take(key)
+                if not batch:
+                    self._condition.notify_all()
+                    return
+            error = None
+            try:
+                self.checkpointer.put_many(batch)
+            except BaseException as e:
+                error = e
+            with self._condition:
+                self._queues.done(batch, error)
+                self._condition.notify_all()
+
+class AsyncCheckpointWriter:
+    """Like `CheckpointWriter`, but saves checkpoints with `Checkpointer.aput_many` in tasks on the running loop."""
+
+    def __init__(
+        self,
+        checkpointer: Checkpointer,
+        max_pending: int = 16,
+        coalesce: bool = False
+    ):
+        self.checkpointer = checkpointer
+        self._queues = _WriteQueues(max_pending, coalesce)
+        self._condition = asyncio.Condition()
+        self._tasks: set[asyncio.Task] = set()
+
+    async def asubmit(self, checkpoint: Checkpoint, metadata: CheckpointMetadata, **kwargs) -> None:
+        key = str(kwargs.get('thread_id'))
+        async with self._condition:
+            if not self._queues.can_coalesce(key):
+                await self._condition.wait_for(lambda: self._queues.pending < self._queues.max_pending)
+            start = self._queues.add(key, CheckpointWrite(checkpoint, metadata, kwargs))
+        if start:
+            task = asyncio.create_task(self._awrite(key))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def aflush(self) -> None:
+        """Wait for every submitted checkpoint to be saved, and raise the first error any write failed with."""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._queues.idle)
+            error = self._queues.pop_error()
+        if error is not None:
+            raise error
+
+    async def _awrite(self, key: str) -> None:
+        while True:
+            async with self._condition:
+                batch = self._queues.take(key)
+                if not batch:
+                    self._condition.notify_all()
+                    return
+            error = None
+            try:
+                await self.checkpointer.aput_many(batch)
+            except asyncio.CancelledError as e:
+                async with self._condition:
+                    self._queues.done(batch, e)
+                    self._queues.abandon(key, e)
+                    self._condition.notify_all()
+                raise
+            except BaseException as e:
+                error = e
+            async with self._condition:
+                self._queues.done(batch, error)
+                self._condition.notify_all()
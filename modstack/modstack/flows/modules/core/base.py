@@ -7,23 +7,27 @@ from collections import defaultdict, deque
 from concurrent import futures
 from functools import partial
 import logging
+import time
 from typing import Any, AsyncIterator, Callable, Iterator, Literal, Optional, Sequence, Type, Union, Unpack, final, overload, override
 
 from pydantic import BaseModel, Field, model_validator
 
 from modstack.flows import All, FlowInput, FlowOutput, FlowOutputChunk, FlowRecursionError, PregelExecutableTask, PregelTaskDescription, FlowOptions, Send, StateSnapshot, StreamMode
 from modstack.flows.channels import AsyncChannelManager, Channel, ChannelManager, EmptyChannelError, InvalidUpdateError
-from modstack.flows.checkpoints import Checkpoint, CheckpointMetadata, Checkpointer
+from modstack.flows.checkpoints import AsyncCheckpointWriter, Checkpoint, CheckpointMetadata, CheckpointWriter, Checkpointer
 from modstack.flows.constants import PENDING_WRITES_CHANNEL, READ_KEY, INTERRUPT, HIDDEN, TASKS, WRITE_KEY
 from modstack.flows.managed import AsyncManagedValuesManager, ManagedValueSpec, ManagedValuesManager, is_managed_value
 from modstack.flows.modules import PregelNode
 from modstack.flows.utils.checkpoints import copy_checkpoint, create_checkpoint, empty_checkpoint
 from modstack.flows.utils.debug import map_debug_checkpoint, map_debug_task_results, map_debug_tasks, print_step_checkpoint, print_step_tasks, print_step_writes
 from modstack.flows.utils.io import map_input, map_output_updates, map_output_values, read_channel, read_channels
+from modstack.flows.utils.triggers import TriggerIndex
 from modstack.flows.utils.validation import validate_flow, validate_keys
 from modstack.core import Sequential, SerializableModule
 from modstack.typing import Effect, Effects
 from modstack.utils.serialization import create_model
+from modstack.utils.deadlines import DeadlineExceeded, min_timeout, remaining_time
+from modstack.utils.metrics import metrics_enabled, record_flow_step
 from modstack.utils.threading import get_executor
 
 logger = logging.getLogger(__name__)
@@ -370,12 +374,24 @@ class Pregel(SerializableModule[FlowInput, FlowOutput]):
 
     def _stream(self, inputs: FlowInput, **kwargs: Unpack[FlowOptions]) -> Iterator[FlowOutput]:
         self._set_defaults(**kwargs)
+        writer: Optional[CheckpointWriter] = None
+        failed = False
         try:
             config = kwargs['config']
             self._validate_config(config)
-            background_tasks: list[futures.Future] = []
+            # saves checkpoints in the background, in order
+            if self.checkpointer is not None:
+                writer = CheckpointWriter(
+                    self.checkpointer,
+                    max_pending=self.checkpointer.max_pending_writes,
+                    coalesce=self.checkpointer.coalesce_writes
+                )
             # copy nodes to ignore mutations during execution
             processes: dict[str, PregelNode] = {**self.nodes}
+            # index the snapshot rather than the flow, so it always matches the nodes this run executes
+            trigger_index = TriggerIndex(processes)
+            # channels updated by the last step, or None to check every node
+            updated_channels: Optional[set[str]] = None
             saved = self.checkpointer.get(**config) if self.checkpointer else None
             checkpoint = saved.checkpoint if saved else empty_checkpoint()
             start = saved.metadata.get('step', -2) + 1 if saved else -1
@@ -390,31 +406,37 @@ class Pregel(SerializableModule[FlowInput, FlowOutput]):
                     **saved.config
                 }
 
+            # metadata of the latest step that wasn't saved, and how many steps weren't saved since the last checkpoint
+            unsaved_metadata: Optional[CheckpointMetadata] = None
+            unsaved_steps = 0
+            interrupted = False
+
             # create channels from checkpoint
             with (
                 ChannelManager(self.channels, checkpoint) as channels,
                 ManagedValuesManager(self.managed_values_dict, self, **config) as managed_values,
                 get_executor() as executor
             ):
-                def put_checkpoint(metadata: CheckpointMetadata) -> Iterator[Any]:
-                    nonlocal checkpoint, checkpoint_config, channels
+                def put_checkpoint(metadata: CheckpointMetadata, on_exit: bool = False) -> Iterator[Any]:
+                    nonlocal checkpoint, checkpoint_config, channels, unsaved_metadata, unsaved_steps
 
                     if self.checkpointer is None:
                         return
+                    # steps that aren't saved skip creating and copying a checkpoint altogether,
+                    # the versions the loop depends on are tracked by the current checkpoint regardless
+                    if not on_exit and not self.checkpointer.should_put(unsaved_steps + 1):
+                        unsaved_metadata = metadata
+                        unsaved_steps += 1
+                        return
+                    unsaved_metadata = None
+                    unsaved_steps = 0
                     if kwargs['debug']:
                         print_step_checkpoint(metadata['step'], channels, self.stream_channels_list)
 
                     # create new checkpoint
                     checkpoint = create_checkpoint(checkpoint, channels, metadata['step'])
-                    # save it, without blocking
-                    background_tasks.append(
-                        executor.submit(
-                            self.checkpointer.put,
-                            copy_checkpoint(checkpoint),
-                            metadata,
-                            **checkpoint_config
-                        )
-                    )
+                    # save it, without blocking unless too many checkpoints are waiting to be saved
+                    writer.submit(copy_checkpoint(checkpoint), metadata, **checkpoint_config)
                     # update checkpoint config
                     checkpoint_config = {**checkpoint_config, 'thread_ts': checkpoint['id']}
                     # yield debug checkpoint event
@@ -444,7 +466,7 @@ class Pregel(SerializableModule[FlowInput, FlowOutput]):
                         **config
                     )
                     # apply input writes
-                    _apply_writes(
+                    updated_channels = _apply_writes(
                         checkpoint,
                         channels,
                         input_writes,
@@ -479,6 +501,8 @@ class Pregel(SerializableModule[FlowInput, FlowOutput]):
                         step,
                         for_execution=True,
                         get_next_version=self._get_next_version,
+                        updated_channels=updated_channels,
+                        trigger_index=trigger_index,
                         **config
                     )
 
@@ -495,8 +519,10 @@ class Pregel(SerializableModule[FlowInput, FlowOutput]):
                         self.stream_channels_list,
                         next_tasks
                     ):
+                        interrupted = True
                         break
                     checkpoint = next_checkpoint
+                    step_started = time.monotonic() if metrics_enabled() else 0.0
 
                     if kwargs['debug']:
                         print_step_tasks(step, next_tasks)
@@ -514,7 +540,7 @@ class Pregel(SerializableModule[FlowInput, FlowOutput]):
                         # each task is independent from all other concurrent tasks
                         done, inflight = futures.wait(
                             futures_,
-                            timeout=self.step_timeout,
+                            timeout=min_timeout(self.step_timeout),
                             return_when=futures.FIRST_COMPLETED
                         )
                         for future in done:
@@ -555,12 +581,14 @@ class Pregel(SerializableModule[FlowInput, FlowOutput]):
                         print_step_writes(step, pending_writes, self.stream_channels_list)
 
                     # apply writes to channels
-                    _apply_writes(
+                    updated_channels = _apply_writes(
                         checkpoint,
                         channels,
                         pending_writes,
                         self._get_next_version
                     )
+                    if metrics_enabled():
+                        record_flow_step(self.get_name(), time.monotonic() - step_started, len(next_tasks))
 
                     if 'values' in stream_modes:
                         yield from _with_mode(
@@ -586,6 +614,7 @@ class Pregel(SerializableModule[FlowInput, FlowOutput]):
                         self.stream_channels_list,
                         next_tasks
                     ):
+                        interrupted = True
                         break
                 else:
                     raise FlowRecursionError(
@@ -593,6 +622,13 @@ class Pregel(SerializableModule[FlowInput, FlowOutput]):
                         'without hitting a stop condition. You can increase the '
                         'limit by setting the `recursion_limit` config key.'
                     )
+
+                # save the latest state if the last steps weren't saved
+                if unsaved_metadata is not None and self.checkpointer.should_put_on_exit(interrupted):
+                    yield from put_checkpoint(unsaved_metadata, on_exit=True)
+        except BaseException:
+            failed = True
+            raise
         finally:
             # cancel any pending tasks when generator is interrupted
             try:
@@ -600,20 +636,38 @@ class Pregel(SerializableModule[FlowInput, FlowOutput]):
                     task.cancel()
             except NameError:
                 pass
-            # wait for all background tasks to finish
-            done, _ = futures.wait(background_tasks, return_when=futures.ALL_COMPLETED)
-            for task in done:
-                task.result()
+            # wait for all checkpoints to be saved
+            if writer is not None:
+                try:
+                    writer.flush()
+                except Exception:
+                    # don't replace the error the run is already failing with
+                    if not failed:
+                        raise
+                    logger.exception('Failed to save checkpoints of a failed run.')
 
     async def _astream(self, inputs: FlowInput, **kwargs: Unpack[FlowOptions]) -> AsyncIterator[FlowOutput]:
         self._set_defaults(**kwargs)
+        writer: Optional[AsyncCheckpointWriter] = None
+        background_tasks: list[asyncio.Task] = []
+        failed = False
         try:
             config = kwargs['config']
             self._validate_config(config)
             loop = asyncio.get_event_loop()
-            background_tasks: list[asyncio.Task] = []
+            # saves checkpoints in the background, in order
+            if self.checkpointer is not None:
+                writer = AsyncCheckpointWriter(
+                    self.checkpointer,
+                    max_pending=self.checkpointer.max_pending_writes,
+                    coalesce=self.checkpointer.coalesce_writes
+                )
             # copy nodes to ignore mutations during execution
             processes: dict[str, PregelNode] = {**self.nodes}
+            # index the snapshot rather than the flow, so it always matches the nodes this run executes
+            trigger_index = TriggerIndex(processes)
+            # channels updated by the last step, or None to check every node
+            updated_channels: Optional[set[str]] = None
             saved = await self.checkpointer.aget(**config) if self.checkpointer else None
             checkpoint = saved.checkpoint if saved else empty_checkpoint()
             start = saved.metadata.get('step', -2) + 1 if saved else -1
@@ -628,31 +682,36 @@ class Pregel(SerializableModule[FlowInput, FlowOutput]):
                     **saved.config
                 }
 
+            # metadata of the latest step that wasn't saved, and how many steps weren't saved since the last checkpoint
+            unsaved_metadata: Optional[CheckpointMetadata] = None
+            unsaved_steps = 0
+            interrupted = False
+
             # create channels from checkpoint
             async with (
                 AsyncChannelManager(self.channels, checkpoint) as channels,
                 AsyncManagedValuesManager(self.managed_values_dict, self, **config) as managed_values
             ):
-                async def aput_checkpoint(metadata: CheckpointMetadata) -> AsyncIterator[Any]:
-                    nonlocal checkpoint, checkpoint_config, channels
+                async def aput_checkpoint(metadata: CheckpointMetadata, on_exit: bool = False) -> AsyncIterator[Any]:
+                    nonlocal checkpoint, checkpoint_config, channels, unsaved_metadata, unsaved_steps
 
                     if self.checkpointer is None:
                         return
+                    # steps that aren't saved skip creating and copying a checkpoint altogether,
+                    # the versions the loop depends on are tracked by the current checkpoint regardless
+                    if not on_exit and not self.checkpointer.should_put(unsaved_steps + 1):
+                        unsaved_metadata = metadata
+                        unsaved_steps += 1
+                        return
+                    unsaved_metadata = None
+                    unsaved_steps = 0
                     if kwargs['debug']:
                         print_step_checkpoint(metadata['step'], channels, self.stream_channels_list)
 
                     # create new checkpoint
                     checkpoint = create_checkpoint(checkpoint, channels, metadata['step'])
-                    # save it, without blocking
-                    background_tasks.append(
-                        asyncio.create_task(
-                            self.checkpointer.aput(
-                                copy_checkpoint(checkpoint),
-                                metadata,
-                                **checkpoint_config
-                            )
-                        )
-                    )
+                    # save it, without blocking unless too many checkpoints are waiting to be saved
+                    await writer.asubmit(copy_checkpoint(checkpoint), metadata, **checkpoint_config)
                     # update checkpoint config
                     checkpoint_config = {**checkpoint_config, 'thread_ts': checkpoint['id']}
                     # yield debug checkpoint event
@@ -683,7 +742,7 @@ class Pregel(SerializableModule[FlowInput, FlowOutput]):
                         **config
                     )
                     # apply input writes
-                    _apply_writes(
+                    updated_channels = _apply_writes(
                         checkpoint,
                         channels,
                         input_writes,
@@ -719,6 +778,8 @@ class Pregel(SerializableModule[FlowInput, FlowOutput]):
                         step,
                         for_execution=True,
                         get_next_version=self._get_next_version,
+                        updated_channels=updated_channels,
+                        trigger_index=trigger_index,
                         **config
                     )
 
@@ -735,8 +796,10 @@ class Pregel(SerializableModule[FlowInput, FlowOutput]):
                         self.stream_channels_list,
                         next_tasks
                     ):
+                        interrupted = True
                         break
                     checkpoint = next_checkpoint
+                    step_started = time.monotonic() if metrics_enabled() else 0.0
 
                     if kwargs['debug']:
                         print_step_tasks(step, next_tasks)
@@ -756,7 +819,7 @@ class Pregel(SerializableModule[FlowInput, FlowOutput]):
                         # each task is independent from all other concurrent tasks
                         done, inflight = await asyncio.wait(
                             futures_,
-                            timeout=self.step_timeout,
+                            timeout=min_timeout(self.step_timeout),
                             return_when=futures.FIRST_COMPLETED
                         )
                         for future in done:
@@ -799,12 +862,14 @@ class Pregel(SerializableModule[FlowInput, FlowOutput]):
                         print_step_writes(step, pending_writes, self.stream_channels_list)
 
                     # apply writes to channels
-                    _apply_writes(
+                    updated_channels = _apply_writes(
                         checkpoint,
                         channels,
                         pending_writes,
                         self._get_next_version
                     )
+                    if metrics_enabled():
+                        record_flow_step(self.get_name(), time.monotonic() - step_started, len(next_tasks))
 
                     if 'values' in stream_modes:
                         for chunk in _with_mode(
@@ -832,6 +897,7 @@ class Pregel(SerializableModule[FlowInput, FlowOutput]):
                         self.stream_channels_list,
                         next_tasks
                     ):
+                        interrupted = True
                         break
                 else:
                     raise FlowRecursionError(
@@ -839,6 +905,14 @@ class Pregel(SerializableModule[FlowInput, FlowOutput]):
                         'without hitting a stop condition. You can increase the '
                         'limit by setting the `recursion_limit` config key.'
                     )
+
+                # save the latest state if the last steps weren't saved
+                if unsaved_metadata is not None and self.checkpointer.should_put_on_exit(interrupted):
+                    async for chunk in aput_checkpoint(unsaved_metadata, on_exit=True):
+                        yield chunk
+        except BaseException:
+            failed = True
+            raise
         finally:
             # cancel any pending tasks when generator is interrupted
             try:
@@ -847,8 +921,16 @@ class Pregel(SerializableModule[FlowInput, FlowOutput]):
                     background_tasks.append(task)
             except NameError:
                 pass
-            # wait for all background tasks to finish
+            # wait for all background tasks to finish, and all checkpoints to be saved
             await asyncio.shield(asyncio.gather(*background_tasks))
+            if writer is not None:
+                try:
+                    await asyncio.shield(writer.aflush())
+                except Exception:
+                    # don't replace the error the run is already failing with
+                    if not failed:
+                        raise
+                    logger.exception('Failed to save checkpoints of a failed run.')
 
     def _set_defaults(self, **data: Unpack[FlowOptions]) -> None:
         if data['input_keys'] is None:
@@ -912,6 +994,8 @@ def _panic_or_proceed(
     if inflight:
         while inflight:
             inflight.pop().cancel()
+        if remaining_time() == 0:
+            raise DeadlineExceeded(f'Deadline exceeded at step {step}.')
         raise TimeoutError(f'Timed out at step {step}.')
 
 def _should_interrupt(
@@ -956,7 +1040,8 @@ def _apply_writes(
     channels: dict[str, Channel],
     pending_writes: Sequence[tuple[str, Any]],
     get_next_version: Optional[Callable[[int, Channel], int]]
-) -> None:
+) -> set[str]:
+    """Apply writes to channels, and return the names of the channels that changed."""
     pending_writes_by_channel: dict[str, list[Any]] = defaultdict(list)
 
     for chan, value in pending_writes:
@@ -971,6 +1056,7 @@ def _apply_writes(
         max_version = None
 
     updated_channels: set[str] = set()
+    changed_channels: set[str] = set()
     # Apply writes to channels
     for chan, values in pending_writes_by_channel.items():
         if chan in channels:
@@ -980,16 +1066,21 @@ def _apply_writes(
                 raise InvalidUpdateError(
                     f'Invalid update for channel {chan}: {e}.'
                 ) from e
-            if updated and get_next_version is not None:
-                checkpoint['channel_versions'][chan] = get_next_version(max_version, channels[chan])
+            if updated:
+                changed_channels.add(chan)
+                if get_next_version is not None:
+                    checkpoint['channel_versions'][chan] = get_next_version(max_version, channels[chan])
             updated_channels.add(chan)
         else:
             logger.warning(f'Skipping write for channel {chan} which has no readers.')
     # Channels that weren't updated in this step are notified of a new step
     for chan in channels:
         if chan not in updated_channels:
-            if channels[chan].update([]) and get_next_version is not None:
-                checkpoint['channel_versions'][chan] = get_next_version(max_version, channels[chan])
+            if channels[chan].update([]):
+                changed_channels.add(chan)
+                if get_next_version is not None:
+                    checkpoint['channel_versions'][chan] = get_next_version(max_version, channels[chan])
+    return changed_channels
 
 def _local_write(
     commit: Callable[[Sequence[tuple[str, Any]]], None],
@@ -1070,6 +1161,8 @@ def _prepare_next_tasks(
     step: int,
     for_execution: Literal[False],
     get_next_version: Literal[None] = None,
+    updated_channels: Optional[set[str]] = None,
+    trigger_index: Optional[TriggerIndex] = None,
     **kwargs
 ) -> tuple[Checkpoint, list[PregelTaskDescription]]:
     ...
@@ -1083,6 +1176,8 @@ def _prepare_next_tasks(
     step: int,
     for_execution: Literal[True],
     get_next_version: Callable[[int, Channel], int],
+    updated_channels: Optional[set[str]] = None,
+    trigger_index: Optional[TriggerIndex] = None,
     **kwargs
 ) -> tuple[Checkpoint, list[PregelExecutableTask]]:
     ...
@@ -1095,12 +1190,14 @@ def _prepare_next_tasks(
     step: int,
     for_execution: bool,
     get_next_version: Union[Callable[[int, Channel], int], None] = None,
+    updated_channels: Optional[set[str]] = None,
+    trigger_index: Optional[TriggerIndex] = None,
     **kwargs
 ) -> tuple[Checkpoint, Union[list[PregelTaskDescription], list[PregelExecutableTask]]]:
     # Check if any processes should be run in next step
     # If so, prepare the values to be passed to them
     checkpoint = copy_checkpoint(checkpoint)
-    tasks: list[Union[PregelTaskDescription, PregelExecutableTask]]
+    tasks: list[Union[PregelTaskDescription, PregelExecutableTask]] = []
 
     # Consume pending packets
     for packet in checkpoint['pending_sends']:
@@ -1149,14 +1246,21 @@ def _prepare_next_tasks(
     null_version = version_type()
     if null_version is None:
         return checkpoint, tasks
-    for name, process in processes.items():
+    # Only nodes subscribed to a channel updated by the last step can be triggered,
+    # unless we don't know which channels were updated, e.g. when resuming from a checkpoint
+    if updated_channels is not None and trigger_index is not None:
+        candidates = trigger_index.triggered_by(updated_channels)
+    else:
+        candidates = processes.keys()
+    for name in candidates:
+        process = processes[name]
         seen = checkpoint['versions_seen'][name]
         # If any of the channels read by this process were updated
         if triggers := [
             chan
             for chan in process.triggers
-            if not (
-                isinstance(
+            if (
+                not isinstance(
                     read_channel(channels, chan, return_exception=True),
                     EmptyChannelError
                 )
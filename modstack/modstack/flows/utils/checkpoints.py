@@ -50,4 +50,30 @@ def create_checkpoint(checkpoint: Checkpoint, channels: Mapping[str, Channel], s
         versions_seen=checkpoint['versions_seen'],
         channel_values=values,
         seen=[]
-    )
\ No newline at end of file
+    )
+
+def create_checkpoint_delta(checkpoint: Checkpoint, parent_versions: Mapping[str, Any]) -> Checkpoint:
+    """A copy of `checkpoint` that only holds the values of channels whose version changed since `parent_versions`."""
+    return Checkpoint(
+        **{
+            **checkpoint,
+            'channel_values': {
+                k: v
+                for k, v in checkpoint['channel_values'].items()
+                if checkpoint['channel_versions'].get(k) != parent_versions.get(k)
+            }
+        }
+    )
+
+def apply_checkpoint_delta(parent: Checkpoint, delta: Checkpoint) -> Checkpoint:
+    """Restore the checkpoint `delta` was created from, given the full checkpoint of its parent."""
+    values = parent['channel_values'].copy()
+    for chan, version in delta['channel_versions'].items():
+        if version == parent['channel_versions'].get(chan):
+            continue
+        if chan in delta['channel_values']:
+            values[chan] = delta['channel_values'][chan]
+        else:
+            # the channel changed, but has no value in the delta, so it was emptied
+            values.pop(chan, None)
+    return Checkpoint(**{**delta, 'channel_values': values})
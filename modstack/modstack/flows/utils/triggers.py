@@ -0,0 +1,23 @@
+from collections import defaultdict
+from typing import Iterable, Mapping
+
+from modstack.flows.modules import PregelNode
+
+class TriggerIndex:
+    """Maps each channel to the nodes it triggers, so a step only has to look at nodes whose triggers were updated."""
+
+    def __init__(self, nodes: Mapping[str, PregelNode]):
+        self._order: dict[str, int] = {name: i for i, name in enumerate(nodes)}
+        self._subscribers: dict[str, list[str]] = defaultdict(list)
+        for name, node in nodes.items():
+            for chan in node.triggers:
+                self._subscribers[chan].append(name)
+
+    def triggered_by(self, channels: Iterable[str]) -> list[str]:
+        """The nodes subscribed to any of `channels`, in the order they were added to the flow."""
+        names = {
+            name
+            for chan in channels
+            for name in self._subscribers.get(chan, ())
+        }
+        return sorted(names, key=self._order.__getitem__)
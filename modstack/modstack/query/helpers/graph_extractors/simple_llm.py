@@ -1,4 +1,5 @@
 from functools import partial
+from typing import Optional
 
 from modstack.ai import LLM
 from modstack.ai.prompts import EXTRACT_TRIPLETS_PROMPT
@@ -17,7 +18,7 @@ class SimpleLLMGraphExtractor(SerializableModule[list[Artifact], list[Artifact]]
 
     def __init__(
         self,
-        llm: LLM = Settings.llm,
+        llm: Optional[LLM] = None,
         prompt_template: str = EXTRACT_TRIPLETS_PROMPT,
         triplet_parser: ModuleLike[str, tuple[str, str, str]] = default_triplet_parser,
         max_paths_per_chunk: int = 10,
@@ -25,7 +26,7 @@ class SimpleLLMGraphExtractor(SerializableModule[list[Artifact], list[Artifact]]
         **kwargs
     ):
         super().__init__(
-            llm=llm,
+            llm=llm or Settings.llm,
             prompt_template=prompt_template,
             triplet_parser=coerce_to_module(triplet_parser),
             max_paths_per_chunk=max_paths_per_chunk,
@@ -1,8 +1,7 @@
+from collections import Counter
 import re
 from typing import Optional
 
-import pandas as pd
-
 from modstack.ai import LLM, ZeroShotClassifier
 from modstack.artifacts import Artifact
 from modstack.core import Modules, module
@@ -16,12 +15,11 @@ def simple_keyword_extractor(
     filter_stopwords: bool = True,
     **kwargs
 ) -> set[str]:
-    """Extract keywords using nltk and pandas."""
+    """Extract keywords using nltk."""
     tokens = [t.strip().lower() for t in re.findall(r'\w+', str(artifact))]
     if filter_stopwords:
         tokens = [t for t in tokens if t not in globals_helper.stopwords]
-    value_counts = pd.Series(tokens).value_counts()
-    return set(value_counts.index.tolist()[:max_keywords])
+    return {token for token, _ in Counter(tokens).most_common(max_keywords)}
 
 @module
 def rake_keyword_extractor(
@@ -26,9 +26,9 @@ class IndexDependencies(TypedDict, total=False):
 @dataclass
 class Index(Generic[STRUCT], ABC):
     _struct: Optional[STRUCT] = field(default=None, init=False)
-    index_store: IndexStore = field(default=Settings.index_store, kw_only=True)
-    artifact_store: ArtifactStore = field(default=Settings.artifact_store, kw_only=True)
-    cache: InjestionCache = field(default=Settings.ingestion_cache, kw_only=True)
+    index_store: IndexStore = field(default_factory=lambda: Settings.index_store, kw_only=True)
+    artifact_store: ArtifactStore = field(default_factory=lambda: Settings.artifact_store, kw_only=True)
+    cache: InjestionCache = field(default_factory=lambda: Settings.ingestion_cache, kw_only=True)
     cache_collection: Optional[str] = field(default=None, kw_only=True)
     transformations: Optional[list[ArtifactTransformLike]] = field(default=None, kw_only=True)
 
@@ -25,10 +25,10 @@ class GraphIndexDependencies(IndexDependencies, total=False):
 
 @dataclass(kw_only=True)
 class GraphIndex(CommonIndex[GraphStruct]):
-    graph_store: GraphStore = field(default=Settings.graph_store)
+    graph_store: GraphStore = field(default_factory=lambda: Settings.graph_store)
     vector_store: Optional[VectorStore] = field(default=None)
-    embedder: Embedder = field(default=Settings.embedder)
-    llm: LLM = field(default=Settings.llm)
+    embedder: Embedder = field(default_factory=lambda: Settings.embedder)
+    llm: LLM = field(default_factory=lambda: Settings.llm)
     graph_extractors: Optional[list[ArtifactTransformLike]] = field(default=None)
     embed_nodes: bool = field(default=True)
 
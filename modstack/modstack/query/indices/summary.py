@@ -28,8 +28,8 @@ class SummaryIndexDependencies(IndexDependencies, total=False):
 
 @dataclass(kw_only=True)
 class SummaryIndex(Index[SummaryStruct]):
-    vector_store: VectorStore = field(default=Settings.vector_store)
-    embedder: Embedder = field(default=Settings.embedder)
+    vector_store: VectorStore = field(default_factory=lambda: Settings.vector_store)
+    embedder: Embedder = field(default_factory=lambda: Settings.embedder)
     synthesizer: Optional[SynthesizerLike] = field(default=None)
     llm: Optional[LLM] = field(default=None)
     query_template: Artifact = field(default=DEFAULT_QUERY_TEMPLATE)
@@ -79,9 +79,9 @@ class SummaryEmbeddingRetriever(_SummaryRetriever):
         return top_k_summary_ids
 
 class SummaryLLMRetriever(_SummaryRetriever):
-    def __init__(self, llm: LLM = Settings.llm, **kwargs):
+    def __init__(self, llm: Optional[LLM] = None, **kwargs):
         super().__init__(**kwargs)
-        self._llm = llm
+        self._llm = llm or Settings.llm
 
     def _invoke(self, query: SummaryIndexQuery, **kwargs) -> list[Artifact]:
         pass
@@ -3,6 +3,8 @@ from typing import Optional
 
 from modstack.artifacts import Artifact, artifact_registry
 from modstack.stores import KVStore
+from modstack.utils.deadlines import check_deadline
+from modstack.utils.metrics import metrics_enabled, record_store_lookup
 
 class InjestionCache:
     def __init__(
@@ -16,15 +18,21 @@ class InjestionCache:
         self._artifacts_key = artifacts_key or 'artifacts'
 
     def get(self, key: str, collection: Optional[str] = None) -> Optional[list[Artifact]]:
+        check_deadline()
         collection = collection or self._collection
         data = self._kvstore.get(key, collection=collection)
+        if metrics_enabled():
+            record_store_lookup(type(self).__name__, data is not None)
         if data is None:
             return None
         return [artifact_registry.deserialize(entry) for entry in data]
 
     async def aget(self, key: str, collection: Optional[str] = None) -> Optional[list[Artifact]]:
+        check_deadline()
         collection = collection or self._collection
         data = await self._kvstore.aget(key, collection=collection)
+        if metrics_enabled():
+            record_store_lookup(type(self).__name__, data is not None)
         if data is None:
             return None
         return [artifact_registry.deserialize(entry) for entry in data]
@@ -35,6 +43,7 @@ class InjestionCache:
         artifacts: list[Artifact],
         collection: Optional[str] = None
     ) -> None:
+        check_deadline()
         collection = collection or self._collection
         self._kvstore.put(
             key,
@@ -48,6 +57,7 @@ class InjestionCache:
         artifacts: list[Artifact],
         collection: Optional[str] = None
     ) -> None:
+        check_deadline()
         collection = collection or self._collection
         await self._kvstore.aput(
             key,
@@ -56,12 +66,14 @@ class InjestionCache:
         )
 
     def clear(self, collection: Optional[str] = None) -> None:
+        check_deadline()
         collection = collection or self._collection
         all_data = self._kvstore.get_all(collection=collection)
         for key in all_data:
             self._kvstore.delete(key, collection=collection)
 
     async def aclear(self, collection: Optional[str] = None) -> None:
+        check_deadline()
         collection = collection or self._collection
         all_data = await self._kvstore.aget_all(collection=collection)
         await asyncio.gather(
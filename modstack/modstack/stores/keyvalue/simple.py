@@ -7,6 +7,7 @@ import fsspec
 
 from modstack.stores import KVStore
 from modstack.stores.keyvalue.base import DEFAULT_COLLECTION
+from modstack.utils.metrics import metrics_enabled, record_store_lookup
 
 logger = logging.getLogger(__name__)
 _DATA_TYPE = dict[str, dict[str, dict]]
@@ -48,7 +49,10 @@ class SimpleKVStore(KVStore):
         **kwargs
     ) -> Optional[dict]:
         collection_data = self._data.get(collection, None)
-        if not collection_data or key not in collection_data:
+        hit = bool(collection_data) and key in collection_data
+        if metrics_enabled():
+            record_store_lookup(type(self).__name__, hit)
+        if not hit:
             return None
         return collection_data[key].copy()
 
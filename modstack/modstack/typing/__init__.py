@@ -24,11 +24,7 @@ from .types import (
     AudioTensor,
     VideoTensor,
     VerticesAndFaces,
-    PointsAndColors,
-    RetryStrategy,
-    StopStrategy,
-    WaitStrategy,
-    AfterRetryFailure
+    PointsAndColors
 )
 
 from .protocols import Addable
@@ -55,4 +51,13 @@ from .coordinates import (
     PixelSpace
 )
 
-from .ai import ToolCall, ToolCallChunk, InvalidToolCall, UsageMetadata
\ No newline at end of file
+from .ai import ToolCall, ToolCallChunk, InvalidToolCall, UsageMetadata
+
+_RETRY_TYPES = ('RetryStrategy', 'StopStrategy', 'WaitStrategy', 'AfterRetryFailure')
+
+def __getattr__(name: str):
+    # tenacity is only needed once something retries, so don't pay for importing it with modstack.typing
+    if name in _RETRY_TYPES:
+        from . import retry
+        return getattr(retry, name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -1,11 +1,13 @@
 from abc import ABC, abstractmethod
 import asyncio
-from typing import Any, AsyncIterator, Callable, Coroutine, Generic, Iterator, Optional, TypeVar, final
+from contextlib import closing
+from typing import Any, AsyncIterator, Callable, Coroutine, Generic, Iterator, Optional, Sequence, TypeVar, final
 
 from modstack.typing.protocols import Addable
 from modstack.typing.vars import Other, Out
-from modstack.utils.func import tpartial, tzip
-from modstack.utils.threading import get_executor, run_async, run_async_iter, run_sync, run_sync_iter
+from modstack.utils.func import tzip
+from modstack.utils.threading import DEFAULT_STREAM_BUFFER_SIZE, amerge_iters, get_executor, merge_iters, run_async, run_async_iter, run_sync, run_sync_iter
+from modstack.utils.tracing import activate_span, deactivate_span, end_span, record_chunk, start_span
 
 class Effect(Generic[Out], ABC):
     def map(
@@ -18,7 +20,7 @@ class Effect(Generic[Out], ABC):
         self,
         func: Callable[[Out], 'Effect[Other]']
     ) -> 'Effect[Other]':
-        return Effects.FlatMap(self, func)
+        return Effects.Chain(self, [func])
 
     @abstractmethod
     def invoke(self) -> Out:
@@ -204,7 +206,8 @@ class Effects:
                 yield from run_sync_iter(self._aiter)
             elif self._invoke:
                 yield self._invoke()
-            yield self._async_effect().invoke()
+            else:
+                yield self._async_effect().invoke()
 
         async def aiter(self) -> AsyncIterator[Out]:
             if self._aiter:
@@ -215,7 +218,8 @@ class Effects:
                     yield item
             elif self._ainvoke:
                 yield await self._ainvoke()
-            yield await run_async(self._invoke)
+            else:
+                yield await run_async(self._invoke)
 
         def _async_effect(self) -> Effect[Out]:
             return Effects.Async(self._ainvoke)
@@ -231,10 +235,12 @@ class Effects:
         def __init__(
             self,
             effects: dict[str, Effect[Any]],
-            max_workers: Optional[int] = None
+            max_workers: Optional[int] = None,
+            buffer_size: Optional[int] = None
         ):
             self._effects = effects
             self._max_workers = max_workers
+            self._buffer_size = buffer_size or DEFAULT_STREAM_BUFFER_SIZE
 
         def invoke(self) -> dict[str, Any]:
             with get_executor(max_workers=self._max_workers) as executor:
@@ -248,49 +254,41 @@ class Effects:
                 }
 
         async def ainvoke(self) -> dict[str, Any]:
-            generators = await asyncio.gather(*(
-                effect.ainvoke
+            outputs = await asyncio.gather(*(
+                effect.ainvoke()
                 for effect in self._effects.values()
             ))
             return {
                 k: v
-                for k, v in zip(self._effects, generators)
+                for k, v in zip(self._effects, outputs)
             }
 
         def iter(self) -> Iterator[dict[str, Any]]:
             current = {}
-
-            def iterate_effect(name: str, effect: Effect[Any]) -> Iterator[dict[str, Any]]:
-                for chunk in effect.iter():
+            with (
+                get_executor(max_workers=self._max_workers) as executor,
+                closing(merge_iters(
+                    {name: effect.iter for name, effect in self._effects.items()},
+                    executor,
+                    buffer_size=self._buffer_size
+                )) as chunks
+            ):
+                for name, chunk in chunks:
                     current[name] = chunk
-                    yield current
-
-            with get_executor(max_workers=self._max_workers) as executor:
-                futures = [
-                    executor.submit(
-                        tpartial(iterate_effect, name, effect)
-                    )
-                    for name, effect in self._effects.items()
-                ]
-                for future in futures:
-                    yield from future.result()
+                    yield {**current}
 
         async def aiter(self) -> AsyncIterator[dict[str, Any]]:
             current = {}
-
-            async def aiterate_effect(name: str, effect: Effect[Any]) -> AsyncIterator[dict[str, Any]]:
-                async for chunk in effect.aiter(): # type: ignore
+            chunks = amerge_iters(
+                {name: effect.aiter for name, effect in self._effects.items()},
+                buffer_size=self._buffer_size
+            )
+            try:
+                async for name, chunk in chunks: # type: ignore
                     current[name] = chunk
-                    yield current
-
-            generators = await asyncio.gather(*(
-                aiterate_effect(name, effect)
-                for name, effect in self._effects.items()
-            ))
-
-            for generator in generators:
-                async for output in generator:
-                    yield output
+                    yield {**current}
+            finally:
+                await chunks.aclose()
 
     @final
     class Map(Generic[Other, Out], Effect[Out]):
@@ -340,5 +338,179 @@ class Effects:
             async for item in self.effect.aiter(): #type: ignore
                 yield await self.func(item).ainvoke()
 
+    @final
+    class Chain(Generic[Other, Out], Effect[Out]):
+        """
+        A flat sequence of effects, each one built from the output of the previous one.
+
+        Behaves like nested `FlatMap`s, but runs iteratively instead of recursively, and on the async path
+        runs consecutive sync steps in a single worker thread hop and `Value` steps without one.
+        """
+
+        def __init__(
+            self,
+            effect: Effect[Other],
+            funcs: Sequence[Callable[[Any], Effect[Any]]]
+        ):
+            self.effect = effect
+            self.funcs = list(funcs)
+
+        def map(
+            self,
+            func: Callable[[Out], Other]
+        ) -> Effect[Other]:
+            return self.flat_map(lambda value: Effects.Value(func(value)))
+
+        def flat_map(
+            self,
+            func: Callable[[Out], Effect[Other]]
+        ) -> Effect[Other]:
+            return Effects.Chain(self.effect, [*self.funcs, func])
+
+        def invoke(self) -> Out:
+            return self._invoke_from(self.effect.invoke(), 0)
+
+        async def ainvoke(self) -> Out:
+            return await self._ainvoke_from(self.effect, 0)
+
+        def iter(self) -> Iterator[Out]:
+            for item in self.effect.iter():
+                yield self._invoke_from(item, 0)
+
+        async def aiter(self) -> AsyncIterator[Out]:
+            async for item in self.effect.aiter(): #type: ignore
+                yield await self._ainvoke_from(Effects.Value(item), 0)
+
+        def _invoke_from(self, value: Any, index: int) -> Out:
+            for func in self.funcs[index:]:
+                value = func(value).invoke()
+            return value
+
+        async def _ainvoke_from(self, effect: Effect[Any], index: int) -> Out:
+            while True:
+                if isinstance(effect, Effects.Value):
+                    value = effect.value
+                elif _is_sync(effect):
+                    value, index, pending = await run_async(self._invoke_sync_run, effect, index)
+                    if pending is not None:
+                        effect = pending
+                        continue
+                    return value
+                else:
+                    value = await effect.ainvoke()
+                if index >= len(self.funcs):
+                    return value
+                effect = self.funcs[index](value)
+                index += 1
+
+        def _invoke_sync_run(
+            self,
+            effect: Effect[Any],
+            index: int
+        ) -> tuple[Any, int, Optional[Effect[Any]]]:
+            # runs in a worker thread, continuing until the chain ends or reaches a step that isn't sync
+            value = effect.invoke()
+            while index < len(self.funcs):
+                effect = self.funcs[index](value)
+                index += 1
+                if not _is_sync(effect):
+                    return None, index, effect
+                value = effect.invoke()
+            return value, index, None
+
+    @final
+    class Traced(Effect[Out]):
+        """
+        Runs an effect inside a tracing span named after the module that produced it.
+        The span is the current span while the effect runs, so nested modules become its children.
+        """
+
+        def __init__(self, effect: Effect[Out], name: str):
+            self.effect = effect
+            self.name = name
+
+        def invoke(self) -> Out:
+            span = start_span(self.name)
+            token = activate_span(span)
+            try:
+                value = self.effect.invoke()
+            except BaseException as e:
+                end_span(span, e)
+                raise
+            finally:
+                deactivate_span(token)
+            end_span(span)
+            return value
+
+        async def ainvoke(self) -> Out:
+            span = start_span(self.name)
+            token = activate_span(span)
+            try:
+                value = await self.effect.ainvoke()
+            except BaseException as e:
+                end_span(span, e)
+                raise
+            finally:
+                deactivate_span(token)
+            end_span(span)
+            return value
+
+        def iter(self) -> Iterator[Out]:
+            span = start_span(self.name)
+            iterator = self.effect.iter()
+            try:
+                while True:
+                    token = activate_span(span)
+                    try:
+                        item = next(iterator)
+                    except StopIteration:
+                        break
+                    finally:
+                        deactivate_span(token)
+                    record_chunk(span)
+                    yield item
+            except GeneratorExit:
+                end_span(span)
+                raise
+            except BaseException as e:
+                end_span(span, e)
+                raise
+            else:
+                end_span(span)
+            finally:
+                if hasattr(iterator, 'close'):
+                    iterator.close()
+
+        async def aiter(self) -> AsyncIterator[Out]:
+            span = start_span(self.name)
+            iterator = self.effect.aiter().__aiter__()
+            try:
+                while True:
+                    token = activate_span(span)
+                    try:
+                        item = await iterator.__anext__()
+                    except StopAsyncIteration:
+                        break
+                    finally:
+                        deactivate_span(token)
+                    record_chunk(span)
+                    yield item
+            except GeneratorExit:
+                end_span(span)
+                raise
+            except BaseException as e:
+                end_span(span, e)
+                raise
+            else:
+                end_span(span)
+            finally:
+                if hasattr(iterator, 'aclose'):
+                    await iterator.aclose()
+
+def _is_sync(effect: Effect[Any]) -> bool:
+    if isinstance(effect, Effects.Traced):
+        return _is_sync(effect.effect)
+    return isinstance(effect, (Effects.Value, Effects.Sync, Effects.Iterator))
+
 _T = TypeVar('_T')
 ReturnType = _T | Coroutine[Any, Any, _T] | Iterator[_T] | AsyncIterator[_T] | Effect[_T]
\ No newline at end of file
@@ -7,7 +7,6 @@ import docarray.typing as docarray_typing
 import docarray.documents as docarray_documents
 from docarray.typing.bytes.base_bytes import BaseBytes as DocArrayBaseBytes
 from numpy import ndarray
-import tenacity
 
 from modstack.utils.constants import VARIADIC_TYPE
 
@@ -48,9 +47,4 @@ VideoTensor = docarray_typing.VideoTensor
 VerticesAndFaces = docarray_documents.VerticesAndFaces
 PointsAndColors = docarray_documents.PointsAndColors
 
-Embedding = ndarray
-
-RetryStrategy = tenacity.retry_base | typing.Callable[[tenacity.RetryCallState], bool]
-StopStrategy = tenacity.stop.stop_base | typing.Callable[[tenacity.RetryCallState], bool]
-WaitStrategy = tenacity.wait.wait_base | typing.Callable[[tenacity.RetryCallState], int | float]
-AfterRetryFailure = typing.Callable[[tenacity.RetryCallState], None]
\ No newline at end of file
+Embedding = ndarray
\ No newline at end of file
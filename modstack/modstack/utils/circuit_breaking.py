@@ -0,0 +1,176 @@
+from contextlib import contextmanager
+import enum
+import logging
+import threading
+import time
+from typing import Iterator, Optional, Type
+
+from modstack.utils.metrics import metrics_enabled, record_circuit_rejection, record_circuit_transition
+from modstack.utils.tracing import record_event, tracing_enabled
+
+logger = logging.getLogger(__name__)
+
+class CircuitState(enum.StrEnum):
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a module whose circuit is open."""
+
+    def __init__(self, circuit: str, retry_after: float):
+        super().__init__(f'Circuit {circuit} is open, retry in {retry_after:.2f}s.')
+        self.circuit = circuit
+        self.retry_after = retry_after
+
+class Circuit:
+    """
+    The state of a circuit breaker. Closed circuits let every call through and open after `failure_threshold`
+    consecutive failures. Open circuits reject calls for `reset_timeout` seconds, then become half-open and let up
+    to `half_open_max_calls` trial calls through: if they all succeed the circuit closes, and any failure opens
+    it again. Results of calls admitted before the last state change are ignored. State changes are logged,
+    counted in the metrics and added as `circuit_transition` events to the current tracing span.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30,
+        half_open_max_calls: int = 1
+    ):
+        if failure_threshold < 1:
+            raise ValueError('failure_threshold must be at least 1.')
+        if half_open_max_calls < 1:
+            raise ValueError('half_open_max_calls must be at least 1.')
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._state = CircuitState.CLOSED
+        self._generation = 0
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trials = 0
+        self._trial_successes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            self._check_reset(time.monotonic())
+            return self._state
+
+    def acquire(self) -> int:
+        """Admit a call, or raise `CircuitOpenError`. Returns a token to pass to `release`."""
+        with self._lock:
+            now = time.monotonic()
+            self._check_reset(now)
+            if self._state == CircuitState.OPEN:
+                retry_after = self._opened_at + self.reset_timeout - now
+            elif self._state == CircuitState.HALF_OPEN and self._trials >= self.half_open_max_calls:
+                retry_after = 0.0
+            else:
+                if self._state == CircuitState.HALF_OPEN:
+                    self._trials += 1
+                return self._generation
+        if metrics_enabled():
+            record_circuit_rejection(self.name)
+        raise CircuitOpenError(self.name, retry_after)
+
+    def release(self, token: int, success: Optional[bool]) -> None:
+        """Report the outcome of a call admitted with `token`. `None` means the call ended without a verdict, e.g. it was cancelled."""
+        with self._lock:
+            if token != self._generation:
+                return
+            if self._state == CircuitState.CLOSED:
+                if success is True:
+                    self._failures = 0
+                elif success is False:
+                    self._failures += 1
+                    if self._failures >= self.failure_threshold:
+                        self._transition(CircuitState.OPEN)
+            elif self._state == CircuitState.HALF_OPEN:
+                if success is False:
+                    self._transition(CircuitState.OPEN)
+                elif success is True:
+                    self._trial_successes += 1
+                    if self._trial_successes >= self.half_open_max_calls:
+                        self._transition(CircuitState.CLOSED)
+                else:
+                    self._trials -= 1
+
+    @contextmanager
+    def guard(self, failures: tuple[Type[BaseException], ...] = (Exception,)) -> Iterator[None]:
+        """Admit the code in the block as one call, counting the `failures` it raises against the circuit."""
+        token = self.acquire()
+        try:
+            yield
+        except failures:
+            self.release(token, False)
+            raise
+        except BaseException:
+            self.release(token, None)
+            raise
+        self.release(token, True)
+
+    def reset(self) -> None:
+        """Close the circuit and forget past failures."""
+        with self._lock:
+            if self._state != CircuitState.CLOSED:
+                self._transition(CircuitState.CLOSED)
+            self._failures = 0
+
+    def _check_reset(self, now: float) -> None:
+        if self._state == CircuitState.OPEN and now - self._opened_at >= self.reset_timeout:
+            self._transition(CircuitState.HALF_OPEN)
+
+    def _transition(self, state: CircuitState) -> None:
+        previous = self._state
+        self._state = state
+        self._generation += 1
+        self._failures = 0
+        self._trials = 0
+        self._trial_successes = 0
+        if state == CircuitState.OPEN:
+            self._opened_at = time.monotonic()
+            logger.warning(f'Circuit {self.name} opened, rejecting calls for {self.reset_timeout}s.')
+        else:
+            logger.info(f'Circuit {self.name} is now {state}.')
+        if metrics_enabled():
+            record_circuit_transition(self.name, previous, state)
+        if tracing_enabled():
+            record_event('circuit_transition', circuit=self.name, from_state=previous, to_state=state)
+
+_circuits: dict[str, Circuit] = {}
+_circuits_lock = threading.Lock()
+
+def get_circuit(
+    key: str,
+    failure_threshold: int = 5,
+    reset_timeout: float = 30,
+    half_open_max_calls: int = 1
+) -> Circuit:
+    """
+    Get the circuit shared under `key`, creating it with the given settings on first use.
+    Raises `ValueError` if the circuit under `key` was created with other settings.
+    """
+    with _circuits_lock:
+        circuit = _circuits.get(key)
+        if circuit is None:
+            circuit = _circuits[key] = Circuit(
+                key,
+                failure_threshold=failure_threshold,
+                reset_timeout=reset_timeout,
+                half_open_max_calls=half_open_max_calls
+            )
+        elif (
+            circuit.failure_threshold != failure_threshold
+            or circuit.reset_timeout != reset_timeout
+            or circuit.half_open_max_calls != half_open_max_calls
+        ):
+            raise ValueError(
+                f'Circuit {key} already exists with failure_threshold={circuit.failure_threshold}, '
+                f'reset_timeout={circuit.reset_timeout} and half_open_max_calls={circuit.half_open_max_calls}.'
+            )
+        return circuit
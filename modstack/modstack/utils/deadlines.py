@@ -0,0 +1,48 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+import time
+from typing import Iterator, Optional
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when the deadline of the current request has passed."""
+
+_deadline: ContextVar[Optional[float]] = ContextVar('modstack_deadline', default=None)
+
+def get_deadline() -> Optional[float]:
+    """The deadline of the current request as a `time.monotonic()` value, if it has one."""
+    return _deadline.get()
+
+def remaining_time() -> Optional[float]:
+    """Seconds left before the current deadline, never negative, or None if there's no deadline."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+def check_deadline() -> None:
+    deadline = _deadline.get()
+    if deadline is not None and time.monotonic() >= deadline:
+        raise DeadlineExceeded('Deadline exceeded.')
+
+def min_timeout(timeout: Optional[float]) -> Optional[float]:
+    """The smaller of `timeout` and the time left before the current deadline."""
+    remaining = remaining_time()
+    if remaining is None:
+        return timeout
+    return remaining if timeout is None else min(timeout, remaining)
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[float]:
+    """
+    Set a deadline `seconds` from now for the code in the block, and for everything it calls or spawns with the
+    current context. An enclosing deadline that is sooner stays in effect.
+    """
+    new_deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None and current < new_deadline:
+        new_deadline = current
+    token = _deadline.set(new_deadline)
+    try:
+        yield new_deadline
+    finally:
+        _deadline.reset(token)
@@ -1,7 +1,7 @@
 from functools import partial, reduce
 import itertools
 from itertools import chain
-from typing import Callable, Iterable, overload
+from typing import Callable, Iterable, Sequence, overload
 
 _initial_missing = object()
 
@@ -87,4 +87,13 @@ def tzip[A, B, C, D, E, F, G, H](
 ) -> Iterable[tuple[A, B, C, D, E, F, G, H]]: ...
 
 def tzip[*T](*iterables: Iterable[T]) -> Iterable[tuple[T]]:
-    return zip(*iterables)
\ No newline at end of file
+    return zip(*iterables)
+
+def unflatten[T](items: Sequence[T], lengths: Iterable[int]) -> list[list[T]]:
+    """Split a flat sequence back into consecutive groups of the given lengths."""
+    groups: list[list[T]] = []
+    start = 0
+    for length in lengths:
+        groups.append(list(items[start:start + length]))
+        start += length
+    return groups
@@ -16,11 +16,18 @@ class GlobalsHelper:
     _stopwords: Optional[List[str]] = None
     _nltk_data_dir: Optional[str] = None
 
-    def __init__(self) -> None:
-        """Initialize NLTK stopwords and punkt."""
-        import nltk
+    def _ensure_nltk(self) -> None:
+        """Point NLTK at the data directory and fetch stopwords and punkt, on first use rather than at import."""
+        if self._nltk_data_dir is not None:
+            return
+        try:
+            import nltk
+        except ImportError:
+            raise ImportError(
+                "`nltk` package not found, please run `pip install nltk`"
+            )
 
-        self._nltk_data_dir = os.environ.get(
+        nltk_data_dir = os.environ.get(
             "NLTK_DATA",
             os.path.join(
                 os.path.dirname(os.path.abspath(__file__)),
@@ -28,36 +35,29 @@ class GlobalsHelper:
             ),
         )
 
-        if self._nltk_data_dir not in nltk.data.path:
-            nltk.data.path.append(self._nltk_data_dir)
+        if nltk_data_dir not in nltk.data.path:
+            nltk.data.path.append(nltk_data_dir)
 
         # ensure access to data is there
         try:
             nltk.data.find("corpora/stopwords")
         except LookupError:
-            nltk.download("stopwords", download_dir=self._nltk_data_dir)
+            nltk.download("stopwords", download_dir=nltk_data_dir)
 
         try:
             nltk.data.find("tokenizers/punkt")
         except LookupError:
-            nltk.download("punkt", download_dir=self._nltk_data_dir)
+            nltk.download("punkt", download_dir=nltk_data_dir)
+
+        self._nltk_data_dir = nltk_data_dir
 
     @property
     def stopwords(self) -> List[str]:
         """Get stopwords."""
         if self._stopwords is None:
-            try:
-                import nltk
-                from nltk.corpus import stopwords
-            except ImportError:
-                raise ImportError(
-                    "`nltk` package not found, please run `pip install nltk`"
-                )
+            self._ensure_nltk()
+            from nltk.corpus import stopwords
 
-            try:
-                nltk.data.find("corpora/stopwords", paths=[self._nltk_data_dir])
-            except LookupError:
-                nltk.download("stopwords", download_dir=self._nltk_data_dir)
             self._stopwords = stopwords.words("english")
         return self._stopwords
 
@@ -0,0 +1,315 @@
+from bisect import bisect_left
+import math
+import threading
+from typing import Any, Literal, Optional, Sequence
+
+from modstack.utils.tracing import Span, TraceHandler, add_trace_handler, remove_trace_handler
+
+DEFAULT_LATENCY_BUCKETS: tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+
+MetricType = Literal['counter', 'histogram']
+
+class Metric:
+    type: MetricType
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        label_names: Sequence[str] = ()
+    ):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def _check_labels(self, labels: tuple[str, ...]) -> None:
+        if len(labels) != len(self.label_names):
+            raise ValueError(f'Metric {self.name} expects labels {self.label_names}, got {labels}.')
+
+class Counter(Metric):
+    type = 'counter'
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        label_names: Sequence[str] = ()
+    ):
+        super().__init__(name, description, label_names)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            value = self._values.get(labels)
+            if value is None:
+                self._check_labels(labels)
+                value = 0
+            self._values[labels] = value + amount
+
+    def value(self, *labels: str) -> float:
+        with self._lock:
+            return self._values.get(labels, 0)
+
+    def samples(self) -> list[dict[str, Any]]:
+        with self._lock:
+            items = list(self._values.items())
+        return [
+            {'labels': dict(zip(self.label_names, labels)), 'value': value}
+            for labels, value in items
+        ]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS
+    ):
+        super().__init__(name, description, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [count per bucket..., count above the last bucket, sum]
+        self._values: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(labels)
+            if counts is None:
+                self._check_labels(labels)
+                counts = self._values[labels] = [0] * (len(self.buckets) + 2)
+            counts[index] += 1
+            counts[-1] += value
+
+    def samples(self) -> list[dict[str, Any]]:
+        with self._lock:
+            items = [(labels, list(counts)) for labels, counts in self._values.items()]
+        samples = []
+        for labels, counts in items:
+            cumulative = 0
+            buckets = {}
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                buckets[bound] = cumulative
+            samples.append({
+                'labels': dict(zip(self.label_names, labels)),
+                'buckets': buckets,
+                'count': cumulative,
+                'sum': counts[-1]
+            })
+        return samples
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+class MetricsRegistry:
+    """
+    Holds named counters and histograms. Recording is only done while metrics are enabled, so call sites
+    should check `metrics_enabled()` before building labels.
+    """
+
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def counter(
+        self,
+        name: str,
+        description: str = '',
+        label_names: Sequence[str] = ()
+    ) -> Counter:
+        return self._get_or_create(Counter, name, description, label_names)
+
+    def histogram(
+        self,
+        name: str,
+        description: str = '',
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, description, label_names, buckets=buckets)
+
+    def collect(self) -> dict[str, dict[str, Any]]:
+        """A snapshot of every metric, keyed by name."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {
+            metric.name: {
+                'type': metric.type,
+                'description': metric.description,
+                'samples': metric.samples()
+            }
+            for metric in metrics
+        }
+
+    def to_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines = []
+        for name, metric in self.collect().items():
+            if metric['description']:
+                lines.append(f'# HELP {name} {_escape_help(metric['description'])}')
+            lines.append(f'# TYPE {name} {metric['type']}')
+            for sample in metric['samples']:
+                labels = sample['labels']
+                if metric['type'] == 'counter':
+                    lines.append(f'{name}{_format_labels(labels)} {_format_value(sample['value'])}')
+                    continue
+                for bound, count in sample['buckets'].items():
+                    le = '+Inf' if bound == math.inf else _format_value(bound)
+                    lines.append(f'{name}_bucket{_format_labels({**labels, 'le': le})} {count}')
+                lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(sample['sum'])}')
+                lines.append(f'{name}_count{_format_labels(labels)} {sample['count']}')
+        return '\n'.join(lines) + '\n' if lines else ''
+
+    def reset(self) -> None:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.reset()
+
+    def _get_or_create(self, cls: type[Metric], name: str, description: str, label_names: Sequence[str], **kwargs):
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(name)
+                if metric is None:
+                    metric = self._metrics[name] = cls(name, description, label_names, **kwargs)
+        if not isinstance(metric, cls):
+            raise TypeError(f'Metric {name} is already registered as a {metric.type}.')
+        return metric
+
+def _escape_help(text: str) -> str:
+    return text.replace('\\', '\\\\').replace('\n', '\\n')
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape_label(value)}"' for key, value in labels.items()) + '}'
+
+def _escape_label(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class ModuleMetrics(TraceHandler):
+    """Records call counts, errors, latency and time to first chunk for every traced module."""
+
+    def __init__(self, registry: MetricsRegistry):
+        self.calls = registry.counter(
+            'modstack_module_calls_total',
+            'Number of module executions.',
+            ('module',)
+        )
+        self.errors = registry.counter(
+            'modstack_module_errors_total',
+            'Number of module executions that raised.',
+            ('module',)
+        )
+        self.latency = registry.histogram(
+            'modstack_module_latency_seconds',
+            'Module execution time in seconds.',
+            ('module',)
+        )
+        self.first_chunk = registry.histogram(
+            'modstack_module_first_chunk_seconds',
+            'Time until a streaming module produced its first chunk, in seconds.',
+            ('module',)
+        )
+
+    def on_end(self, span: Span) -> None:
+        self.calls.inc(span.name)
+        if span.error is not None:
+            self.errors.inc(span.name)
+        self.latency.observe((span.end_ns - span.start_ns) / 1e9, span.name)
+        if span.first_chunk_ns is not None:
+            self.first_chunk.observe((span.first_chunk_ns - span.start_ns) / 1e9, span.name)
+
+_metrics_registry = MetricsRegistry()
+_metrics_enabled = False
+_module_metrics: Optional[ModuleMetrics] = None
+_state_lock = threading.Lock()
+
+def get_metrics_registry() -> MetricsRegistry:
+    return _metrics_registry
+
+def metrics_enabled() -> bool:
+    return _metrics_enabled
+
+def enable_metrics(registry: Optional[MetricsRegistry] = None) -> MetricsRegistry:
+    """Start recording metrics, into `registry` if given. Module metrics are collected through tracing."""
+    global _metrics_registry, _metrics_enabled, _module_metrics
+    with _state_lock:
+        if _module_metrics is not None:
+            remove_trace_handler(_module_metrics)
+        if registry is not None:
+            _metrics_registry = registry
+        _module_metrics = ModuleMetrics(_metrics_registry)
+        add_trace_handler(_module_metrics)
+        _metrics_enabled = True
+        return _metrics_registry
+
+def disable_metrics() -> None:
+    global _metrics_enabled, _module_metrics
+    with _state_lock:
+        if _module_metrics is not None:
+            remove_trace_handler(_module_metrics)
+            _module_metrics = None
+        _metrics_enabled = False
+
+def record_store_lookup(store: str, hit: bool) -> None:
+    _metrics_registry.counter(
+        'modstack_store_lookups_total',
+        'Number of store lookups by result.',
+        ('store', 'result')
+    ).inc(store, 'hit' if hit else 'miss')
+
+def record_flow_step(flow: str, seconds: float, tasks: int) -> None:
+    _metrics_registry.counter(
+        'modstack_flow_steps_total',
+        'Number of flow steps executed.',
+        ('flow',)
+    ).inc(flow)
+    _metrics_registry.counter(
+        'modstack_flow_tasks_total',
+        'Number of flow tasks executed.',
+        ('flow',)
+    ).inc(flow, amount=tasks)
+    _metrics_registry.histogram(
+        'modstack_flow_step_seconds',
+        'Flow step execution time in seconds.',
+        ('flow',)
+    ).observe(seconds, flow)
+
+def record_hedge(module: str, hedged: bool, hedge_won: bool) -> None:
+    _metrics_registry.counter(
+        'modstack_hedge_requests_total',
+        'Number of hedged module calls by how they were answered.',
+        ('module', 'outcome')
+    ).inc(module, 'hedge' if hedge_won else ('primary_hedged' if hedged else 'primary'))
+
+def record_circuit_transition(circuit: str, previous: str, state: str) -> None:
+    _metrics_registry.counter(
+        'modstack_circuit_transitions_total',
+        'Number of circuit breaker state changes.',
+        ('circuit', 'from_state', 'to_state')
+    ).inc(circuit, previous, state)
+
+def record_circuit_rejection(circuit: str) -> None:
+    _metrics_registry.counter(
+        'modstack_circuit_rejections_total',
+        'Number of calls rejected by an open circuit breaker.',
+        ('circuit',)
+    ).inc(circuit)
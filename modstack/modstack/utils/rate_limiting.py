@@ -0,0 +1,195 @@
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+import threading
+import time
+from typing import AsyncIterator, Iterator, Optional
+
+class TokenBucket:
+    """
+    A token bucket that lets callers go into debt: a reservation always succeeds, and returns how long the caller
+    has to wait before using it. Since later reservations see the debt of earlier ones, callers are admitted in the
+    order they reserved. Not thread-safe on its own.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        if rate <= 0:
+            raise ValueError('rate must be positive.')
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    def reserve(self, amount: float, now: float) -> float:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= min(amount, self.capacity)
+        return max(0.0, -self._tokens / self.rate)
+
+    def refund(self, amount: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + min(amount, self.capacity))
+
+class FairSemaphore:
+    """A FIFO semaphore that can be acquired from threads and from any event loop."""
+
+    def __init__(self, value: int):
+        if value < 1:
+            raise ValueError('value must be at least 1.')
+        self._value = value
+        self._waiters: deque[threading.Event | asyncio.Future] = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            if self._value > 0 and not self._waiters:
+                self._value -= 1
+                return
+            event = threading.Event()
+            self._waiters.append(event)
+        event.wait()
+
+    async def aacquire(self) -> None:
+        with self._lock:
+            if self._value > 0 and not self._waiters:
+                self._value -= 1
+                return
+            future = asyncio.get_running_loop().create_future()
+            self._waiters.append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters.remove(future)
+                except ValueError:
+                    # the slot was already handed to us, pass it on
+                    self._release()
+            raise
+
+    def release(self) -> None:
+        with self._lock:
+            self._release()
+
+    def _release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if isinstance(waiter, threading.Event):
+                waiter.set()
+                return
+            loop = waiter.get_loop()
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(_grant, waiter)
+                return
+        self._value += 1
+
+def _grant(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+class RateLimiter:
+    """
+    Limits requests per second, tokens per minute and concurrent requests. Admission is first come, first served,
+    and waits instead of failing.
+    """
+
+    def __init__(
+        self,
+        requests_per_sec: Optional[float] = None,
+        tokens_per_min: Optional[float] = None,
+        max_concurrency: Optional[int] = None
+    ):
+        self.requests_per_sec = requests_per_sec
+        self.tokens_per_min = tokens_per_min
+        self.max_concurrency = max_concurrency
+        self._requests = TokenBucket(requests_per_sec, max(1.0, requests_per_sec)) if requests_per_sec else None
+        self._tokens = TokenBucket(tokens_per_min / 60, tokens_per_min) if tokens_per_min else None
+        self._slots = FairSemaphore(max_concurrency) if max_concurrency else None
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 0) -> None:
+        if self._slots is not None:
+            self._slots.acquire()
+        delay = self._reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def aacquire(self, tokens: float = 0) -> None:
+        if self._slots is not None:
+            await self._slots.aacquire()
+        delay = self._reserve(tokens)
+        if delay > 0:
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                self._refund(tokens)
+                self.release()
+                raise
+
+    def release(self) -> None:
+        if self._slots is not None:
+            self._slots.release()
+
+    @contextmanager
+    def limit(self, tokens: float = 0) -> Iterator[None]:
+        self.acquire(tokens)
+        try:
+            yield
+        finally:
+            self.release()
+
+    @asynccontextmanager
+    async def alimit(self, tokens: float = 0) -> AsyncIterator[None]:
+        await self.aacquire(tokens)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def _reserve(self, tokens: float) -> float:
+        with self._lock:
+            now = time.monotonic()
+            delay = 0.0
+            if self._requests is not None:
+                delay = self._requests.reserve(1, now)
+            if self._tokens is not None and tokens:
+                delay = max(delay, self._tokens.reserve(tokens, now))
+            return delay
+
+    def _refund(self, tokens: float) -> None:
+        with self._lock:
+            if self._requests is not None:
+                self._requests.refund(1)
+            if self._tokens is not None and tokens:
+                self._tokens.refund(tokens)
+
+_rate_limiters: dict[str, RateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+def get_rate_limiter(
+    key: str,
+    requests_per_sec: Optional[float] = None,
+    tokens_per_min: Optional[float] = None,
+    max_concurrency: Optional[int] = None
+) -> RateLimiter:
+    """
+    Get the rate limiter shared under `key`, creating it with the given limits on first use.
+    Raises `ValueError` if the limiter under `key` was created with other limits.
+    """
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(key)
+        if limiter is None:
+            limiter = _rate_limiters[key] = RateLimiter(
+                requests_per_sec=requests_per_sec,
+                tokens_per_min=tokens_per_min,
+                max_concurrency=max_concurrency
+            )
+        elif (
+            limiter.requests_per_sec != requests_per_sec
+            or limiter.tokens_per_min != tokens_per_min
+            or limiter.max_concurrency != max_concurrency
+        ):
+            raise ValueError(
+                f'Rate limiter {key} already exists with requests_per_sec={limiter.requests_per_sec}, '
+                f'tokens_per_min={limiter.tokens_per_min} and max_concurrency={limiter.max_concurrency}.'
+            )
+        return limiter
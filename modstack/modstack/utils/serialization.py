@@ -1,7 +1,7 @@
 from functools import lru_cache
 import inspect
 from inspect import Parameter
-from typing import Any, Callable, Type
+from typing import Any, Callable, Type, cast
 
 from pydantic import BaseModel, ConfigDict, create_model as create_model_base
 
@@ -11,23 +11,36 @@ from modstack.typing import Schema, SchemaType
 class _SchemaConfig(ConfigDict):
     pass
 
-@lru_cache(maxsize=256)
+_schema_caches: list[Any] = []
+
+def schema_cache[F: Callable](func: F) -> F:
+    """
+    Memoize a schema or type resolution function. Arguments must be hashable.
+    All memoized functions are cleared together by `clear_schema_cache`.
+    """
+    cached = lru_cache(maxsize=1024)(func)
+    _schema_caches.append(cached)
+    return cast(F, cached)
+
+def clear_schema_cache() -> None:
+    """Forget memoized models, schemas and type resolutions, e.g. after redefining a type they depend on."""
+    for cached in _schema_caches:
+        cached.cache_clear()
+
+@schema_cache
 def _create_model_cached(
     __model_name: str,
-    *,
-    __config__: ConfigDict | None = None,
-    __doc__: str | None = None,
-    __base__: Type[BaseModel] | tuple[Type[BaseModel], ...] | None = None,
-    __module__: str | None = None,
-    __validators__: dict[str, classmethod] | None = None,
-    __cls_kwargs__: dict[str, Any] | None = None,
-    __slots__: tuple[str, ...] | None = None,
-    **field_definitions
+    __config__: tuple[tuple[str, Any], ...],
+    __doc__: str | None,
+    __module__: str | None,
+    field_definitions: tuple[tuple[str, Any], ...]
 ) -> Type[BaseModel]:
     return create_model_base(
         __model_name,
-        __config__=_SchemaConfig(extra='allow', arbitrary_types_allowed=True),
-        **field_definitions
+        __config__=_SchemaConfig(**dict(__config__)),
+        __doc__=__doc__,
+        __module__=__module__,
+        **dict(field_definitions)
     )
 
 def create_model(
@@ -42,29 +55,33 @@ def create_model(
     __slots__: tuple[str, ...] | None = None,
     **field_descriptions
 ) -> Type[BaseModel]:
-    try:
-        return _create_model_cached(
-            __model_name,
-            __config__=_SchemaConfig(extra='allow', arbitrary_types_allowed=True, **(__config__ or {})),
-            __doc__=__doc__,
-            __module__=__module__,
-            __validators__=__validators__,
-            __cls_kwargs__=__cls_kwargs__,
-            __slots__=__slots__,
-            **field_descriptions
-        )
-    except TypeError:
-        # something in field definitions is not hashable
-        return create_model_base(
-            __model_name,
-            __config__=_SchemaConfig(extra='allow', arbitrary_types_allowed=True, **(__config__ or {})),
-            __doc__=__doc__,
-            __module__=__module__,
-            __validators__=__validators__,
-            __cls_kwargs__=__cls_kwargs__,
-            __slots__=__slots__,
-            **field_descriptions
-        )
+    """
+    Like pydantic's `create_model`, but returns the same model for the same name, config and fields.
+    Callers must not mutate the returned model.
+    """
+    config = _SchemaConfig(extra='allow', arbitrary_types_allowed=True, **(__config__ or {}))
+    if not __validators__ and not __cls_kwargs__ and not __slots__:
+        try:
+            return _create_model_cached(
+                __model_name,
+                tuple(config.items()),
+                __doc__,
+                __module__,
+                tuple(field_descriptions.items())
+            )
+        except TypeError:
+            # something in field definitions is not hashable
+            pass
+    return create_model_base(
+        __model_name,
+        __config__=config,
+        __doc__=__doc__,
+        __module__=__module__,
+        __validators__=__validators__,
+        __cls_kwargs__=__cls_kwargs__,
+        __slots__=__slots__,
+        **field_descriptions
+    )
 
 def model_from_callable(name: str, func: Callable) -> Type[BaseModel]:
     signature = inspect.signature(func)
@@ -97,8 +114,9 @@ def from_dict(data: dict[str, Any], input_schema: Type[BaseModel]) -> Any:
     schema_type = input_schema.model_config.get(SCHEMA_TYPE, None)
     if isinstance(input_schema, Schema):
         return input_schema.model_construct(**data)
+    # schemas are shared between modules, so don't pop from model_fields
     field = (
-        input_schema.model_fields.popitem()[1]
+        next(reversed(input_schema.model_fields.values()))
         if len(input_schema.model_fields) > 0
         else None
     )
@@ -108,6 +126,11 @@ def from_dict(data: dict[str, Any], input_schema: Type[BaseModel]) -> Any:
         return data
     return data.popitem()[1] if len(data) > 0 else None
 
+@schema_cache
+def json_schema_type(model: Type[BaseModel]) -> str:
+    """The JSON schema type of a model, e.g. 'object'."""
+    return model.model_json_schema().get('type', 'object')
+
 def to_dict(data: Any) -> dict[str, Any]:
     if isinstance(data, Schema):
         return data.model_dump()
@@ -1,11 +1,17 @@
 import asyncio
-from concurrent.futures import Executor, Future, ThreadPoolExecutor
+import atexit
+from collections import deque
+from concurrent.futures import CancelledError, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
 from contextlib import contextmanager
 from contextvars import copy_context
 from functools import partial
-from typing import Any, AsyncIterator, Callable, Coroutine, Generator, Iterable, Iterator, List, Optional, cast, override
+import multiprocessing
+import os
+import queue
+import threading
+from typing import Any, AsyncIterator, Callable, Coroutine, Generator, Iterable, Iterator, List, Mapping, Optional, cast, override
 
-from unsync import unsync
+from modstack.utils.deadlines import DeadlineExceeded, remaining_time
 
 class ContextThreadPoolExecutor(ThreadPoolExecutor):
     """
@@ -54,6 +60,405 @@ class ContextThreadPoolExecutor(ThreadPoolExecutor):
             chunksize=chunksize
         )
 
+DEFAULT_EXECUTOR = 'default'
+DEFAULT_STREAM_BUFFER_SIZE = 64
+
+_worker_local = threading.local()
+
+class SharedThreadPoolExecutor(ContextThreadPoolExecutor):
+    """
+    Long-lived ContextThreadPoolExecutor shared between callers.
+
+    Work submitted from one of the pool's own threads runs inline in the submitting thread once every worker
+    is taken, so nested fan-out (e.g. a Parallel inside a Parallel) can't deadlock waiting for itself.
+    Work that has to run alongside its submitter, like the producers of a merged stream, goes through `spawn`.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, thread_name_prefix: str = ''):
+        super().__init__(
+            max_workers=max_workers,
+            thread_name_prefix=thread_name_prefix,
+            initializer=self._init_worker
+        )
+        self._reserved = 0
+        self._reserved_lock = threading.Lock()
+
+    def _init_worker(self) -> None:
+        _worker_local.executor = self
+
+    def is_worker(self) -> bool:
+        """Whether the caller is running on one of this pool's threads."""
+        return getattr(_worker_local, 'executor', None) is self
+
+    @override
+    def submit[**P, T](
+        self,
+        __fn: Callable[P, T],
+        *args: P.args,
+        **kwargs: P.kwargs
+    ) -> Future[T]:
+        with self._reserved_lock:
+            run_inline = self.is_worker() and self._reserved >= self._max_workers
+            if not run_inline:
+                self._reserved += 1
+        if run_inline:
+            future: Future[T] = Future()
+            _run_future(future, partial(copy_context().run, __fn, *args, **kwargs))
+            return future
+        future = super().submit(__fn, *args, **kwargs)
+        future.add_done_callback(self._release)
+        return future
+
+    def spawn[**P, T](
+        self,
+        __fn: Callable[P, T],
+        *args: P.args,
+        **kwargs: P.kwargs
+    ) -> Future[T]:
+        """
+        Like `submit`, but never runs the work inline or leaves it queued: once every worker is taken, it runs
+        on a thread of its own.
+        """
+        with self._reserved_lock:
+            detached = self._reserved >= self._max_workers
+            if not detached:
+                self._reserved += 1
+        if not detached:
+            future = super().submit(__fn, *args, **kwargs)
+            future.add_done_callback(self._release)
+            return future
+        future = Future()
+        fn = partial(copy_context().run, __fn, *args, **kwargs)
+
+        def _run() -> None:
+            # count as one of the pool's threads, so nested submissions fall back to running inline
+            self._init_worker()
+            _run_future(future, fn)
+
+        threading.Thread(target=_run, name=f'{self._thread_name_prefix}-spawned', daemon=True).start()
+        return future
+
+    def _release(self, _: Future) -> None:
+        with self._reserved_lock:
+            self._reserved -= 1
+
+def _run_future[T](future: Future[T], fn: Callable[[], T]) -> None:
+    if not future.set_running_or_notify_cancel():
+        return
+    try:
+        future.set_result(fn())
+    except BaseException as e:
+        future.set_exception(e)
+
+class BoundedExecutor(Executor):
+    """
+    Caps how many tasks of a single caller run at once on a shared executor.
+
+    Submissions past the cap are queued here rather than blocking the caller, and are handed to the
+    underlying executor as earlier tasks finish. Tasks queued with `spawn` are handed over with the
+    underlying executor's `spawn` when it has one.
+    """
+
+    def __init__(self, executor: Executor, max_workers: int):
+        if max_workers < 1:
+            raise ValueError('max_workers must be at least 1.')
+        self._executor = executor
+        self._max_workers = max_workers
+        self._queue: deque[tuple[Future, Callable[[], Any], bool]] = deque()
+        self._running = 0
+        self._lock = threading.Lock()
+
+    @override
+    def submit[**P, T](
+        self,
+        __fn: Callable[P, T],
+        *args: P.args,
+        **kwargs: P.kwargs
+    ) -> Future[T]:
+        return self._enqueue(False, partial(__fn, *args, **kwargs))
+
+    def spawn[**P, T](
+        self,
+        __fn: Callable[P, T],
+        *args: P.args,
+        **kwargs: P.kwargs
+    ) -> Future[T]:
+        return self._enqueue(True, partial(__fn, *args, **kwargs))
+
+    def _enqueue[T](self, spawn: bool, fn: Callable[[], T]) -> Future[T]:
+        future: Future[T] = Future()
+        # bind the caller's context now, the task may be handed over from another thread later
+        with self._lock:
+            self._queue.append((future, partial(copy_context().run, fn), spawn))
+        self._drain()
+        return future
+
+    def _drain(self) -> None:
+        while True:
+            with self._lock:
+                if self._running >= self._max_workers or not self._queue:
+                    return
+                future, fn, spawn = self._queue.popleft()
+                self._running += 1
+            if not future.set_running_or_notify_cancel():
+                with self._lock:
+                    self._running -= 1
+                continue
+            inner = _spawn(self._executor, fn) if spawn else self._executor.submit(fn)
+            inner.add_done_callback(partial(self._complete, future))
+
+    def _complete(self, future: Future, inner: Future) -> None:
+        with self._lock:
+            self._running -= 1
+        if inner.cancelled():
+            future.set_exception(CancelledError())
+        elif (error := inner.exception()) is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(inner.result())
+        self._drain()
+
+def _spawn[T](executor: Executor, fn: Callable[[], T]) -> Future[T]:
+    """Run `fn` with the executor's `spawn` when it has one, so it never runs inline in the caller."""
+    spawn = getattr(executor, 'spawn', None)
+    if spawn is not None:
+        return spawn(fn)
+    return executor.submit(fn)
+
+class ExecutorRegistry:
+    """
+    Process-wide registry of named thread pools.
+
+    Pools are created lazily on first use and reused across calls. When `max_total_workers` is set, the
+    worker counts of all pools are clamped so that together they never exceed it.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[dict[str, int]] = None,
+        max_total_workers: Optional[int] = None
+    ):
+        self.max_total_workers = max_total_workers
+        self._max_workers: dict[str, int] = dict(max_workers or {})
+        self._executors: dict[str, SharedThreadPoolExecutor] = {}
+        self._process_pools: dict[str, ProcessPoolExecutor] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, name: str = DEFAULT_EXECUTOR, max_workers: Optional[int] = None) -> None:
+        """
+        Set the worker limit of a named pool. An already running pool with that name is shut down
+        once its pending work is done, and recreated with the new limit on next use.
+        """
+        with self._lock:
+            if max_workers is None:
+                self._max_workers.pop(name, None)
+            else:
+                self._max_workers[name] = max_workers
+            executor = self._executors.pop(name, None)
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def get(self, name: str = DEFAULT_EXECUTOR, max_workers: Optional[int] = None) -> SharedThreadPoolExecutor:
+        """
+        Get a named pool, creating it on first use. `max_workers` sizes a new pool, unless the name was configured
+        with a limit of its own.
+        """
+        executor = self._executors.get(name)
+        if executor is None:
+            with self._lock:
+                executor = self._executors.get(name)
+                if executor is None:
+                    executor = SharedThreadPoolExecutor(
+                        max_workers=self._resolve_max_workers(name, max_workers),
+                        thread_name_prefix=f'modstack-{name}'
+                    )
+                    self._executors[name] = executor
+        return executor
+
+    def get_process_pool(
+        self,
+        name: str,
+        max_workers: Optional[int] = None,
+        initializer: Optional[Callable[..., None]] = None,
+        initargs: tuple[Any, ...] = (),
+        warm: bool = False
+    ) -> ProcessPoolExecutor:
+        """
+        Get a named process pool, creating it on first use. Workers are spawned rather than forked, since the
+        parent process runs background threads. With `warm`, all workers are started and initialized up front.
+        """
+        executor = self._process_pools.get(name)
+        if executor is None:
+            with self._lock:
+                executor = self._process_pools.get(name)
+                if executor is None:
+                    executor = ProcessPoolExecutor(
+                        max_workers=max_workers,
+                        mp_context=multiprocessing.get_context('spawn'),
+                        initializer=initializer,
+                        initargs=initargs
+                    )
+                    if warm:
+                        for _ in range(executor._max_workers):
+                            executor.submit(_noop)
+                    self._process_pools[name] = executor
+        return executor
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False) -> None:
+        with self._lock:
+            executors: list[Executor] = [*self._executors.values(), *self._process_pools.values()]
+            self._executors.clear()
+            self._process_pools.clear()
+        for executor in executors:
+            executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+    def _resolve_max_workers(self, name: str, max_workers: Optional[int] = None) -> int:
+        max_workers = self._max_workers.get(name) or max_workers or min(32, (os.cpu_count() or 1) + 4)
+        if self.max_total_workers is not None:
+            allocated = sum(executor._max_workers for executor in self._executors.values())
+            max_workers = max(1, min(max_workers, self.max_total_workers - allocated))
+        return max_workers
+
+def _noop() -> None:
+    pass
+
+_executor_registry: Optional[ExecutorRegistry] = None
+_executor_registry_lock = threading.Lock()
+
+def get_executor_registry() -> ExecutorRegistry:
+    global _executor_registry
+    if _executor_registry is None:
+        with _executor_registry_lock:
+            if _executor_registry is None:
+                _executor_registry = ExecutorRegistry()
+    return _executor_registry
+
+def set_executor_registry(registry: Optional[ExecutorRegistry]) -> None:
+    global _executor_registry
+    with _executor_registry_lock:
+        previous, _executor_registry = _executor_registry, registry
+    if previous is not None and previous is not registry:
+        previous.shutdown(wait=False)
+
+class EventLoopThread:
+    """
+    A long-lived event loop running in a daemon thread.
+
+    Synchronous code submits coroutines to this loop instead of calling `asyncio.run` for every call,
+    so async clients, semaphores and connection pools created on the loop survive across calls.
+    """
+
+    def __init__(self, name: str = 'modstack-event-loop'):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None or not self.is_running():
+            self.start()
+        return cast(asyncio.AbstractEventLoop, self._loop)
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def is_current(self) -> bool:
+        """Whether the caller is running on this loop's thread."""
+        return self._thread is not None and self._thread.ident == threading.get_ident()
+
+    def start(self) -> None:
+        with self._lock:
+            if self.is_running():
+                return
+            loop = asyncio.new_event_loop()
+            started = threading.Event()
+
+            def _run() -> None:
+                asyncio.set_event_loop(loop)
+                loop.call_soon(started.set)
+                try:
+                    loop.run_forever()
+                finally:
+                    try:
+                        loop.run_until_complete(loop.shutdown_asyncgens())
+                    finally:
+                        loop.close()
+
+            self._loop = loop
+            self._thread = threading.Thread(target=_run, name=self.name, daemon=True)
+            self._thread.start()
+            started.wait()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        with self._lock:
+            if not self.is_running():
+                return
+            loop = cast(asyncio.AbstractEventLoop, self._loop)
+            thread = cast(threading.Thread, self._thread)
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout=timeout)
+            self._loop = None
+            self._thread = None
+
+    def submit[T](self, coroutine: Coroutine[Any, Any, T]) -> Future[T]:
+        """
+        Schedule a coroutine on the loop, running it in a copy of the caller's context.
+
+        Returns:
+            Future[T]: A concurrent future for the result. Cancelling it cancels the underlying task.
+        """
+        context = copy_context()
+
+        async def _run() -> T:
+            return await asyncio.get_running_loop().create_task(coroutine, context=context)
+
+        return asyncio.run_coroutine_threadsafe(_run(), self.loop)
+
+    def run[T](self, coroutine: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+        """Block until the coroutine completes on the loop and return its result."""
+        if self.is_current():
+            raise RuntimeError(
+                f'Cannot block on {self.name} from its own thread. Await the coroutine instead.'
+            )
+        future = self.submit(coroutine)
+        try:
+            return future.result(timeout=timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+_event_loop_thread: Optional[EventLoopThread] = None
+_event_loop_thread_lock = threading.Lock()
+
+def get_event_loop_thread() -> EventLoopThread:
+    """Get the process-wide background event loop, starting it on first use."""
+    global _event_loop_thread
+    if _event_loop_thread is None:
+        with _event_loop_thread_lock:
+            if _event_loop_thread is None:
+                _event_loop_thread = EventLoopThread()
+    return _event_loop_thread
+
+def shutdown_event_loop_thread(timeout: Optional[float] = None) -> None:
+    global _event_loop_thread
+    with _event_loop_thread_lock:
+        if _event_loop_thread is not None:
+            _event_loop_thread.stop(timeout=timeout)
+            _event_loop_thread = None
+
+def _reset_event_loop_thread() -> None:
+    # threads don't survive a fork, so the child starts its own loop and pools on first use
+    global _event_loop_thread, _event_loop_thread_lock, _executor_registry, _executor_registry_lock
+    _event_loop_thread = None
+    _event_loop_thread_lock = threading.Lock()
+    _executor_registry = None
+    _executor_registry_lock = threading.Lock()
+
+atexit.register(shutdown_event_loop_thread, timeout=1)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_event_loop_thread)
+
 async def gated_coroutine[T](semaphore: asyncio.Semaphore, coro: Coroutine[Any, Any, T]) -> Coroutine[Any, Any, T]:
     async with semaphore:
         return await coro
@@ -69,61 +474,326 @@ async def gather_with_concurrency[T](n: Optional[int], *coros: Coroutine[Any, An
     ))
 
 @contextmanager
-def get_executor(max_workers: Optional[int] = None) -> Generator[Executor, None, None]:
-    """Get an executor for a config.
+def get_executor(
+    max_workers: Optional[int] = None,
+    name: str = DEFAULT_EXECUTOR
+) -> Generator[Executor, None, None]:
+    """Get a shared executor from the registry.
+
+    Args:
+        max_workers (Optional[int]): Caps how many tasks submitted through the returned executor run at once.
+        name (str): The name of the pool to use.
 
     Yields:
         Generator[Executor, None, None]: The executor.
     """
-    with ContextThreadPoolExecutor(max_workers=max_workers) as executor:
+    executor = get_executor_registry().get(name)
+    if max_workers is not None:
+        yield BoundedExecutor(executor, max_workers)
+    else:
         yield executor
 
 def run_sync[T](
     coroutine: Coroutine[Any, Any, T],
     max_workers: int | None = None
 ) -> T:
-    context = copy_context()
-    try:
-        loop = asyncio.get_running_loop()
-    except RuntimeError:
-        loop = None
-    if loop and loop.is_running():
+    """
+    Run a coroutine to completion from synchronous code on the shared background event loop.
+    """
+    event_loop_thread = get_event_loop_thread()
+    if event_loop_thread.is_current():
+        # a sync call nested inside a coroutine on the background loop can't block that loop,
+        # so fall back to running it on a fresh loop in another thread
+        context = copy_context()
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
             future: Future[T] = executor.submit(context.run, asyncio.run, coroutine) # type: ignore[call-args]
             return cast(T, future.result())
-    else:
-        return context.run(asyncio.run, coroutine)
+    remaining = remaining_time()
+    try:
+        return event_loop_thread.run(coroutine, timeout=remaining)
+    except TimeoutError as e:
+        if remaining is not None and not isinstance(e, DeadlineExceeded) and remaining_time() == 0:
+            raise DeadlineExceeded('Deadline exceeded.') from None
+        raise
 
 async def run_async[T](
     func: Callable[..., T],
     *args,
     **kwargs
 ) -> T:
-    return await asyncio.get_running_loop().run_in_executor(
+    context = copy_context()
+    future = asyncio.get_running_loop().run_in_executor(
         None,
-        partial(func, **kwargs),
-        *args
+        partial(context.run, func, *args, **kwargs)
     )
+    remaining = remaining_time()
+    if remaining is None:
+        return await future
+    try:
+        return await asyncio.wait_for(future, remaining)
+    except TimeoutError:
+        if future.cancelled():
+            raise DeadlineExceeded('Deadline exceeded.') from None
+        raise
+
+class _StreamError:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+_STREAM_DONE = object()
 
 def run_sync_iter[T](
     func: Callable[..., AsyncIterator[T]],
     *args,
+    buffer_size: int = DEFAULT_STREAM_BUFFER_SIZE,
     **kwargs
 ) -> Iterator[T]:
-    @unsync
-    async def _aiter() -> list[T]:
-        return [item async for item in func(*args, **kwargs)]
-    yield from _aiter().result()
+    """
+    Consume an async iterator from synchronous code as it is produced.
+
+    The iterator runs on the shared background event loop and hands items over through a queue holding
+    at most `buffer_size` items, so the producer waits for the consumer instead of buffering the whole stream.
+    Closing the returned generator early cancels the producer and closes the async iterator.
+    """
+    event_loop_thread = get_event_loop_thread()
+    owns_loop = event_loop_thread.is_current()
+    if owns_loop:
+        # blocking on the queue from the background loop would deadlock it
+        event_loop_thread = EventLoopThread(name='modstack-stream-loop')
+    loop = event_loop_thread.loop
+    items: queue.SimpleQueue[Any] = queue.SimpleQueue()
+    space: Optional[asyncio.Semaphore] = None
+
+    async def _produce() -> None:
+        nonlocal space
+        space = asyncio.Semaphore(buffer_size)
+        iterator = func(*args, **kwargs)
+        try:
+            async for item in iterator:
+                await space.acquire()
+                items.put(item)
+        except BaseException as e:
+            items.put(_StreamError(e))
+            if isinstance(e, asyncio.CancelledError):
+                raise
+        else:
+            items.put(_STREAM_DONE)
+        finally:
+            if hasattr(iterator, 'aclose'):
+                await iterator.aclose() # type: ignore[attr-defined]
+
+    producer = event_loop_thread.submit(_produce())
+    try:
+        while True:
+            item = items.get()
+            if item is _STREAM_DONE:
+                break
+            if isinstance(item, _StreamError):
+                raise item.error
+            loop.call_soon_threadsafe(cast(asyncio.Semaphore, space).release)
+            yield item
+    finally:
+        producer.cancel()
+        if owns_loop:
+            event_loop_thread.stop()
 
 async def run_async_iter[T](
     func: Callable[..., Iterator[T]],
     *args,
+    buffer_size: int = DEFAULT_STREAM_BUFFER_SIZE,
     **kwargs
 ) -> AsyncIterator[T]:
+    """
+    Consume a sync iterator from async code without an executor round trip per item.
+
+    A single worker thread drives the iterator and prefetches up to `buffer_size` items into a queue on the
+    running loop. Closing the returned generator early stops the worker and closes the iterator.
+    """
     loop = asyncio.get_running_loop()
-    iterator = await loop.run_in_executor(None, partial(func, **kwargs), *args)
-    while True:
-        if item := await loop.run_in_executor(None, next, iterator, None):
+    items: asyncio.Queue[Any] = asyncio.Queue()
+    space = threading.Semaphore(buffer_size)
+    stopped = threading.Event()
+
+    def _put(item: Any) -> None:
+        if stopped.is_set():
+            return
+        try:
+            loop.call_soon_threadsafe(items.put_nowait, item)
+        except RuntimeError:
+            # the loop was closed while the worker was still running
+            stopped.set()
+
+    def _produce() -> None:
+        iterator = func(*args, **kwargs)
+        try:
+            for item in iterator:
+                space.acquire()
+                if stopped.is_set():
+                    break
+                _put(item)
+        except BaseException as e:
+            _put(_StreamError(e))
+        else:
+            _put(_STREAM_DONE)
+        finally:
+            if hasattr(iterator, 'close'):
+                iterator.close() # type: ignore[attr-defined]
+
+    producer = loop.run_in_executor(None, copy_context().run, _produce)
+    try:
+        while True:
+            item = await items.get()
+            if item is _STREAM_DONE:
+                break
+            if isinstance(item, _StreamError):
+                raise item.error
+            space.release()
             yield item
+        await producer
+    finally:
+        stopped.set()
+        # wake the worker if it is waiting for space, so it can close the iterator
+        space.release()
+
+async def run_async_transform[In, Out](
+    func: Callable[[Iterator[In]], Iterator[Out]],
+    chunks: AsyncIterator[In],
+    buffer_size: int = DEFAULT_STREAM_BUFFER_SIZE
+) -> AsyncIterator[Out]:
+    """
+    Apply a sync iterator transform to an async iterator.
+
+    The transform runs in a worker thread and pulls input chunks as they arrive, with at most `buffer_size`
+    chunks buffered on either side. Closing the returned generator early stops both the feeder and the worker.
+    """
+    loop = asyncio.get_running_loop()
+    inputs: queue.SimpleQueue[Any] = queue.SimpleQueue()
+    space = asyncio.Semaphore(buffer_size)
+
+    async def _feed() -> None:
+        try:
+            async for chunk in chunks:
+                await space.acquire()
+                inputs.put(chunk)
+        except BaseException as e:
+            inputs.put(_StreamError(e))
+            if isinstance(e, asyncio.CancelledError):
+                raise
         else:
-            break
\ No newline at end of file
+            inputs.put(_STREAM_DONE)
+
+    def _iter_inputs() -> Iterator[In]:
+        while True:
+            chunk = inputs.get()
+            if chunk is _STREAM_DONE:
+                return
+            if isinstance(chunk, _StreamError):
+                raise chunk.error
+            loop.call_soon_threadsafe(space.release)
+            yield chunk
+
+    feeder = asyncio.create_task(_feed())
+    try:
+        async for item in run_async_iter(func, _iter_inputs(), buffer_size=buffer_size):
+            yield item
+    finally:
+        feeder.cancel()
+        # unblock the worker if it is still waiting for input
+        inputs.put(_STREAM_DONE)
+        await asyncio.gather(feeder, return_exceptions=True)
+
+def merge_iters[K, T](
+    funcs: Mapping[K, Callable[[], Iterator[T]]],
+    executor: Executor,
+    buffer_size: int = DEFAULT_STREAM_BUFFER_SIZE
+) -> Iterator[tuple[K, T]]:
+    """
+    Drive several sync iterators concurrently on an executor and yield `(key, item)` pairs in arrival order.
+
+    At most `buffer_size` items are buffered across all iterators. If any iterator raises, or the returned
+    generator is closed early, the remaining iterators are stopped at their next item and closed.
+    """
+    items: queue.SimpleQueue[tuple[K, Any]] = queue.SimpleQueue()
+    space = threading.Semaphore(buffer_size)
+    stopped = threading.Event()
+
+    def _produce(key: K, func: Callable[[], Iterator[T]]) -> None:
+        iterator: Optional[Iterator[T]] = None
+        try:
+            iterator = func()
+            for item in iterator:
+                space.acquire()
+                if stopped.is_set():
+                    break
+                items.put((key, item))
+        except BaseException as e:
+            items.put((key, _StreamError(e)))
+        else:
+            items.put((key, _STREAM_DONE))
+        finally:
+            if hasattr(iterator, 'close'):
+                iterator.close() # type: ignore[union-attr]
+
+    # the consumer loop only starts once every producer is submitted, so none of them may run inline here
+    futures = [_spawn(executor, partial(_produce, key, func)) for key, func in funcs.items()]
+    remaining = len(futures)
+    try:
+        while remaining:
+            key, item = items.get()
+            if item is _STREAM_DONE:
+                remaining -= 1
+                continue
+            if isinstance(item, _StreamError):
+                raise item.error
+            space.release()
+            yield key, item
+    finally:
+        stopped.set()
+        for future in futures:
+            future.cancel()
+            # wake producers waiting for space, so they can stop
+            space.release()
+
+async def amerge_iters[K, T](
+    funcs: Mapping[K, Callable[[], AsyncIterator[T]]],
+    buffer_size: int = DEFAULT_STREAM_BUFFER_SIZE
+) -> AsyncIterator[tuple[K, T]]:
+    """
+    Drive several async iterators concurrently as tasks and yield `(key, item)` pairs in arrival order.
+
+    At most `buffer_size` items are buffered across all iterators. If any iterator raises, or the returned
+    generator is closed early, the remaining tasks are cancelled and their iterators closed.
+    """
+    items: asyncio.Queue[tuple[K, Any]] = asyncio.Queue(maxsize=buffer_size)
+
+    async def _produce(key: K, func: Callable[[], AsyncIterator[T]]) -> None:
+        iterator: Optional[AsyncIterator[T]] = None
+        try:
+            iterator = func()
+            async for item in iterator:
+                await items.put((key, item))
+        except asyncio.CancelledError:
+            raise
+        except BaseException as e:
+            await items.put((key, _StreamError(e)))
+        else:
+            await items.put((key, _STREAM_DONE))
+        finally:
+            if hasattr(iterator, 'aclose'):
+                await iterator.aclose() # type: ignore[union-attr]
+
+    tasks = [asyncio.create_task(_produce(key, func)) for key, func in funcs.items()]
+    remaining = len(tasks)
+    try:
+        while remaining:
+            key, item = await items.get()
+            if item is _STREAM_DONE:
+                remaining -= 1
+                continue
+            if isinstance(item, _StreamError):
+                raise item.error
+            yield key, item
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,222 @@
+from abc import ABC
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import asdict, dataclass, field
+import json
+import logging
+import os
+from pathlib import Path
+import threading
+import time
+from typing import IO, Any, Iterator, Literal, Optional
+from uuid import uuid4
+
+logger = logging.getLogger(__name__)
+
+SpanEventType = Literal['start', 'end', 'error', 'chunk', 'event']
+
+@dataclass(slots=True)
+class SpanEvent:
+    """Something that happened while a span was running, e.g. a circuit breaker changing state."""
+
+    name: str
+    timestamp_ns: int
+    attributes: dict[str, Any] = field(default_factory=dict)
+
+@dataclass(slots=True)
+class Span:
+    """
+    A single execution of a module's effect. Timestamps are `time.monotonic_ns()` values, so they're only
+    comparable within a process.
+    """
+
+    name: str
+    span_id: str
+    trace_id: str
+    parent_id: Optional[str]
+    start_ns: int
+    end_ns: Optional[int] = None
+    first_chunk_ns: Optional[int] = None
+    chunks: int = 0
+    error: Optional[str] = None
+    events: list[SpanEvent] = field(default_factory=list)
+
+    @property
+    def duration_ns(self) -> Optional[int]:
+        return self.end_ns - self.start_ns if self.end_ns is not None else None
+
+class TraceHandler(ABC):
+    """Receives span events. Handlers are called synchronously on the thread running the module, so keep them cheap."""
+
+    def on_start(self, span: Span) -> None:
+        pass
+
+    def on_end(self, span: Span) -> None:
+        pass
+
+    def on_error(self, span: Span, error: BaseException) -> None:
+        pass
+
+    def on_chunk(self, span: Span) -> None:
+        pass
+
+    def on_event(self, span: Span, event: SpanEvent) -> None:
+        pass
+
+_handlers: tuple[TraceHandler, ...] = ()
+_handlers_lock = threading.Lock()
+_current_span: ContextVar[Optional[Span]] = ContextVar('modstack_current_span', default=None)
+
+def tracing_enabled() -> bool:
+    return bool(_handlers)
+
+def add_trace_handler(handler: TraceHandler) -> None:
+    global _handlers
+    with _handlers_lock:
+        if handler not in _handlers:
+            _handlers = (*_handlers, handler)
+
+def remove_trace_handler(handler: TraceHandler) -> None:
+    global _handlers
+    with _handlers_lock:
+        _handlers = tuple(h for h in _handlers if h is not handler)
+
+@contextmanager
+def tracing(*handlers: TraceHandler) -> Iterator[None]:
+    """Register `handlers` for the duration of the block."""
+    for handler in handlers:
+        add_trace_handler(handler)
+    try:
+        yield
+    finally:
+        for handler in handlers:
+            remove_trace_handler(handler)
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+def start_span(name: str) -> Span:
+    parent = _current_span.get()
+    span_id = uuid4().hex[:16]
+    span = Span(
+        name=name,
+        span_id=span_id,
+        trace_id=parent.trace_id if parent is not None else span_id,
+        parent_id=parent.span_id if parent is not None else None,
+        start_ns=time.monotonic_ns()
+    )
+    _emit('on_start', span)
+    return span
+
+def end_span(span: Span, error: Optional[BaseException] = None) -> None:
+    span.end_ns = time.monotonic_ns()
+    if error is not None:
+        span.error = f'{type(error).__name__}: {error}'
+        _emit('on_error', span, error)
+    _emit('on_end', span)
+
+def record_chunk(span: Span) -> None:
+    if span.first_chunk_ns is None:
+        span.first_chunk_ns = time.monotonic_ns()
+    span.chunks += 1
+    _emit('on_chunk', span)
+
+def record_event(name: str, **attributes: Any) -> None:
+    """Add an event to the current span. Does nothing outside of a span."""
+    span = _current_span.get()
+    if span is None:
+        return
+    event = SpanEvent(name=name, timestamp_ns=time.monotonic_ns(), attributes=attributes)
+    span.events.append(event)
+    _emit('on_event', span, event)
+
+def activate_span(span: Span) -> Token:
+    return _current_span.set(span)
+
+def deactivate_span(token: Token) -> None:
+    _current_span.reset(token)
+
+def _emit(method: str, span: Span, *args) -> None:
+    for handler in _handlers:
+        try:
+            getattr(handler, method)(span, *args)
+        except Exception:
+            logger.exception(f'Trace handler {type(handler).__name__} failed in {method}.')
+
+class SpanCollector(TraceHandler):
+    """Keeps the most recent finished spans in memory."""
+
+    def __init__(self, max_spans: Optional[int] = 10_000):
+        self._spans: deque[Span] = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+
+    @property
+    def spans(self) -> list[Span]:
+        with self._lock:
+            return list(self._spans)
+
+    def on_end(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span)
+
+    def children(self, span: Span) -> list[Span]:
+        return [s for s in self.spans if s.parent_id == span.span_id]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+class JsonlSpanExporter(TraceHandler):
+    """
+    Writes one JSON object per span event to a file, for offline analysis.
+    Chunk events are only written if `include_chunks` is set.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike | IO[str],
+        include_chunks: bool = False
+    ):
+        if isinstance(path, (str, os.PathLike)):
+            self._file: IO[str] = Path(path).open('a', encoding='utf-8')
+            self._owns_file = True
+        else:
+            self._file = path
+            self._owns_file = False
+        self.include_chunks = include_chunks
+        self._lock = threading.Lock()
+
+    def on_start(self, span: Span) -> None:
+        self._write('start', span)
+
+    def on_end(self, span: Span) -> None:
+        self._write('end', span)
+
+    def on_error(self, span: Span, error: BaseException) -> None:
+        self._write('error', span)
+
+    def on_chunk(self, span: Span) -> None:
+        if self.include_chunks:
+            self._write('chunk', span)
+
+    def on_event(self, span: Span, event: SpanEvent) -> None:
+        self._write('event', span, event)
+
+    def flush(self) -> None:
+        with self._lock:
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.flush()
+            if self._owns_file:
+                self._file.close()
+
+    def _write(self, event: SpanEventType, span: Span, span_event: Optional[SpanEvent] = None) -> None:
+        record = {'event': event, 'timestamp_ns': time.monotonic_ns(), **asdict(span)}
+        if span_event is not None:
+            record['span_event'] = asdict(span_event)
+        line = json.dumps(record, default=str)
+        with self._lock:
+            self._file.write(line + '\n')
@@ -0,0 +1,157 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+import pytest
+
+from modstack.core import module
+from modstack.core.caching import InMemoryCacheBackend, module_fingerprint
+from modstack.core.caching.base import MISSING
+
+def _counting_module():
+    calls = []
+
+    @module
+    def double(data: int, **kwargs) -> int:
+        calls.append(data)
+        return data * 2
+
+    return double, calls
+
+def test_cache_hits_for_equal_inputs():
+    double, calls = _counting_module()
+    cached = double.with_cache()
+
+    assert cached.invoke(2) == 4
+    assert cached.invoke(2) == 4
+    assert cached.invoke(3) == 6
+    assert calls == [2, 3]
+
+def test_cache_ignores_retry_state():
+    double, calls = _counting_module()
+    cached = double.with_cache().with_retry()
+
+    assert cached.invoke(2) == 4
+    assert cached.invoke(2) == 4
+    assert calls == [2]
+
+def test_cache_skips_inputs_without_a_stable_representation():
+    calls = []
+
+    @module
+    def name_of(data: object, **kwargs) -> str:
+        calls.append(data)
+        return type(data).__name__
+
+    cached = name_of.with_cache()
+    value = object()
+
+    assert cached.invoke(value) == 'object'
+    assert cached.invoke(value) == 'object'
+    assert len(calls) == 2
+
+def test_cache_uses_key_function():
+    double, calls = _counting_module()
+    cached = double.with_cache(key=lambda data, **kwargs: data % 2)
+
+    assert cached.invoke(2) == 4
+    assert cached.invoke(4) == 4
+    assert calls == [2]
+
+def test_fingerprint_is_stable():
+    double, _ = _counting_module()
+
+    assert module_fingerprint(double, {'a': {1, 2}}, {}) == module_fingerprint(double, {'a': {2, 1}}, {})
+    assert module_fingerprint(double, 1, {'retry_state': object()}) == module_fingerprint(double, 1, {})
+    assert module_fingerprint(double, 1, {}) != module_fingerprint(double, 2, {})
+    with pytest.raises(TypeError):
+        module_fingerprint(double, object(), {})
+
+def test_concurrent_calls_share_one_call():
+    calls = []
+    started = threading.Event()
+    release = threading.Event()
+
+    @module
+    def slow(data: int, **kwargs) -> int:
+        calls.append(data)
+        started.set()
+        release.wait(5)
+        return data
+
+    cached = slow.with_cache()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        leader = executor.submit(cached.invoke, 1)
+        started.wait(5)
+        followers = [executor.submit(cached.invoke, 1) for _ in range(3)]
+        time.sleep(0.05)
+        release.set()
+        assert [f.result(5) for f in (leader, *followers)] == [1, 1, 1, 1]
+
+    assert calls == [1]
+
+def test_followers_share_the_leaders_error():
+    calls = []
+    started = threading.Event()
+    release = threading.Event()
+
+    @module
+    def failing(data: int, **kwargs) -> int:
+        calls.append(data)
+        started.set()
+        release.wait(5)
+        raise ValueError('boom')
+
+    cached = failing.with_cache()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(cached.invoke, 1)
+        started.wait(5)
+        follower = executor.submit(cached.invoke, 1)
+        time.sleep(0.05)
+        release.set()
+        for future in (leader, follower):
+            with pytest.raises(ValueError, match='boom'):
+                future.result(5)
+
+    assert calls == [1]
+
+@pytest.mark.asyncio
+async def test_follower_takes_over_when_the_leader_is_cancelled():
+    calls = []
+
+    @module
+    async def slow(data: int, **kwargs) -> int:
+        calls.append(data)
+        await asyncio.sleep(0.1)
+        return data
+
+    cached = slow.with_cache()
+    leader = asyncio.create_task(cached.ainvoke(1))
+    await asyncio.sleep(0.01)
+    follower = asyncio.create_task(cached.ainvoke(1))
+    await asyncio.sleep(0.01)
+    leader.cancel()
+
+    assert await follower == 1
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    assert calls == [1, 1]
+
+def test_in_memory_backend_evicts_least_recently_used():
+    backend = InMemoryCacheBackend(max_size=2)
+    backend.put('a', 1)
+    backend.put('b', 2)
+    backend.get('a')
+    backend.put('c', 3)
+
+    assert backend.get('a') == 1
+    assert backend.get('c') == 3
+    assert backend.get('b') is MISSING
+
+def test_in_memory_backend_expires_entries():
+    backend = InMemoryCacheBackend(ttl=0.01)
+    backend.put('a', 1)
+    time.sleep(0.02)
+
+    assert backend.get('a') is MISSING
@@ -0,0 +1,126 @@
+import time
+import uuid
+
+import pytest
+
+from modstack.core import module
+from modstack.utils.circuit_breaking import Circuit, CircuitOpenError, CircuitState, get_circuit
+from modstack.utils.tracing import SpanCollector, tracing
+
+def _failing_module(calls: list[int]):
+    @module
+    def call(data: int, **kwargs) -> int:
+        calls.append(data)
+        raise ConnectionError('backend is down')
+
+    return call
+
+def _fail(circuit: Circuit) -> None:
+    circuit.release(circuit.acquire(), False)
+
+def test_circuit_opens_after_consecutive_failures():
+    circuit = Circuit('test', failure_threshold=3)
+    _fail(circuit)
+    _fail(circuit)
+    # a success resets the count
+    circuit.release(circuit.acquire(), True)
+    _fail(circuit)
+    _fail(circuit)
+
+    assert circuit.state == CircuitState.CLOSED
+    _fail(circuit)
+    assert circuit.state == CircuitState.OPEN
+    with pytest.raises(CircuitOpenError) as e:
+        circuit.acquire()
+    assert 0 < e.value.retry_after <= circuit.reset_timeout
+
+def test_half_open_circuit_closes_after_successful_trials():
+    circuit = Circuit('test', failure_threshold=1, reset_timeout=0.05, half_open_max_calls=2)
+    _fail(circuit)
+    time.sleep(0.06)
+
+    assert circuit.state == CircuitState.HALF_OPEN
+    first, second = circuit.acquire(), circuit.acquire()
+    # no more trial calls than half_open_max_calls
+    with pytest.raises(CircuitOpenError):
+        circuit.acquire()
+    circuit.release(first, True)
+    assert circuit.state == CircuitState.HALF_OPEN
+    circuit.release(second, True)
+    assert circuit.state == CircuitState.CLOSED
+
+def test_failed_trial_opens_the_circuit_again():
+    circuit = Circuit('test', failure_threshold=1, reset_timeout=0.05)
+    _fail(circuit)
+    time.sleep(0.06)
+    _fail(circuit)
+
+    assert circuit.state == CircuitState.OPEN
+
+def test_cancelled_trial_frees_its_slot():
+    circuit = Circuit('test', failure_threshold=1, reset_timeout=0.05)
+    _fail(circuit)
+    time.sleep(0.06)
+    circuit.release(circuit.acquire(), None)
+
+    circuit.release(circuit.acquire(), True)
+    assert circuit.state == CircuitState.CLOSED
+
+def test_results_of_calls_from_before_a_state_change_are_ignored():
+    circuit = Circuit('test', failure_threshold=1)
+    stale = circuit.acquire()
+    _fail(circuit)
+    circuit.reset()
+    circuit.release(stale, False)
+
+    assert circuit.state == CircuitState.CLOSED
+
+def test_open_circuit_fails_fast_to_the_fallback():
+    calls = []
+    guarded = _failing_module(calls).with_circuit_breaker(failure_threshold=2, reset_timeout=60)
+
+    @module
+    def fallback(data: int, **kwargs) -> int:
+        return -data
+
+    routed = guarded.with_fallbacks([fallback])
+    assert [routed.invoke(i) for i in range(5)] == [0, -1, -2, -3, -4]
+    # the backend isn't called once the circuit is open
+    assert calls == [0, 1]
+
+def test_with_circuit_breaker_gives_unnamed_modules_their_own_circuit():
+    calls = []
+    failing = _failing_module(calls)
+    first = failing.with_circuit_breaker(failure_threshold=1)
+    second = failing.with_circuit_breaker(failure_threshold=1)
+    key = str(uuid.uuid4())
+    shared = failing.with_circuit_breaker(failure_threshold=1, key=key)
+
+    with pytest.raises(ConnectionError):
+        first.invoke(1)
+    assert first.circuit.state == CircuitState.OPEN
+    assert second.circuit.state == CircuitState.CLOSED
+    assert shared.circuit is failing.with_circuit_breaker(failure_threshold=1, key=key).circuit
+
+def test_get_circuit_shares_by_key():
+    key = str(uuid.uuid4())
+
+    assert get_circuit(key, failure_threshold=2) is get_circuit(key, failure_threshold=2)
+    with pytest.raises(ValueError):
+        get_circuit(key, failure_threshold=3)
+
+def test_transitions_are_recorded_as_span_events():
+    collector = SpanCollector()
+    guarded = _failing_module([]).with_circuit_breaker(failure_threshold=1)
+
+    with tracing(collector):
+        with pytest.raises(ConnectionError):
+            guarded.invoke(1)
+
+    events = [event for span in collector.spans for event in span.events]
+    assert [event.name for event in events] == ['circuit_transition']
+    assert events[0].attributes == {
+        'circuit': guarded.circuit.name,
+        'from_state': CircuitState.CLOSED,
+        'to_state': CircuitState.OPEN
+    }
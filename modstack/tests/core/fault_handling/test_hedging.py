@@ -0,0 +1,84 @@
+import asyncio
+import time
+
+import pytest
+
+from modstack.core import module
+
+def _sleeping_module(name: str, seconds: float, error: Exception | None = None):
+    @module
+    def call(data: int, **kwargs) -> str:
+        time.sleep(seconds)
+        if error is not None:
+            raise error
+        return name
+
+    return call
+
+def _async_sleeping_module(name: str, seconds: float):
+    @module
+    async def call(data: int, **kwargs) -> str:
+        await asyncio.sleep(seconds)
+        return name
+
+    return call
+
+def test_fast_primary_is_not_hedged():
+    hedged = _sleeping_module('primary', 0).with_hedging(hedges=[_sleeping_module('hedge', 0)], delay=0.5)
+
+    assert hedged.invoke(1) == 'primary'
+
+def test_slow_primary_is_hedged():
+    hedged = _sleeping_module('primary', 0.5).with_hedging(hedges=[_sleeping_module('hedge', 0)], delay=0.05)
+
+    assert hedged.invoke(1) == 'hedge'
+
+def test_failed_primary_starts_the_hedge_right_away():
+    primary = _sleeping_module('primary', 0, error=ValueError('boom'))
+    hedged = primary.with_hedging(hedges=[_sleeping_module('hedge', 0)], delay=10)
+
+    start = time.monotonic()
+    assert hedged.invoke(1) == 'hedge'
+    assert time.monotonic() - start < 1
+
+def test_unhandled_errors_are_raised():
+    primary = _sleeping_module('primary', 0, error=KeyError('boom'))
+    hedged = primary.with_hedging(
+        hedges=[_sleeping_module('hedge', 0.5)],
+        delay=10,
+        exceptions_to_handle=(ValueError,)
+    )
+
+    with pytest.raises(KeyError):
+        hedged.invoke(1)
+
+def test_records_the_primary_latency_when_a_hedge_wins():
+    hedged = _sleeping_module('primary', 0.2).with_hedging(hedges=[_sleeping_module('hedge', 0)], delay=0.01)
+
+    assert hedged.invoke(1) == 'hedge'
+    # the primary keeps running in its thread, and its own latency is recorded once it is done
+    deadline = time.monotonic() + 5
+    while not hedged._latencies and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert list(hedged._latencies) == [pytest.approx(0.2, abs=0.1)]
+
+@pytest.mark.asyncio
+async def test_async_slow_primary_is_hedged_and_cancelled():
+    hedged = _async_sleeping_module('primary', 1).with_hedging(
+        hedges=[_async_sleeping_module('hedge', 0)],
+        delay=0.05
+    )
+
+    assert await hedged.ainvoke(1) == 'hedge'
+    # let the cancellation of the primary go through
+    await asyncio.sleep(0.01)
+    # the cancelled primary ran for at least the delay, which is recorded as a lower bound
+    assert len(hedged._latencies) == 1
+    assert 0.05 <= hedged._latencies[0] < 1
+
+def test_adaptive_delay_uses_the_recorded_percentile():
+    hedged = _sleeping_module('primary', 0).with_hedging(percentile=0.5, initial_delay=3)
+
+    assert hedged._get_delay() == 3
+    hedged._latencies.extend(i / 100 for i in range(1, 41))
+    assert hedged._get_delay() == pytest.approx(0.2)
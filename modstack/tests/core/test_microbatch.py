@@ -0,0 +1,121 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from modstack.core import module
+
+def _batching_module(fail: bool = False):
+    calls = []
+
+    @module
+    def double(data: list[int], **kwargs) -> list[int]:
+        calls.append(list(data))
+        if fail:
+            raise ValueError('boom')
+        return [item * 2 for item in data]
+
+    return double, calls
+
+def test_concurrent_calls_are_coalesced():
+    double, calls = _batching_module()
+    batched = double.with_microbatch(max_wait_ms=100)
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(batched.invoke, [i, i + 10]) for i in range(3)]
+        outputs = [future.result(5) for future in futures]
+
+    assert outputs == [[0, 20], [2, 22], [4, 24]]
+    assert len(calls) == 1
+    assert sorted(calls[0]) == [0, 1, 2, 10, 11, 12]
+
+def test_retried_calls_are_still_coalesced():
+    double, calls = _batching_module()
+    batched = double.with_microbatch(max_wait_ms=100).with_retry()
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(batched.invoke, [i]) for i in range(3)]
+        outputs = [future.result(5) for future in futures]
+
+    # each call passes its own retry_state, which mustn't split the batch
+    assert outputs == [[0], [2], [4]]
+    assert len(calls) == 1
+
+def test_batches_are_capped_at_max_batch_size():
+    double, calls = _batching_module()
+    batched = double.with_microbatch(max_batch_size=2, max_wait_ms=50)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(batched.invoke, [i]) for i in range(4)]
+        outputs = [future.result(5) for future in futures]
+
+    assert outputs == [[0], [2], [4], [6]]
+    assert all(len(call) <= 2 for call in calls)
+
+def test_calls_with_different_kwargs_are_not_batched_together():
+    double, calls = _batching_module()
+    batched = double.with_microbatch(max_wait_ms=50)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        first = executor.submit(batched.invoke, [1], mode='a')
+        second = executor.submit(batched.invoke, [2], mode='b')
+        assert first.result(5) == [2]
+        assert second.result(5) == [4]
+
+    assert sorted(calls) == [[1], [2]]
+
+def test_errors_are_shared_by_the_batch():
+    double, calls = _batching_module(fail=True)
+    batched = double.with_microbatch(max_wait_ms=50)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [executor.submit(batched.invoke, [i]) for i in range(2)]
+        for future in futures:
+            with pytest.raises(ValueError, match='boom'):
+                future.result(5)
+
+    assert len(calls) == 1
+
+def test_output_count_must_match_input_count():
+    @module
+    def drop_one(data: list[int], **kwargs) -> list[int]:
+        return data[1:]
+
+    with pytest.raises(ValueError, match='outputs for a batch'):
+        drop_one.with_microbatch(max_wait_ms=1).invoke([1, 2])
+
+@pytest.mark.asyncio
+async def test_follower_takes_over_when_the_leader_is_cancelled():
+    calls = []
+
+    @module
+    async def double(data: list[int], **kwargs) -> list[int]:
+        calls.append(list(data))
+        await asyncio.sleep(0.1)
+        return [item * 2 for item in data]
+
+    batched = double.with_microbatch(max_wait_ms=10)
+    leader = asyncio.create_task(batched.ainvoke([1]))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(batched.ainvoke([2]))
+    await asyncio.sleep(0.05)
+    # the leader is in the middle of the batched call
+    leader.cancel()
+
+    assert await follower == [4]
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    assert calls == [[1, 2], [2]]
+
+@pytest.mark.asyncio
+async def test_cancelled_follower_leaves_the_batch():
+    double, calls = _batching_module()
+    batched = double.with_microbatch(max_wait_ms=20)
+    leader = asyncio.create_task(batched.ainvoke([1]))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(batched.ainvoke([2]))
+    await asyncio.sleep(0)
+    follower.cancel()
+
+    assert await leader == [2]
+    assert calls == [[1]]
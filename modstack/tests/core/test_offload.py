@@ -0,0 +1,60 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+import pytest
+
+from modstack.core import module
+
+def _tracking_module():
+    state = {'running': 0, 'peak': 0}
+    lock = threading.Lock()
+
+    @module
+    def call(data: int, **kwargs) -> int:
+        with lock:
+            state['running'] += 1
+            state['peak'] = max(state['peak'], state['running'])
+        time.sleep(0.02)
+        with lock:
+            state['running'] -= 1
+        return data * 2
+
+    return call, state
+
+def test_max_workers_caps_concurrency_across_callers():
+    call, state = _tracking_module()
+    offloaded = call.with_executor(max_workers=2)
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        outputs = list(executor.map(offloaded.invoke, range(12)))
+
+    assert outputs == [i * 2 for i in range(12)]
+    assert state['peak'] == 2
+
+@pytest.mark.asyncio
+async def test_max_workers_caps_concurrency_across_async_callers():
+    call, state = _tracking_module()
+    offloaded = call.with_executor(max_workers=2)
+
+    outputs = await asyncio.gather(*(offloaded.ainvoke(i) for i in range(8)))
+
+    assert outputs == [i * 2 for i in range(8)]
+    assert state['peak'] == 2
+
+def test_offloads_get_pools_of_their_own():
+    call, state = _tracking_module()
+    first = call.with_executor(max_workers=1)
+    second = call.with_executor(max_workers=1)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(lambda i: (first if i % 2 else second).invoke(i), range(8)))
+
+    assert state['peak'] == 2
+
+def test_unknown_kind_is_rejected():
+    call, _ = _tracking_module()
+
+    with pytest.raises(ValueError):
+        call.with_executor(kind='fiber')
@@ -0,0 +1,57 @@
+import threading
+import time
+from typing import Iterator
+
+import pytest
+
+from modstack.core import module
+from modstack.utils.deadlines import DeadlineExceeded
+
+def _stream(stall: threading.Event | None = None, delay: float = 0):
+    closed = threading.Event()
+
+    @module
+    def count(data: int, **kwargs) -> Iterator[int]:
+        try:
+            for i in range(data):
+                if stall is not None and i == 1:
+                    stall.wait(5)
+                time.sleep(delay)
+                yield i
+        finally:
+            closed.set()
+
+    return count, closed
+
+def test_invoke_past_the_deadline_fails():
+    @module
+    def slow(data: int, **kwargs) -> int:
+        time.sleep(0.5)
+        return data
+
+    start = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        slow.with_timeout(0.05).invoke(1)
+    assert time.monotonic() - start < 0.4
+
+def test_stream_within_the_deadline_completes():
+    count, closed = _stream(delay=0.01)
+
+    assert list(count.with_timeout(1).iter(5)) == [0, 1, 2, 3, 4]
+    assert closed.is_set()
+
+def test_stalled_sync_stream_is_interrupted():
+    stall = threading.Event()
+    count, closed = _stream(stall=stall)
+    chunks = []
+
+    start = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        for chunk in count.with_timeout(0.1).iter(3):
+            chunks.append(chunk)
+    assert time.monotonic() - start < 1
+    assert chunks == [0]
+
+    # the stalled generator is closed once its pending chunk arrives
+    stall.set()
+    assert closed.wait(5)
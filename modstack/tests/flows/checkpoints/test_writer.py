@@ -0,0 +1,118 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+import pytest
+
+from modstack.flows.checkpoints import AsyncCheckpointWriter, CheckpointWriter
+
+class _FakeCheckpointer:
+    """Records the batches it's asked to save. Saves set `saving`, wait for `gate`, and fail with `error` if it's set."""
+
+    def __init__(self, error: Exception | None = None):
+        self.batches: list[list[tuple[str, dict]]] = []
+        self.saving = threading.Event()
+        self.gate = threading.Event()
+        self.gate.set()
+        self.error = error
+
+    def put_many(self, writes):
+        self.saving.set()
+        self.gate.wait(5)
+        return self._save(writes)
+
+    async def aput_many(self, writes):
+        self.saving.set()
+        while not self.gate.is_set():
+            await asyncio.sleep(0.001)
+        return self._save(writes)
+
+    def _save(self, writes):
+        if self.error is not None:
+            raise self.error
+        self.batches.append([(checkpoint['id'], config) for checkpoint, _, config in writes])
+        return [config for _, _, config in writes]
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        yield executor
+
+def _ids(batches: list[list[tuple[str, dict]]]) -> list[list[str]]:
+    return [[id_ for id_, _ in batch] for batch in batches]
+
+def test_writes_queued_behind_a_save_are_batched_in_order(executor):
+    checkpointer = _FakeCheckpointer()
+    writer = CheckpointWriter(checkpointer, executor=executor)
+    checkpointer.gate.clear()
+    writer.submit({'id': '0'}, {}, thread_id='t')
+    checkpointer.saving.wait(5)
+    for i in range(1, 4):
+        writer.submit({'id': str(i)}, {}, thread_id='t')
+    checkpointer.gate.set()
+    writer.flush()
+
+    assert _ids(checkpointer.batches) == [['0'], ['1', '2', '3']]
+
+def test_coalesced_write_keeps_the_parent_of_the_dropped_one(executor):
+    checkpointer = _FakeCheckpointer()
+    writer = CheckpointWriter(checkpointer, coalesce=True, executor=executor)
+    checkpointer.gate.clear()
+    writer.submit({'id': '1'}, {}, thread_id='t')
+    checkpointer.saving.wait(5)
+    writer.submit({'id': '2'}, {}, thread_id='t', thread_ts='1')
+    writer.submit({'id': '3'}, {}, thread_id='t', thread_ts='2')
+    checkpointer.gate.set()
+    writer.flush()
+
+    assert _ids(checkpointer.batches) == [['1'], ['3']]
+    assert checkpointer.batches[1][0][1] == {'thread_id': 't', 'thread_ts': '1'}
+
+def test_submit_blocks_while_max_pending_writes_are_queued(executor):
+    checkpointer = _FakeCheckpointer()
+    writer = CheckpointWriter(checkpointer, max_pending=2, executor=executor)
+    checkpointer.gate.clear()
+    writer.submit({'id': '0'}, {}, thread_id='t')
+    writer.submit({'id': '1'}, {}, thread_id='t')
+    submitter = threading.Thread(target=writer.submit, args=({'id': '2'}, {}), kwargs={'thread_id': 't'})
+    submitter.start()
+    submitter.join(0.05)
+
+    assert submitter.is_alive()
+    checkpointer.gate.set()
+    submitter.join(5)
+    writer.flush()
+    assert [id_ for batch in _ids(checkpointer.batches) for id_ in batch] == ['0', '1', '2']
+
+def test_flush_raises_the_first_failed_write_once(executor):
+    checkpointer = _FakeCheckpointer(error=ValueError('disk full'))
+    writer = CheckpointWriter(checkpointer, executor=executor)
+    writer.submit({'id': '0'}, {}, thread_id='t')
+
+    with pytest.raises(ValueError, match='disk full'):
+        writer.flush()
+    writer.flush()
+
+@pytest.mark.asyncio
+async def test_async_writes_are_batched_in_order():
+    checkpointer = _FakeCheckpointer()
+    writer = AsyncCheckpointWriter(checkpointer)
+    checkpointer.gate.clear()
+    for i in range(3):
+        await writer.asubmit({'id': str(i)}, {}, thread_id='a')
+        await writer.asubmit({'id': str(i)}, {}, thread_id='b')
+        if i == 0:
+            # let both writers pick up their first checkpoint
+            await asyncio.sleep(0.01)
+    checkpointer.gate.set()
+    await writer.aflush()
+
+    assert sorted(_ids(checkpointer.batches)) == [['0'], ['0'], ['1', '2'], ['1', '2']]
+
+@pytest.mark.asyncio
+async def test_aflush_raises_the_failed_write():
+    writer = AsyncCheckpointWriter(_FakeCheckpointer(error=ValueError('disk full')))
+    await writer.asubmit({'id': '0'}, {}, thread_id='t')
+
+    with pytest.raises(ValueError, match='disk full'):
+        await writer.aflush()
@@ -0,0 +1,107 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+import uuid
+
+import pytest
+
+from modstack.core import module
+from modstack.utils.rate_limiting import FairSemaphore, RateLimiter, TokenBucket, get_rate_limiter
+
+def test_token_bucket_delays_reservations_past_capacity():
+    bucket = TokenBucket(rate=10, capacity=2)
+    now = bucket._updated
+
+    assert bucket.reserve(1, now) == 0
+    assert bucket.reserve(1, now) == 0
+    assert bucket.reserve(1, now) == pytest.approx(0.1)
+    assert bucket.reserve(1, now) == pytest.approx(0.2)
+    # debt is paid off as time passes
+    assert bucket.reserve(1, now + 0.5) == 0
+
+def test_token_bucket_refund_returns_tokens():
+    bucket = TokenBucket(rate=1, capacity=1)
+    now = bucket._updated
+    bucket.reserve(1, now)
+    bucket.refund(1)
+
+    assert bucket.reserve(1, now) == 0
+
+def test_rate_limiter_spaces_requests():
+    limiter = RateLimiter(requests_per_sec=20)
+    start = time.monotonic()
+    for _ in range(25):
+        limiter.acquire()
+        limiter.release()
+
+    # the first 20 go out as a burst, the rest wait for the bucket to refill
+    assert time.monotonic() - start >= 0.2
+
+def test_rate_limiter_caps_concurrency():
+    limiter = RateLimiter(max_concurrency=2)
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def _call():
+        nonlocal running, peak
+        with limiter.limit():
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.01)
+            with lock:
+                running -= 1
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        for future in [executor.submit(_call) for _ in range(12)]:
+            future.result(5)
+
+    assert peak == 2
+
+@pytest.mark.asyncio
+async def test_fair_semaphore_passes_on_slots_of_cancelled_waiters():
+    semaphore = FairSemaphore(1)
+    await semaphore.aacquire()
+    cancelled = asyncio.create_task(semaphore.aacquire())
+    waiting = asyncio.create_task(semaphore.aacquire())
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    semaphore.release()
+
+    await asyncio.wait_for(waiting, 1)
+
+@pytest.mark.asyncio
+async def test_cancelled_wait_refunds_the_reservation():
+    limiter = RateLimiter(requests_per_sec=1)
+    await limiter.aacquire()
+    waiting = asyncio.create_task(limiter.aacquire())
+    await asyncio.sleep(0.01)
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+
+    # only the first request is still charged, so the next one waits about a second rather than two
+    assert limiter._reserve(0) <= 1
+
+def test_get_rate_limiter_shares_by_key():
+    key = str(uuid.uuid4())
+
+    assert get_rate_limiter(key, requests_per_sec=5) is get_rate_limiter(key, requests_per_sec=5)
+    with pytest.raises(ValueError):
+        get_rate_limiter(key, requests_per_sec=10)
+
+def test_with_rate_limit_gives_unnamed_modules_their_own_limiter():
+    @module
+    def identity(data: int, **kwargs) -> int:
+        return data
+
+    first = identity.with_rate_limit(requests_per_sec=5)
+    second = identity.with_rate_limit(requests_per_sec=10)
+    key = str(uuid.uuid4())
+    shared = identity.with_rate_limit(requests_per_sec=5, key=key)
+
+    assert first.limiter is not second.limiter
+    assert shared.limiter is identity.with_rate_limit(requests_per_sec=5, key=key).limiter
+    assert first.invoke(1) == 1
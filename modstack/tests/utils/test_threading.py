@@ -0,0 +1,210 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+import pytest
+
+from modstack.typing import Effects
+from modstack.utils.threading import (
+    DEFAULT_EXECUTOR,
+    BoundedExecutor,
+    ExecutorRegistry,
+    SharedThreadPoolExecutor,
+    amerge_iters,
+    merge_iters,
+    set_executor_registry
+)
+
+def test_merge_iters_yields_in_arrival_order():
+    first_sent = threading.Event()
+
+    def _slow():
+        first_sent.wait(5)
+        yield 'slow'
+
+    def _fast():
+        yield 'fast'
+        first_sent.set()
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        items = list(merge_iters({'slow': _slow, 'fast': _fast}, executor))
+
+    assert items == [('fast', 'fast'), ('slow', 'slow')]
+
+def test_merge_iters_raises_and_closes_other_iterators():
+    closed = threading.Event()
+
+    def _endless():
+        try:
+            while True:
+                yield 1
+        finally:
+            closed.set()
+
+    def _failing():
+        yield 1
+        raise ValueError('boom')
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        with pytest.raises(ValueError, match='boom'):
+            for _ in merge_iters({'endless': _endless, 'failing': _failing}, executor, buffer_size=4):
+                pass
+
+    assert closed.wait(5)
+
+def test_merge_iters_bounds_buffered_items():
+    produced = 0
+
+    def _count():
+        nonlocal produced
+        for i in range(100):
+            produced += 1
+            yield i
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        items = merge_iters({'count': _count}, executor, buffer_size=4)
+        next(items)
+        time.sleep(0.1)
+        # the consumer took one item, so the producer is at most one item ahead of a full buffer
+        assert produced <= 6
+        items.close()
+
+@pytest.mark.asyncio
+async def test_amerge_iters_yields_in_arrival_order():
+    first_sent = asyncio.Event()
+
+    async def _slow():
+        await first_sent.wait()
+        yield 'slow'
+
+    async def _fast():
+        yield 'fast'
+        first_sent.set()
+
+    items = [item async for item in amerge_iters({'slow': _slow, 'fast': _fast})]
+
+    assert items == [('fast', 'fast'), ('slow', 'slow')]
+
+@pytest.mark.asyncio
+async def test_amerge_iters_cancels_remaining_tasks_when_closed():
+    closed = asyncio.Event()
+
+    async def _endless():
+        try:
+            while True:
+                yield 1
+                await asyncio.sleep(0)
+        finally:
+            closed.set()
+
+    items = amerge_iters({'endless': _endless})
+    assert await anext(items) == ('endless', 1)
+    await items.aclose()
+
+    assert closed.is_set()
+
+def test_parallel_iter_accumulates_branch_chunks():
+    effect = Effects.Parallel({
+        'a': Effects.Iterator(lambda: iter([1, 2])),
+        'b': Effects.Iterator(lambda: iter(['x']))
+    })
+
+    chunks = list(effect.iter())
+
+    assert len(chunks) == 3
+    assert chunks[-1] == {'a': 2, 'b': 'x'}
+
+@pytest.fixture(params=[1, 2, None])
+def pool_size(request):
+    set_executor_registry(ExecutorRegistry(max_workers={DEFAULT_EXECUTOR: request.param} if request.param else None))
+    yield request.param
+    set_executor_registry(None)
+
+def _run_with_timeout(func, timeout: float = 10):
+    result = {}
+    thread = threading.Thread(target=lambda: result.setdefault('value', func()), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), 'deadlocked'
+    return result['value']
+
+def test_nested_parallel_iter_does_not_deadlock(pool_size):
+    def _stream():
+        return Effects.Iterator(lambda: iter(range(200)))
+
+    effect = Effects.Parallel({
+        outer: Effects.Parallel({inner: _stream() for inner in ('x', 'y')})
+        for outer in ('a', 'b')
+    })
+
+    chunks = _run_with_timeout(lambda: list(effect.iter()))
+
+    assert chunks[-1] == {'a': {'x': 199, 'y': 199}, 'b': {'x': 199, 'y': 199}}
+
+def test_nested_parallel_invoke_does_not_deadlock(pool_size):
+    effect = Effects.Parallel({
+        outer: Effects.Parallel({inner: Effects.Sync(lambda: 1) for inner in ('x', 'y', 'z')})
+        for outer in ('a', 'b', 'c')
+    })
+
+    output = _run_with_timeout(effect.invoke)
+
+    assert output == {outer: {'x': 1, 'y': 1, 'z': 1} for outer in ('a', 'b', 'c')}
+
+def test_shared_pool_spawns_threads_once_full():
+    executor = SharedThreadPoolExecutor(max_workers=1)
+    release = threading.Event()
+    try:
+        busy = executor.submit(release.wait)
+        spawned = executor.spawn(threading.current_thread)
+        assert spawned.result(5).name.endswith('-spawned')
+        release.set()
+        busy.result(5)
+    finally:
+        release.set()
+        executor.shutdown()
+
+def test_bounded_executor_caps_running_tasks():
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def _task():
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.01)
+        with lock:
+            running -= 1
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        executor = BoundedExecutor(pool, max_workers=2)
+        for future in [executor.submit(_task) for _ in range(10)]:
+            future.result(5)
+
+    assert peak == 2
+
+def test_executor_registry_reuses_and_clamps_pools():
+    registry = ExecutorRegistry(max_workers={'a': 3, 'b': 8}, max_total_workers=5)
+    try:
+        assert registry.get('a') is registry.get('a')
+        assert registry.get('a')._max_workers == 3
+        assert registry.get('b')._max_workers == 2
+        previous = registry.get('a')
+        registry.configure('a', max_workers=1)
+        assert registry.get('a') is not previous
+        assert registry.get('a')._max_workers == 1
+    finally:
+        registry.shutdown()
+
+def test_executor_registry_sizes_new_pools_unless_configured():
+    registry = ExecutorRegistry(max_workers={'configured': 3})
+    try:
+        assert registry.get('sized', max_workers=2)._max_workers == 2
+        # the pool already exists, so the size is only used on creation
+        assert registry.get('sized', max_workers=4)._max_workers == 2
+        assert registry.get('configured', max_workers=2)._max_workers == 3
+    finally:
+        registry.shutdown()